@@ -0,0 +1,281 @@
+# Acteurs de la simulation: le joueur, les cartes, les confettis, les textes et le bouton d'intro
+# Ils ne dessinent qu'à travers un moteur de rendu (voir rendu.py): RenduTk pour la
+# fenêtre turtle de main.py, RenduImage pour produire des images sans affichage
+
+from __future__ import annotations
+import math
+import random
+
+from particules import Particules
+from routage import SCREEN_SIZE
+from trajectoire import Trajectoire
+
+BG_RATIO = 1536 / 640  # stmBig.gif is the zoomed-in version of stm.gif
+CONFETTI_COUNT = 60  # the particle engine handles thousands at 60 fps
+
+
+# * Create User/Player/Train/ykwim
+class User:
+    def __init__(self, renderer, color, camera: BG):
+        # create turtle object
+        self._turtle = renderer.tortue("circle", visible=False)
+        self._camera = camera
+        # self variables
+        self._destination = (0, 0)
+        self._pos = (0, 0)
+        self._timeline = Trajectoire.depuisStations(self._pos, [], BG_RATIO)
+        self._frame = 0
+        # turtle variables
+        self._turtle.color(color)
+        self._turtle.penup()
+        self._turtle.goto(self._pos)
+
+    def show(self):
+        self._turtle.showturtle()
+
+    def start_timeline(self, timeline: Trajectoire):
+        """Play a precomputed timeline from its first keyframe"""
+        self._timeline = timeline
+        self._frame = 0
+        self._turtle.shapesize(self._camera.zoom())  # bigger player on the zoomed-in map
+
+    def seek(self, frame):
+        """Jump to a keyframe of the timeline (scrubbing)"""
+        self._frame = min(max(frame, 0), len(self._timeline))
+
+    def loop(self):
+        """Show the player and the follow camera at the next keyframe; return True once the last one is shown"""
+        frame = min(self._frame, len(self._timeline) - 1)
+        self._camera.move_camera(self._timeline.camera(frame))
+        self._turtle.goto(self._timeline.joueur(frame))
+        self._pos = self._timeline.position(frame)
+        self._frame = frame + 1
+        return self._frame == len(self._timeline)
+
+    def get_coord(self):
+        """Return the displayed coordinates of the player"""
+        return self._pos
+
+    def set_destination_from_coord(self, coord):
+        """Set new destination of the player directly through a coordinate"""
+        self._destination = coord
+
+    def teleport_to_destination(self):
+        """Teleport to destination (duh)"""
+        self._pos = self._destination
+        self._turtle.goto(*self._destination)
+
+    def reset_after_animation(self):
+        """Teleport to final position and reset size after animation"""
+        self._turtle.goto(*self._pos)
+        self._turtle.shapesize(1)
+
+
+# * Create dynamic map swapper
+class BG:
+    def __init__(self, renderer, normal_map: str, dynamic_map: str, tiles=None, zoom=BG_RATIO):
+        # each map is decoded and turned into a turtle the first time it is shown
+        # with a tile pyramid (tuiles.py), the zoomed-in map is made of the tiles in view instead of dynamic_map
+        self._renderer = renderer
+        self._normal_shape = normal_map
+        self._dynamic_shape = dynamic_map
+        self._normal_map = None
+        self._dynamic_map = None
+        self._tiles = tiles
+        self._tile_layer = None
+        self._level = 0
+        self._zoom = BG_RATIO
+
+        self._current_is_dynamic = False
+        self._coord = (0, 0)
+        self.set_zoom(zoom)
+
+    def _create_map(self, shape):
+        self._renderer.ajouteForme(shape)
+        turtle_map = self._renderer.tortue(shape, visible=False, fond=True)  # under the texts already drawn
+        turtle_map.penup()
+        return turtle_map
+
+    def _place_dynamic_map(self):
+        if self._tiles is None:
+            self._dynamic_map.goto(*self._coord)
+        else:
+            self._tile_layer.place(self._tiles.visibles(self._level, self._coord))
+
+    def zoom(self):
+        """Return how much bigger than the normal map the dynamic map is"""
+        return self._zoom
+
+    def set_zoom(self, zoom):
+        """Use the pyramid level closest to zoom (without tiles, the zoom is always BG_RATIO); return the new zoom"""
+        if self._tiles is not None:
+            self._level = self._tiles.niveauPour(zoom)
+            self._zoom = self._tiles.zoom(self._level)
+            if self._tile_layer is not None and self._current_is_dynamic:
+                self._place_dynamic_map()
+        return self._zoom
+
+    def set_dynamic_map(self):
+        """Dynamically swap to dynamic map (the zoomed-in one)"""
+        if self._tiles is not None:
+            self._tile_layer = self._tile_layer or self._renderer.tuiles(self._tiles)
+        elif self._dynamic_map is None:
+            self._dynamic_map = self._create_map(self._dynamic_shape)
+        if self._normal_map is not None:
+            self._normal_map.hideturtle()
+        if self._dynamic_map is not None:
+            self._dynamic_map.showturtle()
+        self._current_is_dynamic = True
+        self._place_dynamic_map()
+
+    def set_normal_map(self):
+        """Dynamically swap to normal map (the non-zoomed-in one)"""
+        if self._normal_map is None:
+            self._normal_map = self._create_map(self._normal_shape)
+        self._normal_map.showturtle()
+        if self._dynamic_map is not None:
+            self._dynamic_map.hideturtle()
+        if self._tile_layer is not None:
+            self._tile_layer.place([])
+        self._current_is_dynamic = False
+
+    def move_camera(self, coord):
+        """Move the follow camera (the position comes from the player's timeline)"""
+        if not self._current_is_dynamic:
+            return
+        self._coord = coord
+        self._place_dynamic_map()
+
+    def get_coord(self):
+        """Return the follow camera's coordinates"""
+        return self._coord
+
+    def reset_follow_cam_position(self):
+        """Reset the follow camera's position"""
+        self._coord = (0, 0)
+        if self._current_is_dynamic:
+            self._place_dynamic_map()
+        elif self._dynamic_map is not None:
+            self._dynamic_map.goto(0, 0)
+
+
+# * Super confetti
+class ConfettiGroup:
+    """All confettis in one array-backed particle system, drawn by the renderer in one batch per frame"""
+    RADIUS = 5  # same size as the old "circle" turtles with shapesize(0.5)
+
+    def __init__(self, renderer, count=CONFETTI_COUNT):
+        self._particles = Particules(count, SCREEN_SIZE // 2)
+        colors = [random.choice(["red", "blue", "green", "yellow", "purple", "orange"]) for _ in range(count)]
+        self._drawing = renderer.particules(colors, self.RADIUS)
+        self.reset()
+
+    def _draw(self):
+        self._drawing.deplace(*self._particles.coordonnees())
+
+    def animate(self):
+        """Animate all confettis for one frame"""
+        self._particles.avance()
+        self._draw()
+
+    def reset(self):
+        """Reset all confettis to be offscreen and ready to be shot"""
+        self._particles.reinitialise()
+        self._draw()
+
+
+class Label:
+    def __init__(self, renderer, font=('Arial', 16, 'bold'), align='center'):
+        self._renderer = renderer
+        self._turtle = renderer.tortue(visible=False)
+        self._turtle.penup()
+        self._font = font
+        self._align = align
+        self._lines = []  # (text, coord) asked for since the last erase
+        self._drawn = []  # (text, coord) currently written on the canvas
+
+    def print(self, text, *coord, erase=True):
+        """Ask for a line of text; nothing is written until draw()"""
+        if erase:
+            self._lines = []
+        self._lines.append((text, coord))
+
+    def erase(self):
+        """Ask for an empty label"""
+        self._lines = []
+
+    def draw(self):
+        """Rewrite the label only if its lines changed since the last frame"""
+        if self._lines == self._drawn:
+            return
+        self._turtle.clear()
+        for text, coord in self._lines:
+            self._turtle.goto(*coord)
+            self._turtle.write(text, align=self._align, font=self._font)
+        self._drawn = list(self._lines)
+        self._renderer.touche()
+
+
+class IntroButton:
+    ALL_STATES = {
+        'pulse': 'PULSE',
+        'grow': 'GROW',
+        'shrink': 'SHRINK',
+        'inactive': 'INACTIVE'
+    }
+
+    def __init__(self, renderer):
+        self._renderer = renderer
+        self._turtle = renderer.tortue("triangle")
+        self._turtle.color("white")
+        self._turtle.shapesize(3)
+
+        self._pulse_count = 0
+        self._pulse_size = 0
+        self._old_pulse_size = 0
+        self._drawn_size = None  # size of the circle currently on the canvas
+        self.state = self.ALL_STATES['pulse']  # PUBLIC variable
+
+    def hide(self):
+        self._turtle.hideturtle()
+
+    def pulse(self):
+        """Make the button's background slowly pulse"""
+        self._pulse_count += math.pi / 40
+        self._old_pulse_size = self._pulse_size
+        self._pulse_size = int(16 * math.sin(self._pulse_count) + 144)
+        self._draw_circle()
+
+    def grow(self):
+        """Grow the background circle to fill the screen"""
+        self._pulse_size += max((self._pulse_size - self._old_pulse_size) / 5, 0.5)
+        self._draw_circle()
+
+        if self._pulse_size > SCREEN_SIZE * 3:
+            self.state = self.ALL_STATES['shrink']
+            return True
+        return False
+
+    def shrink(self):
+        """Shrink the grown circle to reveal the game"""
+        self._pulse_size -= max(self._pulse_size / 5, 0.5)
+        if self._pulse_size <= 0:
+            return True
+
+        self._draw_circle()
+        rgb = min(max(self._pulse_size / 4 - 192, 0), 255) / 255
+        self._turtle.color(rgb, rgb, rgb)
+
+        if rgb == 0:
+            self._turtle.hideturtle()
+
+        return False
+
+    def _draw_circle(self):
+        """Redraw the background circle, only if its size changed"""
+        if self._pulse_size == self._drawn_size:
+            return
+        self._drawn_size = self._pulse_size
+        self._turtle.clear()
+        self._turtle.dot(self._pulse_size, 'black')
+        self._renderer.touche()
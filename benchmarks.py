@@ -0,0 +1,284 @@
+# Banc d'essai de la simulation STM (routage, géocodage et rendu)
+# Chaque mesure est le meilleur temps par appel sur plusieurs répétitions (timeit);
+# les résultats sont écrits en JSON pour comparer deux commits
+
+# Utilisation:
+#   python benchmarks.py -o avant.json
+#   python benchmarks.py -o apres.json --comparer avant.json
+#   python benchmarks.py --tailles 1000 10000 --seulement routage grilles
+#   python benchmarks.py --seulement demarrage --budget 120
+
+from __future__ import annotations
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import timeit
+import types
+
+TAILLES = (1_000, 10_000, 100_000, 1_000_000)  # nombre de sommets des grilles synthétiques
+GRAINE = 2023
+
+
+# * Faux module turtle: chaque méthode ne fait rien, ce qui isole le coût Python d'une image
+class _Factice:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        return _Factice()
+
+    def __getattr__(self, nom):
+        return _Factice()
+
+    def __iter__(self):
+        return iter(())
+
+
+def _module_turtle_factice():
+    module = types.ModuleType("turtle")
+    module.Turtle = type("Turtle", (_Factice,), {})
+    module.Screen = _Factice
+    module.__getattr__ = lambda nom: _Factice()
+    return module
+
+
+def importer_main_sans_tk():
+    """Importe main.py et le démarre (main.run: fenêtre, acteurs, première image) avec le faux module
+    turtle; aucune fenêtre n'est ouverte"""
+    if "main" in sys.modules:
+        return sys.modules["main"]
+    vrai_turtle = sys.modules.get("turtle")
+    sys.modules["turtle"] = _module_turtle_factice()
+    try:
+        import main
+        main.run()  # la boucle d'événements du faux module retourne tout de suite
+    finally:
+        if vrai_turtle is None:
+            del sys.modules["turtle"]
+        else:
+            sys.modules["turtle"] = vrai_turtle
+    return main
+
+
+# * Graphes synthétiques
+def grille(n: int, rng: random.Random):
+    """Graphe non orienté en grille d'environ n sommets, poids aléatoires entre 400 et 2000 (comme le métro)"""
+    from graphelib import Graphe
+    cote = max(2, math.isqrt(n))
+    g = Graphe(oriente=False)
+    for i in range(cote):
+        for j in range(cote):
+            if j + 1 < cote:
+                g.ajouteArete((i, j), (i, j + 1), rng.uniform(400, 2000))
+            if i + 1 < cote:
+                g.ajouteArete((i, j), (i + 1, j), rng.uniform(400, 2000))
+    return g, cote
+
+
+# * Mesures
+def mesurer(fonction, nombre: int, repetitions: int = 5, preparation=None):
+    """Retourne le meilleur temps par appel (en secondes) sur plusieurs répétitions"""
+    temps = []
+    for _ in range(repetitions):
+        if preparation:
+            preparation()
+        temps.append(timeit.timeit(fonction, number=nombre) / nombre)
+    return {"par_appel_s": min(temps), "median_s": sorted(temps)[len(temps) // 2], "appels": nombre,
+            "repetitions": repetitions}
+
+
+def bench_routage(resultats: dict, rng: random.Random):
+    import routage
+    noms = routage.STM.listeSommets()
+    paires = [(rng.choice(noms), rng.choice(noms)) for _ in range(200)]
+    iterateur = iter(paires * 10_000)
+    resultats["dijkstra/stm"] = mesurer(lambda: routage.dijkstra(routage.STM, *next(iterateur)), 200)
+    for mode in ("astar", "alt"):
+        routage.heuristic_for(routage.STM, mode)  # précalcul hors mesure
+        resultats[f"{mode}/stm"] = mesurer(
+            lambda: routage.shortest_path(routage.STM, *next(iterateur), mode=mode), 200)
+    resultats["create_graph/stm"] = mesurer(
+        lambda: routage.create_graph(routage.STM_RAW, routage.Graphe(oriente=False)), 200)
+    resultats["listeAretes/stm"] = mesurer(routage.STM.listeAretes, 500)
+
+
+def bench_grilles(resultats: dict, rng: random.Random, tailles):
+    import routage
+    from graphecompact import GrapheCompact
+    from instantane import chargeInstantane, sauveInstantane
+    for n in tailles:
+        g, cote = grille(n, rng)
+        coin = g.sommet((0, 0))
+        oppose = g.sommet((cote - 1, cote - 1))
+        repetitions = 5 if n <= 100_000 else 2
+        resultats[f"dijkstra/grille_{n}/coin_a_coin"] = mesurer(
+            lambda: routage.dijkstra(g, coin, oppose), 1, repetitions)
+        sommets = g.listeSommets()
+        paires = [(rng.choice(sommets), rng.choice(sommets)) for _ in range(10)]
+        iterateur = iter(paires * 100)
+        resultats[f"dijkstra/grille_{n}/aleatoire"] = mesurer(
+            lambda: routage.dijkstra(g, *next(iterateur)), 2, repetitions)
+        resultats[f"listeAretes/grille_{n}"] = mesurer(g.listeAretes, 1, repetitions)
+        # démarrage d'un grand réseau: reconstruire le graphe compact ou projeter son instantané
+        resultats[f"depuisGraphe/grille_{n}"] = mesurer(lambda: GrapheCompact.depuisGraphe(g), 1, repetitions)
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = os.path.join(dossier, "grille.stmg")
+            sauveInstantane(g, chemin)
+            resultats[f"chargeInstantane/grille_{n}"] = mesurer(lambda: chargeInstantane(chemin), 1, repetitions)
+        del g, sommets, paires
+
+
+def bench_geocodage(resultats: dict, rng: random.Random):
+    import routage
+    demi = routage.SCREEN_SIZE / 2
+    coords = [(rng.uniform(-demi, demi), rng.uniform(-demi, demi)) for _ in range(1000)]
+    iterateur = iter(coords * 1000)
+    resultats["closest_station/aleatoire"] = mesurer(lambda: routage.closest_station(next(iterateur)), 1000)
+    resultats["closest_stations/lot_1000"] = mesurer(lambda: routage.closest_stations(coords), 5)
+
+
+def bench_rendu(resultats: dict, rng: random.Random):
+    main = importer_main_sans_tk()
+    aller = main.routes_between("Côte-Vertu", "Honoré-Beaugrand")["rapide"]["p"]
+    trajet = (aller + aller[::-1]) * 20  # assez long pour ne jamais arriver pendant la mesure
+
+    def preparer_animation():
+        main.ROUTE = main.File(trajet)
+        main.GAME_STATE = main.ALL_GAME_STATES["ANIMATE"]
+        main.ANIMATION_END_DELAY = 60
+        main.user.set_destination_from_coord((0, 0))
+        main.user.teleport_to_destination()
+        main.bg.set_dynamic_map()
+        main.bg.reset_follow_cam_position()
+        main.start_route_animation()
+
+    resultats["image/handle_animate"] = mesurer(main.handle_animate, 1000, preparation=preparer_animation)
+    confetti = main.ConfettiGroup(main.renderer)
+    resultats["image/confetti_animate"] = mesurer(confetti.animate, 150, preparation=confetti.reset)
+    milliers = main.ConfettiGroup(main.renderer, 5000)
+    resultats["image/confetti_animate_5000"] = mesurer(milliers.animate, 150, preparation=milliers.reset)
+
+
+# * Démarrage à froid: chaque mesure est un nouveau processus Python (comme python -X importtime)
+_DEMARRAGE = """
+import time
+debut = time.perf_counter()
+import benchmarks
+benchmarks.importer_main_sans_tk()
+pret = time.perf_counter()
+import routage
+routage.closest_station((0, 0))
+routage.routes_between("Côte-Vertu", "Honoré-Beaugrand")
+print(pret - debut, time.perf_counter() - pret)
+"""
+
+
+def bench_demarrage(resultats: dict, repetitions: int = 5, afficher: int = 15):
+    """Temps jusqu'à la première image de main.py (sans Tk), puis de la première requête; affiche les
+    modules les plus longs à importer selon -X importtime"""
+    dossier = os.path.dirname(os.path.abspath(__file__))
+    mesures = []
+    for _ in range(repetitions):
+        sortie = subprocess.run([sys.executable, "-X", "importtime", "-c", _DEMARRAGE], cwd=dossier,
+                                capture_output=True, text=True, check=True)
+        mesures.append(tuple(map(float, sortie.stdout.split()[-2:])))
+    premiere_image = sorted(m[0] for m in mesures)
+    premiere_requete = sorted(m[1] for m in mesures)
+    resultats["demarrage/premiere_image"] = {"par_appel_s": premiere_image[0],
+                                             "median_s": premiere_image[len(mesures) // 2],
+                                             "appels": 1, "repetitions": repetitions}
+    resultats["demarrage/premiere_requete"] = {"par_appel_s": premiere_requete[0],
+                                               "median_s": premiere_requete[len(mesures) // 2],
+                                               "appels": 1, "repetitions": repetitions}
+
+    # rapport -X importtime de la dernière exécution: "import time: self [us] | cumulative | module"
+    modules = []
+    for ligne in sortie.stderr.splitlines():
+        champs = ligne.removeprefix("import time:").split("|")
+        if len(champs) == 3 and champs[0].strip().isdigit():
+            modules.append((int(champs[0]), int(champs[1]), champs[2].strip()))
+    print(f"{'module (-X importtime)':45s} {'propre':>10s} {'cumulé':>10s}")
+    for propre, cumule, module in sorted(modules, reverse=True)[:afficher]:
+        print(f"{module:45s} {propre / 1000:8.2f} ms {cumule / 1000:8.2f} ms")
+
+
+def commit_courant():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparer(avant: dict, apres: dict):
+    """Affiche le rapport apres/avant de chaque mesure commune (> 1 veut dire plus lent)"""
+    for nom in sorted(apres["resultats"]):
+        if nom in avant["resultats"]:
+            a = avant["resultats"][nom]["par_appel_s"]
+            b = apres["resultats"][nom]["par_appel_s"]
+            print(f"{nom:45s} {a * 1e6:12.2f} µs -> {b * 1e6:12.2f} µs  x{b / a:.2f}")
+
+
+GROUPES = ("routage", "grilles", "geocodage", "rendu", "demarrage")
+BUDGET_DEMARRAGE_MS = 120  # au-delà, --budget fait échouer le banc d'essai (code de sortie 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai de la simulation STM.")
+    parser.add_argument("-o", "--sortie", default="bench.json", help="fichier JSON des résultats")
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES, help="tailles des grilles synthétiques")
+    parser.add_argument("--seulement", choices=GROUPES, nargs="+", default=GROUPES)
+    parser.add_argument("--comparer", help="fichier JSON d'une exécution précédente")
+    parser.add_argument("--graine", type=int, default=GRAINE)
+    parser.add_argument("--budget", type=float, nargs="?", const=BUDGET_DEMARRAGE_MS, metavar="MS",
+                        help="échouer si la première image de main.py prend plus de MS millisecondes")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.graine)
+    random.seed(args.graine)  # les confettis utilisent le module random
+    resultats = {}
+    if "routage" in args.seulement:
+        bench_routage(resultats, rng)
+    if "grilles" in args.seulement:
+        bench_grilles(resultats, rng, args.tailles)
+    if "geocodage" in args.seulement:
+        bench_geocodage(resultats, rng)
+    if "rendu" in args.seulement:
+        bench_rendu(resultats, rng)
+    if "demarrage" in args.seulement or args.budget:
+        bench_demarrage(resultats)
+
+    sortie = {
+        "meta": {
+            "commit": commit_courant(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plateforme": platform.platform(),
+            "graine": args.graine,
+        },
+        "resultats": resultats,
+    }
+    with open(args.sortie, "w", encoding="utf-8") as f:
+        json.dump(sortie, f, indent=2, ensure_ascii=False)
+    for nom, r in resultats.items():
+        print(f"{nom:45s} {r['par_appel_s'] * 1e6:12.2f} µs")
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            comparer(json.load(f), sortie)
+    if args.budget:
+        demarrage_ms = resultats["demarrage/premiere_image"]["par_appel_s"] * 1000
+        if demarrage_ms > args.budget:
+            print(f"démarrage trop lent: {demarrage_ms:.1f} ms > budget de {args.budget:.0f} ms")
+            sys.exit(1)
+        print(f"démarrage: {demarrage_ms:.1f} ms (budget {args.budget:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Cache borné (LRU, avec durée de vie optionnelle) des résultats de routage
+# La clé contient le jeton et la version du graphe (de chaque graphe si le
+# résultat dépend de plusieurs): dès que Graphe.ajouteArete ou Graphe.modifiePoids
+# change un de ces graphes, les anciennes entrées ne sont plus jamais retrouvées
+# et finissent par sortir du cache. Le jeton (Graphe.jeton) n'est jamais réutilisé,
+# contrairement à id(): un nouveau graphe ne retrouve pas les entrées d'un ancien
+
+from __future__ import annotations
+from collections import OrderedDict
+import time
+
+
+class CacheRoutes:
+    def __init__(self, capacite: int = 1024, duree: float | None = None, horloge=time.monotonic):
+        """capacite: nombre maximal d'entrées; duree: durée de vie d'une entrée en secondes (None = illimitée)"""
+        self._capacite = capacite
+        self._duree = duree
+        self._horloge = horloge
+        self._entrees: OrderedDict = OrderedDict()  # clé -> (moment de l'ajout, résultat), la plus récente à la fin
+        self.succes = 0
+        self.echecs = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def cle(g, origine, destination, mode: str = ""):
+        """Clé d'une requête: ((jeton, version) de chaque graphe, origine, destination, mode); g est un graphe
+        ou un tuple de tous les graphes dont dépend le résultat"""
+        graphes = g if isinstance(g, tuple) else (g,)
+        return tuple((x.jeton(), x.version()) for x in graphes), str(origine), str(destination), mode
+
+    def obtient(self, g, origine, destination, mode: str, calcul):
+        """Retourne le résultat en cache, ou appelle calcul() et garde son résultat"""
+        cle = self.cle(g, origine, destination, mode)
+        entree = self._entrees.get(cle)
+        if entree is not None:
+            if self._duree is None or self._horloge() - entree[0] < self._duree:
+                self._entrees.move_to_end(cle)
+                self.succes += 1
+                return entree[1]
+            del self._entrees[cle]
+            self.expirations += 1
+        self.echecs += 1
+        resultat = calcul()
+        self._entrees[cle] = (self._horloge(), resultat)
+        if len(self._entrees) > self._capacite:
+            self._entrees.popitem(last=False)  # la moins récemment utilisée
+            self.evictions += 1
+        return resultat
+
+    def vide(self):
+        """Vide le cache (les compteurs sont gardés)"""
+        self._entrees.clear()
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def stats(self):
+        """Compteurs pour dimensionner le cache"""
+        total = self.succes + self.echecs
+        return {
+            "taille": len(self._entrees),
+            "capacite": self._capacite,
+            "succes": self.succes,
+            "echecs": self.echecs,
+            "taux_succes": self.succes / total if total else 0.0,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+        }
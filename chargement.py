@@ -0,0 +1,230 @@
+# Chargement en flux de réseaux plus grands que data.py (CSV ou GTFS)
+# Les fichiers sont lus une ligne à la fois et transformés en arêtes
+# (origine, destination, poids, ligne) au fil de l'eau: seuls les arrêts et les
+# arêtes déjà vues restent en mémoire, jamais toutes les lignes du fichier. Les
+# arêtes remplissent un Graphe (ajouteAretes) ou un GrapheCompact
+# (GrapheCompact.depuisAretes)
+
+# La région d'une station vient de son attribut "region" (colonne region du CSV,
+# zone_id d'un GTFS par défaut), comme dans data.py
+
+# Format CSV: une station par ligne, dans l'ordre de chaque ligne de métro (comme data.py)
+#   ligne,name,x,y,distance_to_next_station,region
+
+# Utilisation:
+#   python chargement.py --exporte stm.csv
+#   python chargement.py --csv stm.csv --compact
+#   python chargement.py --gtfs dossier_gtfs --poids temps --lignes 1 2
+
+from __future__ import annotations
+import argparse
+from collections import Counter
+import csv
+from itertools import groupby
+import math
+from operator import itemgetter
+import os
+
+from graphelib import Graphe
+from graphecompact import GrapheCompact
+from stations import LIGNES_RAW
+
+COLONNES = ("ligne", "name", "x", "y", "distance_to_next_station", "region")
+FICHIERS_GTFS = ("stops.txt", "trips.txt", "stop_times.txt")  # tout ce que chargeGTFS lit (trips.txt est optionnel)
+RAYON_TERRE = 6_371_000  # mètres
+
+
+def _rangees(chemin: str):
+    """Rangées d'un fichier CSV (dictionnaires), une à la fois; la marque d'ordre d'octets des GTFS est ignorée"""
+    with open(chemin, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+def _nombre(texte: str):
+    return int(texte) if texte.lstrip("-").isdigit() else float(texte)
+
+
+def ajouteAretes(graphe: Graphe, aretes):
+    """Ajoute au graphe chaque arête (origine, destination, poids, ligne) d'un itérable, étiquetée par sa
+    ligne; retourne le graphe"""
+    for origine, destination, poids, ligne in aretes:
+        graphe.ajouteArete(origine, destination, poids, ligne)
+    return graphe
+
+
+def _construit(aretes, oriente: bool, compact: bool):
+    if compact:
+        return GrapheCompact.depuisAretes(aretes, oriente)
+    return ajouteAretes(Graphe(oriente), aretes)
+
+
+# * CSV
+def stationsCSV(chemin: str):
+    """Enregistrements du CSV (comme ceux de data.py, avec leur "ligne"), un à la fois"""
+    for rangee in _rangees(chemin):
+        d = {
+            "ligne": rangee["ligne"],
+            "name": rangee["name"],
+            "x": float(rangee["x"]),
+            "y": float(rangee["y"]),
+            "distance_to_next_station": _nombre(rangee["distance_to_next_station"])
+            if rangee["distance_to_next_station"] else None,
+        }
+        if rangee.get("region"):
+            d["region"] = rangee["region"]
+        yield d
+
+
+def aretesStations(enregistrements, stations: dict | None = None):
+    """Arêtes (origine, destination, poids, ligne) d'enregistrements donnés dans l'ordre des lignes, avec les
+    règles de create_graph; si stations est un dictionnaire, il reçoit le premier enregistrement de chaque nom"""
+    precedent = None
+    for d in enregistrements:
+        if stations is not None:
+            stations.setdefault(d["name"], d)
+        if precedent is not None and precedent["distance_to_next_station"] \
+                and precedent.get("ligne") == d.get("ligne"):
+            yield precedent["name"], d["name"], precedent["distance_to_next_station"], d.get("ligne")
+        precedent = d
+
+
+def chargeCSV(chemin: str, oriente: bool = False, compact: bool = False):
+    """Retourne (graphe, stations): le Graphe (GrapheCompact si compact) du CSV et le premier enregistrement
+    de chaque station"""
+    stations = {}
+    return _construit(aretesStations(stationsCSV(chemin), stations), oriente, compact), stations
+
+
+def exporteCSV(chemin: str, lignes_raw: dict = LIGNES_RAW):
+    """Écrit les listes *_raw (par défaut tout data.py) au format CSV lu par chargeCSV"""
+    with open(chemin, "w", newline="", encoding="utf-8") as f:
+        ecrivain = csv.writer(f)
+        ecrivain.writerow(COLONNES)
+        for ligne, data in lignes_raw.items():
+            for d in data:
+                distance = d["distance_to_next_station"]
+                ecrivain.writerow((ligne, d["name"], d["x"], d["y"], "" if distance is None else distance,
+                                   d.get("region", "")))
+
+
+# * GTFS
+def arretsGTFS(dossier: str, colonne_region: str = "zone_id"):
+    """Lit stops.txt: stop_id -> enregistrement {"name", "x" (longitude), "y" (latitude), "region"}.
+    Les quais et les entrées (parent_station) partagent l'enregistrement de leur station"""
+    arrets = {}
+    parents = {}
+    for rangee in _rangees(os.path.join(dossier, "stops.txt")):
+        d = {"name": rangee["stop_name"], "x": float(rangee["stop_lon"]), "y": float(rangee["stop_lat"])}
+        if rangee.get(colonne_region):
+            d["region"] = rangee[colonne_region]
+        arrets[rangee["stop_id"]] = d
+        if rangee.get("parent_station"):
+            parents[rangee["stop_id"]] = rangee["parent_station"]
+    for arret, parent in parents.items():
+        if parent in arrets:
+            arrets[arret] = arrets[parent]
+    return arrets
+
+
+def voyagesGTFS(dossier: str):
+    """Lit trips.txt: trip_id -> route_id (vide si le fichier est absent)"""
+    chemin = os.path.join(dossier, "trips.txt")
+    if not os.path.exists(chemin):
+        return {}
+    return {rangee["trip_id"]: rangee["route_id"] for rangee in _rangees(chemin)}
+
+
+def distance(a: dict, b: dict):
+    """Distance à vol d'oiseau en mètres entre deux arrêts (haversine)"""
+    x1, y1, x2, y2 = map(math.radians, (a["x"], a["y"], b["x"], b["y"]))
+    h = math.sin((y2 - y1) / 2) ** 2 + math.cos(y1) * math.cos(y2) * math.sin((x2 - x1) / 2) ** 2
+    return round(2 * RAYON_TERRE * math.asin(math.sqrt(h)), 2)
+
+
+def _secondes(heure: str):
+    """"25:10:00" -> secondes (les heures GTFS peuvent dépasser 24)"""
+    h, m, s = map(int, heure.split(":"))
+    return h * 3600 + m * 60 + s
+
+
+def aretesGTFS(dossier: str, arrets: dict, poids: str = "distance", lignes=None, oriente: bool = False):
+    """Arêtes (origine, destination, poids, ligne) entre arrêts consécutifs des voyages de stop_times.txt,
+    chacune une seule fois par ligne (un segment servi par plusieurs lignes garde le poids de la première
+    et reçoit l'étiquette de chacune). Les rangées d'un même voyage doivent se suivre, comme dans les flux GTFS usuels.
+    poids: "distance" (mètres, à vol d'oiseau) ou "temps" (secondes, selon le premier voyage qui passe);
+    lignes: route_id à garder (toutes si None). Un arrêt absent de stops.txt lève ValueError"""
+    if poids not in ("distance", "temps"):
+        raise ValueError(f"poids inconnu: {poids}")
+    lignes = None if lignes is None else set(lignes)
+    voyages = voyagesGTFS(dossier)
+    vues = set()  # ((origine, destination), ligne) déjà émises
+    poids_segments = {}  # (origine, destination) -> poids de la première émission
+    for voyage, rangees in groupby(_rangees(os.path.join(dossier, "stop_times.txt")), key=itemgetter("trip_id")):
+        ligne = voyages.get(voyage)
+        if lignes is not None and ligne not in lignes:
+            continue
+        rangees = sorted(rangees, key=lambda r: int(r["stop_sequence"]))  # un seul voyage en mémoire
+        for r1, r2 in zip(rangees, rangees[1:]):
+            try:
+                a = arrets[r1["stop_id"]]
+                b = arrets[r2["stop_id"]]
+            except KeyError as erreur:
+                raise ValueError(f"voyage {voyage}: arrêt {erreur.args[0]} absent de stops.txt") from None
+            cle = (a["name"], b["name"])
+            if a["name"] == b["name"] or (cle, ligne) in vues:
+                continue
+            vues.add((cle, ligne))
+            if not oriente:
+                vues.add((cle[::-1], ligne))
+            if cle in poids_segments:
+                p = poids_segments[cle]
+            elif poids == "temps" and r1["departure_time"] and r2["arrival_time"]:
+                p = _secondes(r2["arrival_time"]) - _secondes(r1["departure_time"])
+            else:
+                p = distance(a, b)  # les arrêts sans heure n'ont que leur distance
+            poids_segments[cle] = p
+            if not oriente:
+                poids_segments[cle[::-1]] = p
+            yield a["name"], b["name"], p, ligne
+
+
+def chargeGTFS(dossier: str, poids: str = "distance", lignes=None, oriente: bool = False, compact: bool = False,
+               colonne_region: str = "zone_id"):
+    """Retourne (graphe, stations) pour un flux GTFS décompressé dans dossier: les arrêts de même nom sont
+    un seul sommet (comme les correspondances de data.py) et stations garde le premier enregistrement de
+    chaque nom"""
+    arrets = arretsGTFS(dossier, colonne_region)
+    stations = {}
+    for d in arrets.values():
+        stations.setdefault(d["name"], d)
+    return _construit(aretesGTFS(dossier, arrets, poids, lignes, oriente), oriente, compact), stations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Charge un réseau CSV ou GTFS en flux et résume le graphe.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="fichier CSV (ligne,name,x,y,distance_to_next_station,region)")
+    source.add_argument("--gtfs", help="dossier d'un flux GTFS décompressé")
+    source.add_argument("--exporte", help="écrit data.py dans ce fichier CSV")
+    parser.add_argument("--compact", action="store_true", help="construit un GrapheCompact")
+    parser.add_argument("--oriente", action="store_true")
+    parser.add_argument("--poids", choices=("distance", "temps"), default="distance", help="GTFS seulement")
+    parser.add_argument("--lignes", nargs="+", help="route_id à garder (GTFS seulement)")
+    args = parser.parse_args(argv)
+
+    if args.exporte:
+        exporteCSV(args.exporte)
+        print(args.exporte)
+        return
+    if args.csv:
+        graphe, stations = chargeCSV(args.csv, args.oriente, args.compact)
+    else:
+        graphe, stations = chargeGTFS(args.gtfs, args.poids, args.lignes, args.oriente, args.compact)
+    n = graphe.nbSommets() if args.compact else len(graphe.listeSommets())
+    print(f"{n} sommets, {len(stations)} stations")
+    for region, nombre in Counter(d.get("region", "") for d in stations.values()).most_common():
+        print(f"  {region or '(sans région)'}: {nombre}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Chronométrage des images de la boucle de jeu
+# Chaque mesure est rangée sous un nom (l'état du jeu ou l'étape de rendu) et
+# on garde les dernières durées de chaque nom pour en tirer les centiles
+
+from __future__ import annotations
+from collections import deque
+from contextlib import contextmanager
+import json
+import time
+
+FENETRE = 3600  # nombre de durées gardées par nom (une minute à 60 images par seconde)
+
+
+class ChronoImages:
+    def __init__(self, fenetre: int = FENETRE, horloge=time.perf_counter):
+        self._fenetre = fenetre
+        self._horloge = horloge
+        self._durees: dict[str, deque] = {}  # nom -> dernières durées, en secondes
+        self.compteurs: dict[str, int] = {}  # événements comptés (par exemple les pas de simulation sautés)
+
+    def ajoute(self, nom: str, secondes: float):
+        """Ajoute une durée sous ce nom"""
+        durees = self._durees.get(nom)
+        if durees is None:
+            durees = self._durees[nom] = deque(maxlen=self._fenetre)
+        durees.append(secondes)
+
+    @contextmanager
+    def mesure(self, nom: str):
+        """Chronomètre le bloc with et ajoute sa durée sous ce nom"""
+        debut = self._horloge()
+        try:
+            yield
+        finally:
+            self.ajoute(nom, self._horloge() - debut)
+
+    def compte(self, nom: str, n: int = 1):
+        self.compteurs[nom] = self.compteurs.get(nom, 0) + n
+
+    def centiles(self, nom: str):
+        """Retourne {"n", "p50_ms", "p95_ms", "p99_ms", "max_ms"} pour ce nom (rang le plus proche)"""
+        durees = sorted(self._durees.get(nom, ()))
+        if not durees:
+            return {"n": 0}
+        n = len(durees)
+
+        def centile(p):
+            return durees[min(n - 1, max(0, -(-p * n // 100) - 1))] * 1000
+
+        return {"n": n, "p50_ms": centile(50), "p95_ms": centile(95), "p99_ms": centile(99),
+                "max_ms": durees[-1] * 1000}
+
+    def rapport(self):
+        """Centiles de chaque nom et compteurs, prêts pour json.dump"""
+        return {"durees": {nom: self.centiles(nom) for nom in sorted(self._durees)},
+                "compteurs": dict(self.compteurs)}
+
+    def texte(self):
+        """Une ligne par nom: p50/p95/p99 en millisecondes"""
+        lignes = []
+        for nom in sorted(self._durees):
+            c = self.centiles(nom)
+            lignes.append(f"{nom:16s} {c['p50_ms']:6.2f} {c['p95_ms']:6.2f} {c['p99_ms']:6.2f} ms")
+        lignes += [f"{nom:16s} {n}" for nom, n in sorted(self.compteurs.items())]
+        return "\n".join(lignes)
+
+    def sauve(self, chemin: str):
+        """Écrit le rapport dans un fichier JSON"""
+        with open(chemin, "w", encoding="utf-8") as f:
+            json.dump(self.rapport(), f, indent=2, ensure_ascii=False)
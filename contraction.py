@@ -0,0 +1,326 @@
+# Hiérarchies de contraction (CH) pour les grands réseaux
+# Prétraitement hors ligne: les sommets sont contractés un à un, du moins au plus
+# important; chaque contraction ajoute des raccourcis (u -> w passant par v) quand
+# aucun autre chemin aussi court n'existe entre u et w ("témoin")
+
+# Une requête est une recherche montante depuis chaque extrémité (vers des sommets
+# de rang plus élevé seulement); les deux se rejoignent au sommet de plus petit
+# total, puis les raccourcis sont dépliés pour retrouver la suite de stations que
+# ROUTE attend
+
+# Utilisation:
+#   python contraction.py construire stm.ch
+#   python contraction.py verifier stm.ch --paires 1000
+#   python contraction.py construire grille.ch --grille 10000
+
+from __future__ import annotations
+from array import array
+import argparse
+import heapq
+import math
+import random
+import struct
+import sys
+
+from graphecompact import GrapheCompact
+from graphelib import plusCourtsChemins, remonteChemin
+
+MAGIC = b"STMC"
+VERSION = 1
+LIMITE_TEMOIN = 500  # nombre maximal de sommets fixés par une recherche de témoin
+
+
+class _Contracteur:
+    """État de la contraction: le graphe restant (arêtes sortantes et entrantes) et les arêtes montantes"""
+
+    def __init__(self, g: GrapheCompact):
+        n = g.nbSommets()
+        self.sortants = [{} for _ in range(n)]  # u -> {w: poids}
+        self.entrants = [{} for _ in range(n)]  # w -> {u: poids}
+        self.milieux = {}  # (u, w) -> sommet contracté remplacé par le raccourci u -> w, -1 pour une arête d'origine
+        for u in range(n):
+            for w, p in g.voisins(u):
+                if u != w and p < self.sortants[u].get(w, math.inf):
+                    self.sortants[u][w] = p
+                    self.entrants[w][u] = p
+                    self.milieux[u, w] = -1
+        self.contracte = [False] * n
+        self.niveau = [0] * n  # nombre de voisins déjà contractés (répartit les contractions dans le graphe)
+        self.rang = [0] * n
+        self.montants = []  # toutes les arêtes (u, w, poids, milieu) du graphe augmenté
+
+    def _temoin(self, u: int, v: int, limite: float):
+        """Poids des plus courts chemins depuis u sans passer par v, jusqu'au poids limite"""
+        sortants = self.sortants
+        # v est marqué comme déjà atteint (poids -inf): aucun chemin ne peut passer par lui
+        distance = plusCourtsChemins([(u, 0)], lambda x: sortants[x].items(), distance={v: -math.inf},
+                                     limite=limite, max_fixes=LIMITE_TEMOIN)[0]
+        del distance[v]
+        return distance
+
+    def raccourcis(self, v: int):
+        """Liste les raccourcis (u, w, poids) nécessaires si v est contracté"""
+        resultat = []
+        sortants = self.sortants[v]
+        if not sortants:
+            return resultat
+        max_sortant = max(sortants.values())
+        for u, pu in self.entrants[v].items():
+            distance = self._temoin(u, v, pu + max_sortant)
+            for w, pw in sortants.items():
+                if w != u and distance.get(w, math.inf) > pu + pw:
+                    resultat.append((u, w, pu + pw))
+        return resultat
+
+    def priorite(self, v: int):
+        """Différence d'arêtes (raccourcis ajoutés - arêtes retirées) plus le niveau du sommet"""
+        ajoutes = len(self.raccourcis(v))
+        retires = len(self.entrants[v]) + len(self.sortants[v])
+        return ajoutes - retires + self.niveau[v]
+
+    def contracter(self, v: int, rang: int):
+        for u, w, p in self.raccourcis(v):
+            if p < self.sortants[u].get(w, math.inf):
+                self.sortants[u][w] = p
+                self.entrants[w][u] = p
+                self.milieux[u, w] = v
+        for w, p in self.sortants[v].items():
+            self.montants.append((v, w, p, self.milieux[v, w]))
+            del self.entrants[w][v]
+            self.niveau[w] += 1
+        for u, p in self.entrants[v].items():
+            self.montants.append((u, v, p, self.milieux[u, v]))
+            del self.sortants[u][v]
+            self.niveau[u] += 1
+        self.sortants[v] = {}
+        self.entrants[v] = {}
+        self.contracte[v] = True
+        self.rang[v] = rang
+
+
+def _voisinsCSR(tampons):
+    """Fonction voisins(x) de plusCourtsChemins pour des tampons CSR (debuts, cibles, poids, milieux)"""
+    debuts, cibles, poids, _ = tampons
+    return lambda x: zip(cibles[debuts[x]:debuts[x + 1]], poids[debuts[x]:debuts[x + 1]])
+
+
+def _csr(n: int, aretes):
+    """Tampons CSR (debuts, cibles, poids, milieux) à partir d'arêtes (source, cible, poids, milieu)"""
+    par_source = [[] for _ in range(n)]
+    for source, cible, p, milieu in aretes:
+        par_source[source].append((cible, p, milieu))
+    debuts = array('q', [0])
+    cibles = array('i')
+    poids = array('d')
+    milieux = array('i')
+    for liste in par_source:
+        for cible, p, milieu in liste:
+            cibles.append(cible)
+            poids.append(p)
+            milieux.append(milieu)
+        debuts.append(len(cibles))
+    return debuts, cibles, poids, milieux
+
+
+class HierarchieContraction:
+    def __init__(self, noms, rang, montant, descendant):
+        """montant: arêtes u -> w avec rang[u] < rang[w], rangées par u;
+        descendant: arêtes u -> w avec rang[u] > rang[w], rangées par w (parcourues à l'envers)"""
+        self._noms = [str(nom) for nom in noms]  # comme dans le fichier, où les noms sont des chaînes
+        self._index = {nom: i for i, nom in enumerate(self._noms)}
+        self._rang = rang
+        self._montant = montant
+        self._descendant = descendant
+
+    @classmethod
+    def construire(cls, g):
+        """Contracte tous les sommets d'un Graphe (ou d'un GrapheCompact)"""
+        if not isinstance(g, GrapheCompact):
+            g = GrapheCompact.depuisGraphe(g)
+        n = g.nbSommets()
+        c = _Contracteur(g)
+        tas = [(c.priorite(v), v) for v in range(n)]
+        heapq.heapify(tas)
+        rang = 0
+        while tas:
+            _, v = heapq.heappop(tas)
+            if c.contracte[v]:
+                continue
+            # mise à jour paresseuse: la priorité a pu changer depuis qu'elle a été calculée
+            p = c.priorite(v)
+            if tas and p > tas[0][0]:
+                heapq.heappush(tas, (p, v))
+                continue
+            c.contracter(v, rang)
+            rang += 1
+
+        montant = [(u, w, p, m) for u, w, p, m in c.montants if c.rang[u] < c.rang[w]]
+        descendant = [(w, u, p, m) for u, w, p, m in c.montants if c.rang[u] > c.rang[w]]
+        return cls(g.listeSommets(), array('i', c.rang), _csr(n, montant), _csr(n, descendant))
+
+    def nbRaccourcis(self):
+        return sum(1 for m in self._montant[3] if m != -1) + sum(1 for m in self._descendant[3] if m != -1)
+
+    def _milieu(self, u: int, w: int):
+        """Retourne (poids, milieu) de l'arête u -> w du graphe augmenté"""
+        if self._rang[u] < self._rang[w]:
+            debuts, cibles, poids, milieux = self._montant
+            source, cible = u, w
+        else:
+            debuts, cibles, poids, milieux = self._descendant
+            source, cible = w, u
+        meilleur = (math.inf, -1)
+        for k in range(debuts[source], debuts[source + 1]):
+            if cibles[k] == cible and poids[k] < meilleur[0]:
+                meilleur = (poids[k], milieux[k])
+        return meilleur
+
+    def _deplier(self, u: int, w: int, chemin: list):
+        """Ajoute à chemin les sommets après u jusqu'à w, en remplaçant chaque raccourci par ses deux arêtes"""
+        pile = [(u, w)]
+        while pile:
+            a, b = pile.pop()
+            _, milieu = self._milieu(a, b)
+            if milieu == -1:
+                chemin.append(b)
+            else:
+                pile.append((milieu, b))
+                pile.append((a, milieu))
+
+    def plusCourtChemin(self, origine: str, destination: str):
+        """Retourne {"w": poids, "p": [noms]} comme main.dijkstra"""
+        s = self._index[origine]
+        t = self._index[destination]
+        if s == t:
+            return {"w": 0, "p": [origine]}
+        # les deux recherches ne montent que vers des sommets de rang plus élevé: elles restent petites.
+        # La recherche depuis t s'arrête d'explorer un sommet dès qu'il ne peut plus améliorer la rencontre
+        haut, precedent_haut, _ = plusCourtsChemins([(s, 0)], _voisinsCSR(self._montant))
+        descendant = _voisinsCSR(self._descendant)
+        bas = {}
+        meilleur = math.inf
+        rencontre = -1
+
+        def voisins(x):
+            nonlocal meilleur, rencontre
+            d = bas[x]
+            if x in haut and d + haut[x] < meilleur:
+                meilleur = d + haut[x]
+                rencontre = x
+            return descendant(x) if d < meilleur else ()
+
+        _, precedent_bas, _ = plusCourtsChemins([(t, 0)], voisins, distance=bas)
+        if rencontre == -1:
+            return {"w": math.inf, "p": [destination]}
+        # sommets du graphe augmenté: de s jusqu'à la rencontre, puis de la rencontre jusqu'à t
+        haut = remonteChemin(precedent_haut, rencontre)
+        haut.extend(reversed(remonteChemin(precedent_bas, rencontre)[:-1]))
+        chemin = [s]
+        for a, b in zip(haut, haut[1:]):
+            self._deplier(a, b, chemin)
+        return {"w": meilleur, "p": [self._noms[i] for i in chemin]}
+
+    def sauve(self, chemin: str):
+        """Écrit la structure de requête: en-tête, noms, rangs, puis les tampons montants et descendants"""
+        with open(chemin, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<HBI", VERSION, sys.byteorder == "little", len(self._noms)))
+            noms = "\0".join(self._noms).encode("utf-8")
+            f.write(struct.pack("<I", len(noms)))
+            f.write(noms)
+            self._rang.tofile(f)
+            for debuts, cibles, poids, milieux in (self._montant, self._descendant):
+                f.write(struct.pack("<Q", len(cibles)))
+                debuts.tofile(f)
+                cibles.tofile(f)
+                poids.tofile(f)
+                milieux.tofile(f)
+
+    @classmethod
+    def charge(cls, chemin: str):
+        """Lit un fichier écrit par sauve"""
+        with open(chemin, "rb") as f:
+            if f.read(4) != MAGIC:
+                raise ValueError(f"{chemin} n'est pas une hiérarchie de contraction")
+            version, petit_boutiste, n = struct.unpack("<HBI", f.read(7))
+            if version != VERSION or bool(petit_boutiste) != (sys.byteorder == "little"):
+                raise ValueError(f"{chemin}: version ou boutisme incompatible")
+            (taille,) = struct.unpack("<I", f.read(4))
+            noms = f.read(taille).decode("utf-8").split("\0") if n else []
+            rang = array('i')
+            rang.fromfile(f, n)
+            tampons = []
+            for _ in range(2):
+                (m,) = struct.unpack("<Q", f.read(8))
+                debuts, cibles, poids, milieux = array('q'), array('i'), array('d'), array('i')
+                debuts.fromfile(f, n + 1)
+                cibles.fromfile(f, m)
+                poids.fromfile(f, m)
+                milieux.fromfile(f, m)
+                tampons.append((debuts, cibles, poids, milieux))
+        return cls(noms, rang, tampons[0], tampons[1])
+
+
+def verifier(g, ch: HierarchieContraction, paires: int = 1000, graine: int | None = None):
+    """Compare ch à dijkstra sur des paires aléatoires de g; retourne la liste des paires en désaccord"""
+    from routage import dijkstra
+    rng = random.Random(graine)
+    sommets = g.listeSommets()
+    par_nom = {str(s): s for s in sommets}
+    erreurs = []
+    for _ in range(paires):
+        a, b = rng.choice(sommets), rng.choice(sommets)
+        attendu = dijkstra(g, a, b)
+        obtenu = ch.plusCourtChemin(str(a), str(b))
+        # le chemin peut différer à poids égal: on vérifie son poids et chacune de ses arêtes
+        poids = 0
+        valide = obtenu["p"][0] == str(a) and obtenu["p"][-1] == str(b)
+        for x, y in zip(obtenu["p"], obtenu["p"][1:]):
+            p = par_nom[x].poids(par_nom[y]) if x in par_nom and y in par_nom else None
+            if p is None:
+                valide = False
+                break
+            poids += p
+        if attendu["w"] == math.inf:
+            valide = obtenu["w"] == math.inf
+        elif not valide or abs(poids - attendu["w"]) > 1e-6 * max(1, attendu["w"]) \
+                or abs(obtenu["w"] - attendu["w"]) > 1e-6 * max(1, attendu["w"]):
+            valide = False
+        if not valide:
+            erreurs.append((str(a), str(b), attendu["w"], obtenu["w"]))
+    return erreurs
+
+
+def _graphe(args):
+    if args.grille:
+        from benchmarks import grille
+        return grille(args.grille, random.Random(args.graine))[0]
+    from routage import STM
+    return STM
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hiérarchies de contraction pour le routage STM.")
+    parser.add_argument("action", choices=("construire", "verifier"))
+    parser.add_argument("fichier", help="fichier de la hiérarchie (écrit par construire, lu par verifier)")
+    parser.add_argument("--grille", type=int, help="utiliser une grille synthétique d'environ N sommets au lieu de STM")
+    parser.add_argument("--paires", type=int, default=1000)
+    parser.add_argument("--graine", type=int, default=2023)
+    args = parser.parse_args(argv)
+
+    g = _graphe(args)
+    if args.action == "construire":
+        ch = HierarchieContraction.construire(g)
+        ch.sauve(args.fichier)
+        print(f"{len(g.listeSommets())} sommets, {ch.nbRaccourcis()} raccourcis -> {args.fichier}")
+    else:
+        ch = HierarchieContraction.charge(args.fichier)
+        erreurs = verifier(g, ch, args.paires, args.graine)
+        for erreur in erreurs[:10]:
+            print("désaccord:", erreur)
+        print(f"{args.paires - len(erreurs)}/{args.paires} paires identiques à dijkstra")
+        sys.exit(1 if erreurs else 0)
+
+
+if __name__ == "__main__":
+    main()
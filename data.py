@@ -1,4 +1,4 @@
-# TODO: metro connection/correspondence
+# Une station sans "region" est sur l'île de Montréal
 
 orange_raw = [
     {
@@ -168,18 +168,21 @@ orange_raw = [
         "y": 0.4375,
         "distance_to_next_station": 2073.60,
         "name": "Cartier",
+        "region": "laval",
     },
     {
         "x": -0.3140625,
         "y": 0.45625,
         "distance_to_next_station": 847.60,
         "name": "De La Concorde",
+        "region": "laval",
     },
     {
         "x": -0.4125,
         "y": 0.4578125,
         "distance_to_next_station": None,
         "name": "Montmorency",
+        "region": "laval",
     },
 ]
 green_raw = [
@@ -434,11 +437,13 @@ yellow_raw = [
         "y": -0.0609375,
         "distance_to_next_station": 1572.10,
         "name": "Jean-Drapeau",
+        "region": "ile_sainte_helene",
     },
     {
         "x": 0.328125,
         "y": -0.028125,
         "distance_to_next_station": None,
         "name": "Longueuil",
+        "region": "rive_sud",
     },
 ]
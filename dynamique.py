@@ -0,0 +1,124 @@
+# Routes dynamiques: plus courts chemins qui suivent les changements de poids d'un Graphe
+# (ralentissements, fermetures de segments) sans tout recalculer
+
+# On garde l'arbre des plus courts chemins de chaque origine déjà demandée (une
+# "ligne" de la table de tous les plus courts chemins). À chaque changement noté
+# dans le journal du graphe, seuls les arbres touchés sont réparés:
+# - poids qui augmente: seulement si l'arête fait partie de l'arbre; le sous-arbre
+#   sous l'arête est détaché puis reconstruit depuis ses voisins restés en place
+# - poids qui diminue: seulement si l'arête raccourcit un chemin; l'amélioration
+#   est propagée à partir de l'extrémité de l'arête
+
+from __future__ import annotations
+import math
+from operator import methodcaller
+
+from graphelib import Graphe, Sommet, plusCourtsChemins, remonteChemin
+
+_aretes = methodcaller("aretes")
+
+
+class RoutesDynamiques:
+    def __init__(self, g: Graphe):
+        self._g = g
+        self._position = g.nbChangements()  # prochain changement du journal à traiter
+        self._arbres: dict[Sommet, tuple[dict, dict]] = {}  # origine -> (poids, prédécesseurs)
+        self._entrants = None  # voisins entrants, seulement pour un graphe orienté
+        self.repares = 0  # nombre total d'arbres réparés
+
+    def _voisinsEntrants(self, x: Sommet):
+        if not self._g.estOriente():
+            return x.listeVoisins()
+        if self._entrants is None:
+            self._entrants = {}
+            for a, b, _ in self._g.listeAretes():
+                self._entrants.setdefault(b, []).append(a)
+        return self._entrants.get(x, ())
+
+    def _arbre(self, origine: Sommet):
+        if origine not in self._arbres:
+            distance, precedent, _ = plusCourtsChemins([(origine, 0)], _aretes)
+            self._arbres[origine] = (distance, precedent)
+        return self._arbres[origine]
+
+    def _augmente(self, arbre, u: Sommet, v: Sommet):
+        """Répare un arbre après l'augmentation du poids de u -> v; retourne True si l'arbre a changé"""
+        distance, precedent = arbre
+        if v not in precedent or precedent[v] is not u:
+            return False
+        enfants: dict = {}
+        for x, p in precedent.items():
+            if p is not None:
+                enfants.setdefault(p, []).append(x)
+        detaches = set()
+        pile = [v]
+        while pile:
+            x = pile.pop()
+            detaches.add(x)
+            pile.extend(enfants.get(x, ()))
+        for x in detaches:
+            del distance[x]
+            del precedent[x]
+        # chaque sommet détaché repart du meilleur voisin resté dans l'arbre, puis la recherche continue
+        departs = []
+        for x in detaches:
+            for y in self._voisinsEntrants(x):
+                if y in distance:
+                    nouvelle = distance[y] + y.poids(x)
+                    if nouvelle < distance.get(x, math.inf):
+                        distance[x] = nouvelle
+                        precedent[x] = y
+            if x in distance:
+                departs.append((x, distance[x]))
+        plusCourtsChemins(departs, _aretes, distance=distance, precedent=precedent)
+        return True
+
+    def _diminue(self, arbre, u: Sommet, v: Sommet):
+        """Répare un arbre après la diminution du poids de u -> v; retourne True si l'arbre a changé"""
+        distance, precedent = arbre
+        if u not in distance:
+            return False
+        nouvelle = distance[u] + u.poids(v)
+        if nouvelle >= distance.get(v, math.inf):
+            return False
+        distance[v] = nouvelle
+        precedent[v] = u
+        plusCourtsChemins([(v, nouvelle)], _aretes, distance=distance, precedent=precedent)
+        return True
+
+    def synchronise(self):
+        """Applique les changements du journal notés depuis le dernier appel; retourne le nombre d'arbres réparés"""
+        changements = self._g.journal(self._position)
+        self._position = self._g.nbChangements()  # une vue (SousGraphe) ne retourne que ses changements
+        repares = set()
+        for origine, destination, ancien, nouveau in changements:
+            if ancien == nouveau:
+                continue
+            u = self._g.sommet(origine)
+            v = self._g.sommet(destination)
+            aretes = [(u, v)] if self._g.estOriente() else [(u, v), (v, u)]
+            for source, arbre in self._arbres.items():
+                for a, b in aretes:
+                    if nouveau > ancien:
+                        change = self._augmente(arbre, a, b)
+                    else:
+                        change = self._diminue(arbre, a, b)
+                    if change:
+                        repares.add(source)
+        self.repares += len(repares)
+        return len(repares)
+
+    def route(self, start: Sommet, end: Sommet):
+        """Plus court chemin à jour entre deux sommets; même résultat que main.dijkstra ({"w", "p"})"""
+        self.synchronise()
+        distance, precedent = self._arbre(start)
+        if end not in distance:
+            return {"w": math.inf, "p": [end]}
+        return {"w": distance[end], "p": remonteChemin(precedent, end)}
+
+    def oublie(self, origine: Sommet | None = None):
+        """Retire l'arbre d'une origine (ou tous les arbres) du cache"""
+        if origine is None:
+            self._arbres.clear()
+        else:
+            self._arbres.pop(origine, None)
@@ -0,0 +1,147 @@
+# Export des animations de trajets sans affichage
+# Les mêmes acteurs que main.py (acteurs.py) sont dessinés par rendu.RenduImage,
+# et les images partent au fil de l'eau vers un GIF animé ou un MP4
+
+# Utilisation:
+#   python film.py Côte-Vertu Honoré-Beaugrand -o trajet.gif
+#   python film.py --lot paires.csv --dossier films --processus 4
+#   python film.py --toutes --dossier films --format mp4 --processus 8
+
+from __future__ import annotations
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from itertools import permutations
+import os
+import re
+
+from acteurs import BG_RATIO, BG, ConfettiGroup, Label, User
+from rendu import RenduImage, ecrisAnimation
+from routage import SCREEN_SIZE, get_coord_from_sommet, resolve_station, routes_between
+from stations import REGISTRE
+from trajectoire import Trajectoire
+from tuiles import chargePyramide
+
+DOSSIER = os.path.dirname(os.path.abspath(__file__))
+CARTE = os.path.join(DOSSIER, "stm.gif")
+CARTE_AGRANDIE = os.path.join(DOSSIER, "stmBig.gif")
+IMAGES_PAR_SECONDE = 20  # la simulation avance à 60 pas par seconde, une image est gardée tous les 3 pas
+ATTENTE = 60  # pas immobiles à l'arrivée avant les confettis (comme main.py)
+CONFETTIS = 150  # pas de confettis à la fin (comme main.py)
+
+
+def imagesTrajet(origine: str, destination: str, fps: int = IMAGES_PAR_SECONDE, zoom: float = BG_RATIO):
+    """Génère une à une les images (Pillow) de l'animation du trajet le plus rapide d'origine à destination;
+    zoom n'est respecté qu'avec une pyramide de tuiles (voir tuiles.py)"""
+    nom_origine = resolve_station(origine)
+    nom_destination = resolve_station(destination)
+    if nom_origine is None or nom_destination is None:
+        raise LookupError(f"station introuvable: {origine if nom_origine is None else destination}")
+
+    rendu = RenduImage(SCREEN_SIZE)
+    bg = BG(rendu, CARTE, CARTE_AGRANDIE, chargePyramide(), zoom)
+    user = User(rendu, "#1bcdd0", bg)
+    confetti = ConfettiGroup(rendu)
+    label = Label(rendu)
+
+    route = routes_between(nom_origine, nom_destination)["rapide"]["p"]
+    stations = [tuple(c * SCREEN_SIZE for c in get_coord_from_sommet(station)) for station in route]
+    user.set_destination_from_coord(stations[0])
+    user.show()
+    user.teleport_to_destination()
+    bg.set_dynamic_map()
+    bg.reset_follow_cam_position()
+    user.start_timeline(Trajectoire.depuisStations(user.get_coord(), stations, bg.zoom(), attente=ATTENTE))
+
+    pas = max(1, round(60 / fps))
+    n = 0
+    arrive = False
+    while not arrive:
+        arrive = user.loop()
+        if n % pas == 0:
+            yield rendu.image()
+        n += 1
+
+    user.reset_after_animation()
+    bg.set_normal_map()
+    confetti.reset()
+    label.print("Vous êtes arrivé(e) à votre destination!!!", 0, SCREEN_SIZE / 2 - 80)
+    label.draw()
+    for _ in range(CONFETTIS):
+        confetti.animate()
+        if n % pas == 0:
+            yield rendu.image()
+        n += 1
+
+
+def filme(origine: str, destination: str, chemin: str, fps: int = IMAGES_PAR_SECONDE, zoom: float = BG_RATIO):
+    """Écrit l'animation du trajet dans chemin (.gif, ou .mp4 avec ffmpeg)"""
+    ecrisAnimation(chemin, imagesTrajet(origine, destination, fps, zoom), fps)
+    return chemin
+
+
+def nomFichier(origine: str, destination: str, extension: str):
+    """Nom de fichier sans caractères spéciaux pour un couple de stations"""
+    def propre(nom):
+        return re.sub(r"[^\w-]+", "_", nom).strip("_")
+    return f"{propre(origine)}__{propre(destination)}.{extension}"
+
+
+def _filmeTache(origine: str, destination: str, chemin: str, fps: int, zoom: float):
+    try:
+        return {"origine": origine, "destination": destination,
+                "fichier": filme(origine, destination, chemin, fps, zoom)}
+    except LookupError as erreur:
+        return {"origine": origine, "destination": destination, "erreur": str(erreur)}
+
+
+def filmeLot(paires, dossier: str, extension: str = "gif", processus: int | None = None,
+             fps: int = IMAGES_PAR_SECONDE, zoom: float = BG_RATIO):
+    """Filme chaque couple (origine, destination) dans dossier, réparti sur plusieurs processus;
+    retourne un itérateur de résultats {"origine", "destination", "fichier" ou "erreur"}, dans l'ordre"""
+    os.makedirs(dossier, exist_ok=True)
+    processus = processus or os.cpu_count() or 1
+    paires = list(paires)
+    chemins = [os.path.join(dossier, nomFichier(o, d, extension)) for o, d in paires]
+    if processus == 1:
+        yield from map(_filmeTache, *zip(*paires), chemins, [fps] * len(paires), [zoom] * len(paires))
+        return
+    with ProcessPoolExecutor(max_workers=processus) as pool:
+        yield from pool.map(_filmeTache, [o for o, _ in paires], [d for _, d in paires], chemins,
+                            [fps] * len(paires), [zoom] * len(paires))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporte des animations de trajets STM, sans affichage.")
+    parser.add_argument("stations", nargs="*", help="origine et destination d'un seul trajet")
+    parser.add_argument("-o", "--sortie", help="fichier de l'animation d'un seul trajet (.gif ou .mp4)")
+    parser.add_argument("--lot", help="CSV de couples (origine, destination) avec en-tête")
+    parser.add_argument("--toutes", action="store_true", help="tous les couples de stations")
+    parser.add_argument("--dossier", default="films", help="dossier des animations d'un lot")
+    parser.add_argument("--format", choices=("gif", "mp4"), default="gif")
+    parser.add_argument("--processus", type=int, help="nombre de processus pour un lot (tous par défaut)")
+    parser.add_argument("--fps", type=int, default=IMAGES_PAR_SECONDE)
+    parser.add_argument("--zoom", type=float, default=BG_RATIO, help="agrandissement de la carte qui suit le "
+                                                                      "joueur (avec une pyramide de tuiles)")
+    args = parser.parse_args(argv)
+
+    if args.stations:
+        if len(args.stations) != 2:
+            parser.error("il faut une origine et une destination")
+        origine, destination = args.stations
+        print(filme(origine, destination, args.sortie or nomFichier(origine, destination, args.format), args.fps,
+                    args.zoom))
+        return
+    if args.toutes:
+        paires = permutations(sorted(s.nom for s in REGISTRE), 2)
+    elif args.lot:
+        with open(args.lot, newline="", encoding="utf-8") as f:
+            paires = [tuple(ligne[:2]) for ligne in list(csv.reader(f))[1:]]
+    else:
+        parser.error("donnez deux stations, --lot ou --toutes")
+    for resultat in filmeLot(paires, args.dossier, args.format, args.processus, args.fps, args.zoom):
+        print(resultat.get("fichier") or f"{resultat['origine']} -> {resultat['destination']}: {resultat['erreur']}")
+
+
+if __name__ == "__main__":
+    main()
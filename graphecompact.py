@@ -0,0 +1,172 @@
+# Représentation compacte d'un graphe (format CSR, "compressed sparse row")
+# Les sommets sont numérotés de 0 à n-1 et un index associe les noms aux numéros
+
+# Les voisins du sommet i sont cibles[debuts[i]:debuts[i + 1]] et les poids
+# des arêtes correspondantes sont poids[debuts[i]:debuts[i + 1]]
+
+# Un GrapheCompact est figé: on le construit à partir d'un Graphe, des listes
+# *_raw de data.py ou d'un flux d'arêtes (voir chargement.py), puis on ne fait que le lire
+# (les tampons peuvent aussi être des memoryview sur un fichier, voir instantane.py)
+
+from __future__ import annotations
+from array import array
+import math
+
+from graphelib import Graphe, plusCourtsChemins, remonteChemin
+
+
+class GrapheCompact:
+    __slots__ = ("_noms", "_index", "_debuts", "_cibles", "_poids", "_oriente", "_entiers")
+
+    def __init__(self, noms, debuts, cibles, poids, oriente=True, entiers=False):
+        """Crée un graphe compact à partir de tampons déjà construits"""
+        self._noms = list(noms)
+        self._index = {nom: i for i, nom in enumerate(self._noms)}
+        self._debuts = debuts  # array('q') de taille n + 1
+        self._cibles = cibles  # array('i') de taille m
+        self._poids = poids  # array('d') de taille m
+        self._oriente = oriente
+        self._entiers = entiers  # True si tous les poids d'origine étaient des int
+
+    @classmethod
+    def depuisGraphe(cls, g: Graphe):
+        """Construit un graphe compact à partir d'un Graphe"""
+        noms = g.listeSommets(noms=True)
+        index = {s: i for i, s in enumerate(g.listeSommets())}
+        debuts = array('q', [0])
+        cibles = array('i')
+        poids = array('d')
+        entiers = True
+        for s in g.listeSommets():
+            for v in s.listeVoisins():
+                p = s.poids(v)
+                entiers = entiers and isinstance(p, int)
+                cibles.append(index[v])
+                poids.append(p)
+            debuts.append(len(cibles))
+        return cls(noms, debuts, cibles, poids, g.estOriente(), entiers)
+
+    @classmethod
+    def depuisRaw(cls, *listes, oriente=False):
+        """Construit un graphe compact à partir de listes *_raw (mêmes règles que create_graph)"""
+        def aretes():
+            for data in listes:
+                for i in range(len(data) - 1):
+                    if data[i]["distance_to_next_station"]:
+                        yield data[i]["name"], data[i + 1]["name"], data[i]["distance_to_next_station"]
+
+        return cls.depuisAretes(aretes(), oriente)
+
+    @classmethod
+    def depuisAretes(cls, aretes, oriente=False):
+        """Construit un graphe compact à partir d'un itérable (consommé au fil de l'eau) d'arêtes
+        (origine, destination, poids, ...); les éléments après le poids sont ignorés"""
+        index = {}
+        voisins = []  # un dictionnaire cible -> poids par sommet, dans l'ordre d'insertion
+
+        def numero(nom):
+            if nom not in index:
+                index[nom] = len(voisins)
+                voisins.append({})
+            return index[nom]
+
+        for origine, destination, p, *_ in aretes:
+            a = numero(origine)
+            b = numero(destination)
+            voisins[a][b] = p
+            if not oriente and a != b:
+                voisins[b][a] = p
+
+        debuts = array('q', [0])
+        cibles = array('i')
+        poids = array('d')
+        entiers = True
+        for d in voisins:
+            for b, p in d.items():
+                entiers = entiers and isinstance(p, int)
+                cibles.append(b)
+                poids.append(p)
+            debuts.append(len(cibles))
+        return cls(index.keys(), debuts, cibles, poids, oriente, entiers)
+
+    def estOriente(self):
+        return self._oriente
+
+    def poidsEntiers(self):
+        """True si tous les poids d'origine étaient des int"""
+        return self._entiers
+
+    def nbSommets(self):
+        return len(self._noms)
+
+    def nbAretes(self):
+        """Nombre d'entrées dans le tableau des cibles (2 par arête si non orienté)"""
+        return len(self._cibles)
+
+    def indice(self, nom):
+        """Retourne le numéro du sommet de ce nom, ou None"""
+        return self._index.get(nom)
+
+    def nom(self, i):
+        """Retourne le nom du sommet numéro i"""
+        return self._noms[i]
+
+    def listeSommets(self):
+        """Liste les noms de tous les sommets, dans l'ordre des numéros"""
+        return list(self._noms)
+
+    def voisins(self, i):
+        """Itère sur les couples (numéro du voisin, poids) du sommet numéro i"""
+        debut, fin = self._debuts[i], self._debuts[i + 1]
+        return zip(self._cibles[debut:fin], self._poids[debut:fin])
+
+    def poids(self, i, j):
+        """Retourne le poids de l'arête i -> j, ou None"""
+        for v, p in self.voisins(i):
+            if v == j:
+                return p
+        return None
+
+    def tampons(self):
+        """Retourne les tampons (debuts, cibles, poids) tels quels"""
+        return self._debuts, self._cibles, self._poids
+
+    def versNumpy(self):
+        """Retourne les tampons sous forme de vues NumPy (sans copie)"""
+        try:
+            import numpy as np  # optionnel, importé ici seulement: les tampons array suffisent ailleurs
+        except ImportError:
+            raise ImportError("NumPy n'est pas installé") from None
+        return (np.frombuffer(self._debuts, dtype=np.int64),
+                np.frombuffer(self._cibles, dtype=np.int32),
+                np.frombuffer(self._poids, dtype=np.float64))
+
+    def versGraphe(self):
+        """Reconstruit un Graphe aux mêmes sommets, voisins et poids, dans le même ordre. Ce n'est pas l'inverse
+        exact de depuisGraphe, le format CSR ne gardant que les poids:
+        - les étiquettes de lignes des arêtes sont perdues (Graphe.lignes est vide, sousGraphe ne voit rien)
+        - les poids sont des int si tous les poids d'origine l'étaient, sinon ils sont tous des float
+        - le Graphe est neuf: version 0 et journal vide, même si l'original avait été modifié"""
+        g = Graphe(oriente=self._oriente)
+        for nom in self._noms:
+            g.ajouteSommet(nom)
+        sommets = g.listeSommets()
+        for i, s in enumerate(sommets):
+            for j, p in self.voisins(i):
+                s.ajouteVoisin(sommets[j], int(p) if self._entiers else p)
+        return g
+
+    def plusCourtChemin(self, origine: str, destination: str):
+        """Dijkstra directement sur les tampons; retourne {"w": poids, "p": [noms]} comme main.dijkstra
+        (poids int si tous les poids d'origine étaient des int)"""
+        start = self._index[origine]
+        end = self._index[destination]
+        distance, precedent, _ = plusCourtsChemins([(start, 0)], self.voisins, end)
+        if end not in distance:
+            return {"w": math.inf, "p": [destination]}
+        w = distance[end]
+        return {"w": int(w) if self._entiers else w, "p": [self._noms[i] for i in remonteChemin(precedent, end)]}
+
+    def __str__(self):
+        """Représente le graphe comme une chaîne (même format que Graphe)"""
+        return str(self.versGraphe())
@@ -5,12 +5,30 @@
 # dictionnaire qui associe des sommets à des poids d'arêtes)
 
 # version 2: supporte les graphes orientés et non orientés
+# version 3: modification des poids avec un journal des changements
+#            et un numéro de version qui change à chaque modification du graphe
+# version 4: emplacements fixes (__slots__), noms internés, arêtes étiquetées
+#            par ligne et vues d'un graphe restreintes à certaines lignes (SousGraphe)
+# version 5: une seule recherche de plus courts chemins (plusCourtsChemins),
+#            partagée par tous les algorithmes du projet
+# version 6: un jeton par graphe (et par vue), jamais réutilisé, pour les clés de cache
+
+import heapq
+import itertools
+import math
+import sys
+
+_JETONS = itertools.count()  # jetons des graphes et des vues: contrairement à id(), jamais réutilisés
+
 
 class Sommet:
+    __slots__ = ("_nom", "_voisins", "_lignes")
+
     def __init__(self, nom: str):
         """Crée un sommet relié à aucune arête"""
         self._nom = nom
         self._voisins: dict[str, int] = {}
+        self._lignes = None  # voisin -> frozenset des lignes de l'arête, créé à la première étiquette
 
     def ajouteVoisin(self, v, poids: int = 1):
         """Ajoute ou modifie une arête entre moi et v"""
@@ -20,6 +38,10 @@ class Sommet:
         """Liste tous les voisins"""
         return self._voisins.keys()
 
+    def aretes(self):
+        """Liste les couples (voisin, poids) de mes arêtes"""
+        return self._voisins.items()
+
     def estVoisin(self, v):
         """Retourne un booléen: True si je suis voisin de v, False sinon"""
         return v in self._voisins
@@ -30,6 +52,18 @@ class Sommet:
             return self._voisins[v]
         return None
 
+    def lignes(self, v):
+        """Retourne le frozenset des lignes de l'arête qui me connecte à v (vide si elle n'en a pas)"""
+        if self._lignes is None:
+            return frozenset()
+        return self._lignes.get(v, frozenset())
+
+    def ajouteLignes(self, v, lignes: frozenset):
+        """Remplace les lignes de l'arête entre moi et v"""
+        if self._lignes is None:
+            self._lignes = {}
+        self._lignes[v] = lignes
+
     def __str__(self):
         """Retourne mon nom"""
         return str(self._nom)
@@ -39,14 +73,34 @@ class Sommet:
 # C'est un dictionnaire qui associe des noms avec des sommets
 
 class Graphe:
+    __slots__ = ("_sommets", "_oriente", "_journal", "_version", "_ensembles", "_jeton")
+
     def __init__(self, oriente=True):
         """Crée un graphe vide"""
         self._sommets = {}
         self._oriente = oriente
+        self._journal = []  # changements de poids: (origine, destination, ancien poids, nouveau poids)
+        self._version = 0  # augmente à chaque arête ajoutée ou modifiée
+        self._ensembles = {}  # un seul frozenset de lignes par combinaison, partagé par les arêtes
+        self._jeton = next(_JETONS)
+
+    def __setstate__(self, etat):
+        _, emplacements = etat
+        for nom, valeur in emplacements.items():
+            setattr(self, nom, valeur)
+        self._jeton = next(_JETONS)  # une copie (copy, pickle vers un autre processus) peut changer seule
 
     def estOriente(self):
         return self._oriente
 
+    def version(self):
+        """Numéro de version: change dès qu'une arête est ajoutée ou modifiée"""
+        return self._version
+
+    def jeton(self):
+        """Identifiant du graphe, unique pour tout le processus (même après sa destruction, contrairement à id())"""
+        return self._jeton
+
     def sommet(self, nom):
         """Retourne le sommet de ce nom"""
         if nom in self._sommets:
@@ -64,11 +118,13 @@ class Graphe:
         """Ajoute un nouveau sommet"""
         if nom in self._sommets:
             return None  # sommet déjà présent
+        if isinstance(nom, str):
+            nom = sys.intern(nom)  # une seule copie de chaque nom, partagée avec les autres graphes
         nouveauSommet = Sommet(nom)
         self._sommets[nom] = nouveauSommet
 
-    def ajouteArete(self, origine, destination, poids=1):
-        """Relie les deux sommets par une arête.
+    def ajouteArete(self, origine, destination, poids=1, ligne=None):
+        """Relie les deux sommets par une arête, étiquetée par ligne si elle est donnée.
            Crée les sommets s'ils n'existent pas déjà"""
         self.ajouteSommet(origine)  # ne fait rien si les
         self.ajouteSommet(destination)  # sommets existent déjà
@@ -77,6 +133,51 @@ class Graphe:
         s1.ajouteVoisin(s2, poids)
         if not self._oriente and origine != destination:
             s2.ajouteVoisin(s1, poids)
+        if ligne is not None:
+            lignes = s1.lignes(s2) | {ligne}
+            lignes = self._ensembles.setdefault(lignes, lignes)
+            s1.ajouteLignes(s2, lignes)
+            if not self._oriente and origine != destination:
+                s2.ajouteLignes(s1, lignes)
+        self._version += 1
+
+    def lignes(self, origine, destination):
+        """Retourne le frozenset des lignes de l'arête origine -> destination"""
+        s1 = self.sommet(origine)
+        s2 = self.sommet(destination)
+        if s1 is None or s2 is None:
+            return frozenset()
+        return s1.lignes(s2)
+
+    def sousGraphe(self, *lignes):
+        """Vue du graphe restreinte aux arêtes de ces lignes (voir SousGraphe)"""
+        return SousGraphe(self, lignes)
+
+    def modifiePoids(self, origine, destination, poids):
+        """Change le poids d'une arête existante (math.inf pour la fermer)
+           et note le changement dans le journal"""
+        s1 = self.sommet(origine)
+        s2 = self.sommet(destination)
+        if s1 is None or s2 is None or not s1.estVoisin(s2):
+            raise LookupError("Aucune arête entre " + str(origine) + " et " + str(destination))
+        ancien = s1.poids(s2)
+        s1.ajouteVoisin(s2, poids)
+        if not self._oriente and origine != destination:
+            s2.ajouteVoisin(s1, poids)
+        self._journal.append((origine, destination, ancien, poids))
+        self._version += 1
+
+    def fermeArete(self, origine, destination):
+        """Ferme une arête (poids infini), par exemple pour une interruption de service"""
+        self.modifiePoids(origine, destination, math.inf)
+
+    def journal(self, depuis=0):
+        """Liste les changements de poids notés depuis la position donnée"""
+        return self._journal[depuis:]
+
+    def nbChangements(self):
+        """Nombre de changements de poids notés dans le journal"""
+        return len(self._journal)
 
     def listeAretes(self, noms=False):
         """Liste toutes les arêtes"""
@@ -94,3 +195,197 @@ class Graphe:
     def __str__(self):
         """Représente le graphe comme une chaîne"""
         return ', '.join(a + b + ':' + str(c) for (a, b, c) in self.listeAretes(True))
+
+
+# Une vue d'un graphe ne garde que les arêtes étiquetées par certaines lignes
+# Elle ne copie ni les sommets ni les arêtes: ses sommets sont de petits
+# intermédiaires (VueSommet) créés au besoin, égaux aux sommets du parent
+
+class VueSommet:
+    __slots__ = ("_sommet", "_vue")
+
+    def __init__(self, sommet: Sommet, vue):
+        self._sommet = sommet
+        self._vue = vue
+
+    def _garde(self, v):
+        return not self._vue._lignes.isdisjoint(self._sommet.lignes(v))
+
+    def listeVoisins(self):
+        """Liste les voisins reliés par une arête d'une des lignes de la vue"""
+        vue = self._vue
+        return [vue._vueDe(v) for v in self._sommet.listeVoisins() if self._garde(v)]
+
+    def aretes(self):
+        """Liste les couples (voisin, poids) des arêtes d'une des lignes de la vue"""
+        vue = self._vue
+        return [(vue._vueDe(v), p) for v, p in self._sommet.aretes() if self._garde(v)]
+
+    def estVoisin(self, v):
+        v = getattr(v, "_sommet", v)
+        return self._sommet.estVoisin(v) and self._garde(v)
+
+    def poids(self, v):
+        v = getattr(v, "_sommet", v)
+        if self._sommet.estVoisin(v) and self._garde(v):
+            return self._sommet.poids(v)
+        return None
+
+    def lignes(self, v):
+        return self._sommet.lignes(getattr(v, "_sommet", v)) & self._vue._lignes
+
+    def __eq__(self, autre):
+        return self._sommet is getattr(autre, "_sommet", autre)
+
+    def __hash__(self):
+        return hash(self._sommet)
+
+    def __str__(self):
+        return str(self._sommet)
+
+
+class SousGraphe:
+    __slots__ = ("_parent", "_lignes", "_vues", "_membres", "_jeton")
+
+    def __init__(self, parent: Graphe, lignes):
+        """Vue de parent restreinte aux arêtes étiquetées par au moins une des lignes;
+           elle suit les modifications du parent (même numéro de version)"""
+        self._parent = parent
+        self._lignes = frozenset(lignes)
+        self._vues = {}  # sommet du parent -> son VueSommet, pour que chaque sommet n'ait qu'un intermédiaire
+        self._membres = (-1, set())  # (version du parent, sommets touchés par une arête de la vue)
+        self._jeton = next(_JETONS)
+
+    def _vueDe(self, s: Sommet):
+        vue = self._vues.get(s)
+        if vue is None:
+            vue = self._vues[s] = VueSommet(s, self)
+        return vue
+
+    def _sommetsDansVue(self):
+        version, membres = self._membres
+        if version != self._parent.version():
+            membres = set()
+            for s in self._parent.listeSommets():
+                for v in s.listeVoisins():
+                    if not self._lignes.isdisjoint(s.lignes(v)):
+                        membres.add(s)
+                        membres.add(v)
+            self._membres = (self._parent.version(), membres)
+        return membres
+
+    def estOriente(self):
+        return self._parent.estOriente()
+
+    def version(self):
+        return self._parent.version()
+
+    def jeton(self):
+        return self._jeton
+
+    def lignesVues(self):
+        return self._lignes
+
+    def journal(self, depuis=0):
+        """Changements de poids du parent notés depuis la position donnée, sur les arêtes de la vue"""
+        return [c for c in self._parent.journal(depuis)
+                if not self._lignes.isdisjoint(self._parent.lignes(c[0], c[1]))]
+
+    def nbChangements(self):
+        """Position courante dans le journal du parent"""
+        return self._parent.nbChangements()
+
+    def sommet(self, nom):
+        """Retourne le sommet de ce nom s'il touche une arête de la vue"""
+        s = self._parent.sommet(nom)
+        if s is None or s not in self._sommetsDansVue():
+            return None
+        return self._vueDe(s)
+
+    def listeSommets(self, noms=False):
+        """Liste les sommets qui touchent une arête de la vue, dans l'ordre du parent"""
+        membres = self._sommetsDansVue()
+        sommets = [s for s in self._parent.listeSommets() if s in membres]
+        if noms:
+            return [s._nom for s in sommets]
+        return [self._vueDe(s) for s in sommets]
+
+    def listeAretes(self, noms=False):
+        """Liste toutes les arêtes de la vue"""
+        aretes = []
+        for origine in self.listeSommets():
+            for dest in origine.listeVoisins():
+                if not self.estOriente() and str(origine) > str(dest):
+                    continue  # compter chaque arête une seule fois si non oriente
+                if noms:
+                    aretes.append((str(origine), str(dest), origine.poids(dest)))
+                else:
+                    aretes.append((origine, dest, origine.poids(dest)))
+        return aretes
+
+    def __str__(self):
+        """Représente la vue comme une chaîne (même format que Graphe)"""
+        return ', '.join(a + b + ':' + str(c) for (a, b, c) in self.listeAretes(True))
+
+
+# Recherche de plus courts chemins commune à tous les algorithmes du projet (Dijkstra
+# et A* sur un Graphe, sur un GrapheCompact, tables, arbres dynamiques, contraction).
+# Elle ne connaît pas la forme du graphe: voisins(x) donne les couples (voisin, poids)
+# de x, et les sommets peuvent être des Sommet, des numéros ou n'importe quelle clé
+
+def plusCourtsChemins(departs, voisins, arrivee=None, heuristique=None, distance=None, precedent=None,
+                      limite=math.inf, max_fixes=None):
+    """Dijkstra (A* si heuristique(x) minore le poids restant) à partir des couples (sommet, poids de départ).
+    S'arrête quand arrivee est fixé, quand le prochain poids dépasse limite ou après max_fixes sommets fixés.
+    distance et precedent peuvent être ceux d'une recherche précédente: ils sont complétés sur place.
+    Retourne (distance, precedent, fixes) où fixes liste les sommets dans l'ordre où ils ont été fixés (un
+    sommet déjà fixé est rouvert si un chemin plus court l'atteint, ce qu'une heuristique non cohérente permet)"""
+    if distance is None:
+        distance = {}
+    if precedent is None:
+        precedent = {}
+    tas = []  # (poids + heuristique, compteur, poids, sommet); le compteur évite de comparer deux sommets
+    for x, d in departs:
+        if d <= distance.get(x, math.inf):
+            distance[x] = d
+            precedent.setdefault(x, None)
+            tas.append((d + heuristique(x) if heuristique else d, len(tas), d, x))
+    heapq.heapify(tas)
+    compteur = len(tas)
+    fixes = []
+    if max_fixes is None:
+        max_fixes = math.inf
+    pop = heapq.heappop
+    push = heapq.heappush
+    connu = distance.get
+    inf = math.inf
+    while tas:
+        _, _, d, x = pop(tas)
+        if d > distance[x]:
+            continue  # entrée périmée (suppression paresseuse)
+        if d > limite:
+            break
+        fixes.append(x)
+        if x == arrivee:
+            break  # la destination est fixée, inutile d'explorer le reste du graphe
+        for y, p in voisins(x):
+            nouvelle = d + p
+            if nouvelle < connu(y, inf):
+                distance[y] = nouvelle
+                precedent[y] = x
+                push(tas, (nouvelle + heuristique(y) if heuristique else nouvelle, compteur, nouvelle, y))
+                compteur += 1
+        if len(fixes) >= max_fixes:
+            break
+    return distance, precedent, fixes
+
+
+def remonteChemin(precedent: dict, fin):
+    """Liste les sommets du départ jusqu'à fin en remontant les prédécesseurs (None au départ)"""
+    chemin = []
+    x = fin
+    while x is not None:
+        chemin.append(x)
+        x = precedent[x]
+    chemin.reverse()
+    return chemin
@@ -0,0 +1,130 @@
+# Index spatial (arbre k-d en deux dimensions) pour trouver les stations proches
+# L'arbre est construit une seule fois; chaque requête coûte O(log n) en moyenne
+# au lieu de parcourir toutes les stations
+
+# Les requêtes par lot (plusProchesLot) calculent avec NumPy, s'il est installé,
+# les distances de tout un bloc de coordonnées à tous les points en une seule
+# opération vectorisée: pour quelques dizaines de stations, c'est bien plus
+# rapide que de descendre l'arbre une coordonnée à la fois
+
+from __future__ import annotations
+import heapq
+import math
+
+TAILLE_BLOC = 1 << 18  # coordonnées x points calculés d'un coup par plusProchesLot (mémoire bornée)
+_NUMPY = []  # [module numpy, ou None s'il n'est pas installé], rempli à la première utilisation
+
+
+def _numpy():
+    """Importe NumPy (optionnel) seulement pour un premier lot: il coûte cher au démarrage"""
+    if not _NUMPY:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _NUMPY.append(numpy)
+    return _NUMPY[0]
+
+
+class ArbreKD:
+    __slots__ = ("_racine", "_taille", "_points", "_valeurs", "_tableau")
+
+    def __init__(self, points, valeurs):
+        """Construit l'arbre à partir de points (x, y) et de la valeur associée à chacun"""
+        elements = list(zip(points, valeurs))
+        self._taille = len(elements)
+        self._points = [tuple(p) for p, _ in elements]  # pour les lots
+        self._valeurs = [v for _, v in elements]
+        self._tableau = None  # les points en tableau NumPy, créé au premier lot
+        self._racine = self._construire(elements, 0)
+
+    @classmethod
+    def depuisStations(cls, stations: list, echelle: float = 1):
+        """Construit l'arbre à partir d'enregistrements de data.py (coordonnées multipliées par echelle)"""
+        return cls([(d["x"] * echelle, d["y"] * echelle) for d in stations], [d["name"] for d in stations])
+
+    def _construire(self, elements, axe):
+        """Chaque noeud est un tuple (point, valeur, axe, gauche, droite), coupé à la médiane"""
+        if not elements:
+            return None
+        elements.sort(key=lambda e: e[0][axe])
+        milieu = len(elements) // 2
+        point, valeur = elements[milieu]
+        suivant = 1 - axe
+        return (point, valeur, axe,
+                self._construire(elements[:milieu], suivant),
+                self._construire(elements[milieu + 1:], suivant))
+
+    def __len__(self):
+        return self._taille
+
+    def plusProche(self, coord):
+        """Retourne (valeur, distance) du point le plus proche de coord, ou (None, inf) si l'arbre est vide"""
+        meilleur = [None, math.inf]
+        pile = [(self._racine, 0)]  # (noeud, distance minimale possible jusqu'à sa région)
+        while pile:
+            noeud, borne = pile.pop()
+            if noeud is None or borne >= meilleur[1]:
+                continue
+            point, valeur, axe, gauche, droite = noeud
+            d = math.dist(coord, point)
+            if d < meilleur[1]:
+                meilleur[0] = valeur
+                meilleur[1] = d
+            ecart = coord[axe] - point[axe]
+            proche, loin = (gauche, droite) if ecart < 0 else (droite, gauche)
+            pile.append((loin, abs(ecart)))  # l'autre côté peut encore contenir un point plus proche
+            pile.append((proche, borne))  # exploré en premier
+        return meilleur[0], meilleur[1]
+
+    def kPlusProches(self, coord, k: int):
+        """Retourne les k couples (valeur, distance) les plus proches de coord, du plus proche au plus loin"""
+        if k <= 0:
+            return []
+        tas = []  # tas max (distances négatives) des k meilleurs candidats
+        compteur = 0
+        pile = [(self._racine, 0)]
+        while pile:
+            noeud, borne = pile.pop()
+            if noeud is None or (len(tas) == k and borne >= -tas[0][0]):
+                continue
+            point, valeur, axe, gauche, droite = noeud
+            d = math.dist(coord, point)
+            if len(tas) < k:
+                heapq.heappush(tas, (-d, compteur, valeur))
+            elif d < -tas[0][0]:
+                heapq.heapreplace(tas, (-d, compteur, valeur))
+            compteur += 1
+            ecart = coord[axe] - point[axe]
+            proche, loin = (gauche, droite) if ecart < 0 else (droite, gauche)
+            pile.append((loin, abs(ecart)))
+            pile.append((proche, borne))
+        return [(valeur, -d) for d, _, valeur in sorted(tas, key=lambda e: (-e[0], e[1]))]
+
+    def plusProchesLot(self, coords):
+        """Version par lot de plusProche: retourne une liste de (valeur, distance), une par coordonnée, comme
+        plusProche. Avec NumPy, les distances sont calculées par blocs vectorisés; une coordonnée presque à
+        égalité entre deux points repasse par plusProche, qui départage les égalités à sa façon. Sans NumPy,
+        c'est une simple boucle sur plusProche"""
+        coords = list(coords)
+        np = _numpy()
+        if np is None or not coords or not self._taille:
+            return [self.plusProche(c) for c in coords]
+        if self._tableau is None:
+            self._tableau = np.asarray(self._points, dtype=float)
+        xs, ys = self._tableau[:, 0], self._tableau[:, 1]
+        resultat = []
+        bloc = max(1, TAILLE_BLOC // self._taille)
+        for debut in range(0, len(coords), bloc):
+            lot = coords[debut:debut + bloc]
+            q = np.asarray(lot, dtype=float)
+            d = np.hypot(q[:, 0, None] - xs, q[:, 1, None] - ys)
+            meilleurs = d.argmin(axis=1)
+            minimum = d[np.arange(len(lot)), meilleurs]
+            egalites = (d <= minimum[:, None] * (1 + 1e-9) + 1e-12).sum(axis=1) > 1
+            for c, i, egalite in zip(lot, meilleurs.tolist(), egalites.tolist()):
+                if egalite:
+                    resultat.append(self.plusProche(c))
+                else:
+                    resultat.append((self._valeurs[i], math.dist(c, self._points[i])))
+        return resultat
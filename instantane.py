@@ -0,0 +1,191 @@
+# Instantané binaire d'un graphe, lu par mmap sans copie
+# Un graphe construit une fois (data.py, CSV ou GTFS, voir chargement.py) est
+# écrit sur disque au format CSR de GrapheCompact. Au chargement, les tampons
+# ne sont pas lus: ce sont des memoryview (ou des vues NumPy) sur le fichier
+# projeté en mémoire, donc les processus qui chargent le même fichier partagent
+# les mêmes pages. Seuls les noms des sommets sont décodés
+
+# Format (entiers petit-boutistes pour l'en-tête, tampons dans le boutisme de la machine qui écrit):
+#   en-tête: MAGIC, version, boutisme, drapeaux (orienté, poids entiers), n, m, taille des noms, empreinte
+#   table des chaînes: n + 1 positions ('q') dans le bloc des noms UTF-8
+#   debuts ('q', n + 1), cibles ('i', m), poids ('d', m)
+# Chaque section commence à une position multiple de 8
+
+# Utilisation:
+#   python instantane.py ecris stm.stmg
+#   python instantane.py ecris reseau.stmg --gtfs dossier_gtfs --poids temps
+#   python instantane.py info reseau.stmg
+
+from __future__ import annotations
+from array import array
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from graphecompact import GrapheCompact
+
+MAGIC = b"STMG"
+VERSION = 1
+_ENTETE = struct.Struct("<4sHBBIQQ32s")  # MAGIC, version, boutisme, drapeaux, n, m, taille des noms, empreinte
+ORIENTE = 1
+ENTIERS = 2
+
+
+def _aligne(position: int):
+    return -(-position // 8) * 8
+
+
+def _sections(n: int, m: int, taille_noms: int):
+    """Positions de la table des chaînes, des noms, de debuts, de cibles et de poids, puis la taille du fichier"""
+    positions = _aligne(_ENTETE.size)
+    noms = positions + 8 * (n + 1)
+    debuts = _aligne(noms + taille_noms)
+    cibles = debuts + 8 * (n + 1)
+    poids = _aligne(cibles + 4 * m)
+    return positions, noms, debuts, cibles, poids, poids + 8 * m
+
+
+class GrapheInstantane(GrapheCompact):
+    """GrapheCompact dont les tampons sont des vues sur un fichier projeté en mémoire.
+    Envoyé à un autre processus, il n'emporte que le chemin du fichier et y est rechargé"""
+    __slots__ = ("_chemin", "_mmap", "empreinte")
+
+    def __reduce__(self):
+        return chargeInstantane, (self._chemin,)
+
+
+def sauveInstantane(g, chemin: str, empreinte: bytes = b""):
+    """Écrit g (Graphe ou GrapheCompact; les noms sont écrits avec str()) dans chemin; empreinte (32 octets
+    au plus) identifie les données d'origine, voir chargeOuConstruit"""
+    if not isinstance(g, GrapheCompact):
+        g = GrapheCompact.depuisGraphe(g)
+    debuts, cibles, poids = (array(t, tampon) for t, tampon in zip("qid", g.tampons()))
+    noms = [str(nom).encode("utf-8") for nom in g.listeSommets()]
+    positions = array('q', [0])
+    for nom in noms:
+        positions.append(positions[-1] + len(nom))
+    n, m = len(noms), len(cibles)
+    sections = _sections(n, m, positions[-1])
+    drapeaux = (ORIENTE if g.estOriente() else 0) | (ENTIERS if g.poidsEntiers() else 0)
+
+    # un fichier temporaire propre à cet appel, comme pour le cache de tablechemins.py
+    f = tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(chemin)),
+                                    prefix=os.path.basename(chemin) + ".", suffix=".tmp", delete=False)
+    try:
+        with f:
+            f.write(_ENTETE.pack(MAGIC, VERSION, sys.byteorder == "little", drapeaux, n, m, positions[-1],
+                                 empreinte))
+            for section, contenu in zip(sections, (positions, b"".join(noms), debuts, cibles, poids)):
+                f.write(bytes(section - f.tell()))  # remplissage jusqu'à la position alignée
+                f.write(contenu)
+        os.replace(f.name, chemin)  # jamais d'instantané à moitié écrit
+    except BaseException:
+        os.remove(f.name)
+        raise
+
+
+def lisEntete(chemin: str):
+    """Retourne {"version", "oriente", "entiers", "n", "m", "taille_noms", "empreinte"} sans projeter le fichier"""
+    with open(chemin, "rb") as f:
+        entete = f.read(_ENTETE.size)
+    if len(entete) < _ENTETE.size or entete[:4] != MAGIC:
+        raise ValueError(f"{chemin} n'est pas un instantané de graphe")
+    _, version, petit_boutiste, drapeaux, n, m, taille_noms, empreinte = _ENTETE.unpack(entete)
+    if version != VERSION or bool(petit_boutiste) != (sys.byteorder == "little"):
+        raise ValueError(f"{chemin}: version ou boutisme incompatible")
+    return {"version": version, "oriente": bool(drapeaux & ORIENTE), "entiers": bool(drapeaux & ENTIERS),
+            "n": n, "m": m, "taille_noms": taille_noms, "empreinte": empreinte.rstrip(b"\0")}
+
+
+def chargeInstantane(chemin: str):
+    """Projette le fichier en mémoire et retourne un GrapheInstantane dont les tampons sont des memoryview"""
+    entete = lisEntete(chemin)
+    n, m = entete["n"], entete["m"]
+    positions, noms, debuts, cibles, poids, taille = _sections(n, m, entete["taille_noms"])
+    with open(chemin, "rb") as f:
+        if os.fstat(f.fileno()).st_size != taille:
+            raise ValueError(f"{chemin}: instantané tronqué")
+        projection = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    vue = memoryview(projection)
+    table = vue[positions:noms].cast('q')
+    bloc = vue[noms:noms + entete["taille_noms"]]
+    liste_noms = [str(bloc[table[i]:table[i + 1]], "utf-8") for i in range(n)]
+    g = GrapheInstantane(liste_noms, vue[debuts:cibles].cast('q'), vue[cibles:cibles + 4 * m].cast('i'),
+                         vue[poids:taille].cast('d'), entete["oriente"], entete["entiers"])
+    g._chemin = os.path.abspath(chemin)
+    g._mmap = projection
+    g.empreinte = entete["empreinte"]
+    return g
+
+
+def empreinteFichiers(*chemins: str):
+    """Empreinte rapide de fichiers sources (taille et date de modification, sans les lire); un fichier
+    absent compte aussi, pour qu'un fichier optionnel ajouté plus tard change l'empreinte"""
+    h = hashlib.sha256()
+    for chemin in chemins:
+        try:
+            etat = os.stat(chemin)
+            h.update(f"{os.path.abspath(chemin)}\0{etat.st_size}\0{etat.st_mtime_ns}\0".encode("utf-8"))
+        except FileNotFoundError:
+            h.update(f"{os.path.abspath(chemin)}\0absent\0".encode("utf-8"))
+    return h.digest()
+
+
+def empreinteSources(csv: str | None = None, gtfs: str | None = None):
+    """Empreinte de tous les fichiers que lit le chargement d'un réseau: le CSV, les fichiers GTFS
+    (chargement.FICHIERS_GTFS) ou, par défaut, data.py"""
+    if csv:
+        return empreinteFichiers(csv)
+    if gtfs:
+        from chargement import FICHIERS_GTFS
+        return empreinteFichiers(*(os.path.join(gtfs, nom) for nom in FICHIERS_GTFS))
+    return empreinteFichiers(os.path.join(os.path.dirname(os.path.abspath(__file__)), "data.py"))
+
+
+def chargeOuConstruit(chemin: str, construit, empreinte: bytes = b""):
+    """Charge l'instantané s'il existe avec cette empreinte; sinon appelle construit() (un Graphe ou un
+    GrapheCompact), l'écrit, puis le charge. L'empreinte doit couvrir tout ce que construit lit (voir
+    empreinteSources), sinon un instantané périmé peut être repris"""
+    try:
+        if lisEntete(chemin)["empreinte"] == empreinte.rstrip(b"\0"):
+            return chargeInstantane(chemin)
+    except (OSError, ValueError):
+        pass
+    sauveInstantane(construit(), chemin, empreinte)
+    return chargeInstantane(chemin)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Écrit ou décrit un instantané binaire de graphe.")
+    sous = parser.add_subparsers(dest="commande", required=True)
+    ecris = sous.add_parser("ecris", help="construit le graphe (STM de data.py par défaut) et l'écrit")
+    ecris.add_argument("fichier")
+    source = ecris.add_mutually_exclusive_group()
+    source.add_argument("--csv", help="réseau CSV (voir chargement.py)")
+    source.add_argument("--gtfs", help="dossier d'un flux GTFS décompressé")
+    ecris.add_argument("--poids", choices=("distance", "temps"), default="distance", help="GTFS seulement")
+    info = sous.add_parser("info", help="affiche l'en-tête d'un instantané")
+    info.add_argument("fichier")
+    args = parser.parse_args(argv)
+
+    if args.commande == "ecris":
+        import chargement
+        if args.csv:
+            g, _ = chargement.chargeCSV(args.csv, compact=True)
+        elif args.gtfs:
+            g, _ = chargement.chargeGTFS(args.gtfs, args.poids, compact=True)
+        else:
+            from routage import stm
+            g = stm()
+        sauveInstantane(g, args.fichier, empreinteSources(args.csv, args.gtfs))
+    entete = lisEntete(args.fichier)
+    print(f"{args.fichier}: version {entete['version']}, {entete['n']} sommets, {entete['m']} entrées d'arêtes, "
+          f"{'orienté' if entete['oriente'] else 'non orienté'}, {os.path.getsize(args.fichier)} octets")
+
+
+if __name__ == "__main__":
+    main()
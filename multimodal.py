@@ -0,0 +1,267 @@
+# Réseau multimodal: un sommet par couple (station, ligne)
+# Les arêtes de métro relient deux stations consécutives d'une même ligne,
+# les arêtes de correspondance relient les quais d'une même station (avec une
+# pénalité) et les arêtes de marche relient des stations proches qui n'ont
+# aucune ligne en commun
+
+# Les trajets sont lus dans deux tables de tous les plus courts chemins
+# (tablechemins.py, gardées dans son cache sur disque):
+# - "rapide": les poids du graphe, pour le trajet le plus rapide
+# - "correspondances": chaque changement de ligne coûte en plus COUT_CORRESPONDANCE,
+#   plus que n'importe quel trajet; le plus court chemin a donc le moins de
+#   correspondances possible, puis le plus petit poids. S'il n'en a aucune,
+#   c'est aussi le trajet sur une seule ligne
+# Une recherche sur les états (quai, nombre de correspondances) ne sert plus que
+# si le trajet le plus rapide dépasse max_correspondances
+
+# Perturbations: le réseau peut suivre un graphe de stations (routage.stm()).
+# Chaque modifiePoids ou fermeArete de ce graphe est reporté sur les arêtes de
+# métro de la même ligne; dès que le réseau a changé, les trajets viennent de
+# routes dynamiques (dynamique.py) qui ne réparent que les arbres touchés
+
+from __future__ import annotations
+import math
+
+from graphelib import Graphe, plusCourtsChemins, remonteChemin
+from graphecompact import GrapheCompact
+from stations import LIGNES_RAW, METRES_PAR_UNITE, REGISTRE
+from dynamique import RoutesDynamiques
+from tablechemins import chargeTables
+
+PENALITE_CORRESPONDANCE = 1500  # en mètres équivalents (environ 3 minutes de métro)
+DISTANCE_MARCHE = 1100  # en mètres, distance maximale à pied entre deux stations (assez pour le centre-ville)
+FACTEUR_MARCHE = 6  # un mètre à pied coûte autant que six mètres en métro
+MAX_CORRESPONDANCES = 4
+COUT_CORRESPONDANCE = 1e7  # plus que le poids de n'importe quel trajet, pour la table "correspondances"
+
+
+class ReseauMultimodal:
+    def __init__(self, lignes_raw: dict = LIGNES_RAW,
+                 penalite_correspondance: float = PENALITE_CORRESPONDANCE,
+                 distance_marche: float = DISTANCE_MARCHE,
+                 facteur_marche: float = FACTEUR_MARCHE,
+                 registre=REGISTRE, metres_par_unite: float = METRES_PAR_UNITE,
+                 graphe_stations: Graphe | None = None):
+        """Construit le graphe (station, ligne) à partir des listes raw de chaque ligne; si graphe_stations est
+        donné (un graphe de stations aux arêtes étiquetées par ligne), ses changements de poids sont suivis,
+        y compris ceux notés avant la construction du réseau"""
+        self._graphe = Graphe(oriente=False)
+        self._quais: dict[str, list[tuple[str, str]]] = {}  # station -> ses sommets (station, ligne)
+
+        # arêtes de métro, dans l'ordre des stations de chaque ligne (mêmes règles que create_graph)
+        for ligne, data in lignes_raw.items():
+            for i, dictio in enumerate(data):
+                self._ajouteQuai(dictio["name"], ligne)
+                if i < len(data) - 1 and dictio["distance_to_next_station"]:
+                    self._graphe.ajouteArete(
+                        (dictio["name"], ligne),
+                        (data[i + 1]["name"], ligne),
+                        dictio["distance_to_next_station"],
+                    )
+
+        # arêtes de correspondance entre les quais d'une même station
+        for quais in self._quais.values():
+            for i, a in enumerate(quais):
+                for b in quais[i + 1:]:
+                    self._graphe.ajouteArete(a, b, penalite_correspondance)
+
+        # arêtes de marche entre stations proches sans ligne commune (chaque marche compte comme une correspondance)
+        stations = list(self._quais)
+        for i, a in enumerate(stations):
+            coord_a = registre.coord(a)
+            for b in stations[i + 1:]:
+                if registre.lignes(a) & registre.lignes(b):
+                    continue
+                metres = math.dist(coord_a, registre.coord(b)) * metres_par_unite
+                if metres > distance_marche:
+                    continue
+                for qa in self._quais[a]:
+                    for qb in self._quais[b]:
+                        self._graphe.ajouteArete(qa, qb, metres * facteur_marche + penalite_correspondance)
+
+        self._cles = {self._graphe.sommet(q): q for quais in self._quais.values() for q in quais}
+        self._penalise = None  # copie du graphe où chaque correspondance coûte COUT_CORRESPONDANCE de plus
+        self._tables = None
+        self._version_tables = None  # version du graphe quand les tables ont été chargées
+        self._dynamiques = None  # routes dynamiques des deux graphes, créées au premier changement
+        self._stations = graphe_stations
+        self._position = 0  # les arêtes de métro viennent des listes raw: tout le journal reste à reporter
+
+    def _ajouteQuai(self, station: str, ligne: str):
+        quais = self._quais.setdefault(station, [])
+        if (station, ligne) not in quais:
+            quais.append((station, ligne))
+            self._graphe.ajouteSommet((station, ligne))
+
+    def graphe(self):
+        """Retourne le Graphe (station, ligne) sous-jacent"""
+        return self._graphe
+
+    def quais(self, station: str):
+        """Retourne les sommets (station, ligne) d'une station"""
+        return list(self._quais.get(station, []))
+
+    def synchronise(self):
+        """Reporte les changements de poids du graphe des stations notés depuis le dernier appel sur les
+        arêtes de métro correspondantes; retourne le nombre d'arêtes modifiées"""
+        if self._stations is None:
+            return 0
+        changements = self._stations.journal(self._position)
+        self._position = self._stations.nbChangements()
+        modifiees = 0
+        for origine, destination, _, poids in changements:
+            lignes = self._stations.lignes(origine, destination)
+            if not lignes:  # arête sans étiquette: toutes les lignes communes aux deux stations
+                lignes = {l for _, l in self.quais(origine)} & {l for _, l in self.quais(destination)}
+            for ligne in lignes:
+                a = self._graphe.sommet((origine, ligne))
+                b = self._graphe.sommet((destination, ligne))
+                if a is None or b is None or not a.estVoisin(b):
+                    continue
+                self._graphe.modifiePoids((origine, ligne), (destination, ligne), poids)
+                if self._penalise is not None:  # même ligne: aucune pénalité à ajouter
+                    self._penalise.modifiePoids((origine, ligne), (destination, ligne), poids)
+                modifiees += 1
+        return modifiees
+
+    def _graphePenalise(self):
+        """Copie du graphe (mêmes sommets, voisins dans le même ordre) où chaque arête qui change de ligne
+        coûte COUT_CORRESPONDANCE de plus; construite une seule fois puis tenue à jour par synchronise"""
+        if self._penalise is None:
+            g = Graphe(oriente=self._graphe.estOriente())
+            for q in self._graphe.listeSommets(noms=True):
+                g.ajouteSommet(q)
+            for sommet in self._graphe.listeSommets():
+                a = self._cles[sommet]
+                copie = g.sommet(a)
+                for v, p in sommet.aretes():
+                    b = self._cles[v]
+                    copie.ajouteVoisin(g.sommet(b), p + COUT_CORRESPONDANCE if a[1] != b[1] else p)
+            self._cles.update((g.sommet(q), q) for q in g.listeSommets(noms=True))
+            self._penalise = g
+        return self._penalise
+
+    def tables(self):
+        """Retourne les tables {"rapide", "correspondances"} du graphe, chargées depuis le cache de
+        tablechemins.py (ou recalculées) à la première utilisation"""
+        if self._tables is None:
+            self._version_tables = self._graphe.version()
+            self._tables = chargeTables({
+                "rapide": GrapheCompact.depuisGraphe(self._graphe),
+                "correspondances": GrapheCompact.depuisGraphe(self._graphePenalise()),
+            })
+        return self._tables
+
+    def _routes(self):
+        """Fonctions (quai de départ, quai d'arrivée) -> (poids, sommets (station, ligne)) des trajets "rapide"
+        et "correspondances": celles des tables tant que le réseau n'a pas changé depuis leur chargement,
+        sinon celles des routes dynamiques"""
+        tables = self.tables()
+        if self._version_tables == self._graphe.version():
+            return tuple((lambda qo, qd, t=tables[cle]: (t.poids(qo, qd), t.chemin(qo, qd)))
+                         for cle in ("rapide", "correspondances"))
+        if self._dynamiques is None:
+            self._dynamiques = (RoutesDynamiques(self._graphe), RoutesDynamiques(self._graphePenalise()))
+        routes = []
+        for dynamiques, g in zip(self._dynamiques, (self._graphe, self._penalise)):
+            def route(qo, qd, dynamiques=dynamiques, g=g):
+                r = dynamiques.route(g.sommet(qo), g.sommet(qd))
+                return r["w"], [self._cles[s] for s in r["p"]]
+            routes.append(route)
+        return tuple(routes)
+
+    def _itineraire(self, noeuds, w=None):
+        """Regroupe les quais d'une même station d'une liste de sommets (station, ligne); le poids est la
+        somme des arêtes si w n'est pas donné"""
+        if w is None:
+            w = 0
+            for a, b in zip(noeuds, noeuds[1:]):
+                w += self._graphe.sommet(a).poids(self._graphe.sommet(b))
+        chemin = []
+        lignes = []
+        t = 0
+        for station, ligne in noeuds:
+            if not chemin or chemin[-1] != station:
+                chemin.append(station)
+            if not lignes or lignes[-1] != ligne:
+                if lignes:
+                    t += 1  # changer de ligne (ou marcher) est une correspondance
+                lignes.append(ligne)
+        return {"w": w, "p": chemin, "lignes": lignes, "correspondances": t}
+
+    def _meilleur(self, route, origine: str, destination: str):
+        """Sommets du plus court chemin entre deux stations selon route (voir _routes), tous quais confondus
+        (à poids égal, celui avec le moins de correspondances), ou None"""
+        meilleur = None
+        for qo in self._quais.get(origine, []):
+            for qd in self._quais.get(destination, []):
+                w, noeuds = route(qo, qd)
+                if w == math.inf:
+                    continue
+                cle = (w, sum(a[1] != b[1] for a, b in zip(noeuds, noeuds[1:])))
+                if meilleur is None or cle < meilleur[0]:
+                    meilleur = (cle, w, noeuds)
+        return None if meilleur is None else meilleur[1:]  # (poids, sommets)
+
+    def itineraires(self, origine: str, destination: str, max_correspondances: int = MAX_CORRESPONDANCES):
+        """Retourne {"rapide", "correspondances", "une_ligne"}: chacun est un dict {"w", "p", "lignes",
+        "correspondances"} comme main.dijkstra (avec des noms de stations), "une_ligne" vaut None s'il n'existe pas"""
+        self.synchronise()
+        route_rapide, route_correspondances = self._routes()
+        trouve = self._meilleur(route_correspondances, origine, destination)
+        if trouve is None:
+            return self._aucun(destination)
+        moins = self._itineraire(trouve[1])  # le poids de cette table compte les pénalités: on le recalcule
+        if moins["correspondances"] > max_correspondances:
+            return self._aucun(destination)
+        w, noeuds = self._meilleur(route_rapide, origine, destination)
+        rapide = self._itineraire(noeuds, w)
+        if rapide["correspondances"] > max_correspondances:
+            return self._recherche(origine, destination, max_correspondances)
+        if rapide["correspondances"] == moins["correspondances"]:
+            moins = rapide
+        return {
+            "rapide": rapide,
+            "correspondances": moins,
+            "une_ligne": moins if moins["correspondances"] == 0 else None,
+        }
+
+    @staticmethod
+    def _aucun(destination: str):
+        aucun = {"w": math.inf, "p": [destination], "lignes": [], "correspondances": 0}
+        return {"rapide": aucun, "correspondances": aucun, "une_ligne": None}
+
+    def _recherche(self, origine: str, destination: str, max_correspondances: int):
+        """Dijkstra sur les états (quai, nombre de correspondances) jusqu'à max_correspondances: à chaque nombre
+        de correspondances son trajet le plus court; même résultat que itineraires"""
+        cles = self._cles
+
+        def voisins(etat):
+            sommet, t = etat
+            ligne = cles[sommet][1]
+            for v, p in sommet.aretes():
+                nt = t + (cles[v][1] != ligne)  # changer de ligne (ou marcher) est une correspondance
+                if nt <= max_correspondances:
+                    yield (v, nt), p
+
+        departs = [((self._graphe.sommet(q), 0), 0) for q in self._quais.get(origine, [])]
+        distance, precedent, fixes = plusCourtsChemins(departs, voisins)
+        arrivees = [etat for etat in fixes if cles[etat[0]][0] == destination]
+        if not arrivees:
+            return self._aucun(destination)
+        plus_rapide = min(arrivees, key=lambda etat: (distance[etat], etat[1]))
+        moins_de_correspondances = min(arrivees, key=lambda etat: (etat[1], distance[etat]))
+        rapide = self._itineraire(self._remonte(precedent, plus_rapide), distance[plus_rapide])
+        moins = rapide
+        if moins_de_correspondances[1] < plus_rapide[1]:
+            moins = self._itineraire(self._remonte(precedent, moins_de_correspondances),
+                                     distance[moins_de_correspondances])
+        return {
+            "rapide": rapide,
+            "correspondances": moins,
+            "une_ligne": moins if moins["correspondances"] == 0 else None,
+        }
+
+    def _remonte(self, precedent, etat):
+        """Sommets (station, ligne) du départ jusqu'à l'état (quai, correspondances), dans l'ordre du trajet"""
+        return [self._cles[sommet] for sommet, _ in remonteChemin(precedent, etat)]
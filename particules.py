@@ -0,0 +1,94 @@
+# Moteur de particules pour les confettis
+# Les positions, vitesses et délais de toutes les particules sont gardés dans des
+# tableaux NumPy et avancés d'une image en une seule opération vectorisée;
+# sans NumPy, des listes Python donnent exactement le même mouvement: les deux
+# moteurs tirent leurs nombres du même générateur (random), dans le même ordre
+
+# Une particule de gauche (numéro pair) part du bord gauche vers la droite, une
+# particule de droite part du bord droit vers la gauche, et chacune attend son
+# délai (en images) avant d'être lancée
+
+from __future__ import annotations
+import random
+
+GRAVITE = 0.4  # vitesse verticale perdue à chaque image
+MARGE = 16  # distance hors de l'écran au départ
+
+_NUMPY = []  # [module numpy, ou None s'il n'est pas installé], rempli à la première utilisation
+
+
+def _numpy():
+    """Importe NumPy (optionnel) seulement quand des particules sont créées: il coûte cher au démarrage"""
+    if not _NUMPY:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _NUMPY.append(numpy)
+    return _NUMPY[0]
+
+
+class Particules:
+    def __init__(self, n: int, demi_cote: float, marge: float = MARGE, gravite: float = GRAVITE):
+        """n particules lancées depuis les bords d'un écran de -demi_cote à demi_cote"""
+        self._n = n
+        self._demi_cote = demi_cote
+        self._marge = marge
+        self._gravite = gravite
+        self._np = np = _numpy()
+        if np is not None:
+            self._sens = np.where(np.arange(n) % 2 == 0, 1.0, -1.0)  # 1 à gauche, -1 à droite
+        else:
+            self._sens = [1.0 if i % 2 == 0 else -1.0 for i in range(n)]
+        self.reinitialise()
+
+    def __len__(self):
+        return self._n
+
+    def reinitialise(self, rng: random.Random | None = None):
+        """Replace toutes les particules hors de l'écran, prêtes à être lancées (tirage avec rng ou random)"""
+        rng = rng or random
+        demi = self._demi_cote
+        depart = demi + self._marge
+        n = self._n
+        np = self._np
+        if np is not None:
+            # mêmes tirages, dans le même ordre, que les listes ci-dessous (y, vx, vy, délai)
+            tirages = np.array([rng.random() for _ in range(4 * n)]).reshape(4, n)
+            self._x = -self._sens * depart
+            self._y = tirages[0] * demi * 2 - demi
+            self._vx = tirages[1] * 15 * self._sens
+            self._vy = tirages[2] * 5 + 5
+            self._delai = tirages[3] * 30
+        else:
+            self._x = [-s * depart for s in self._sens]
+            self._y = [rng.random() * demi * 2 - demi for _ in range(n)]
+            self._vx = [rng.random() * 15 * s for s in self._sens]
+            self._vy = [rng.random() * 5 + 5 for _ in range(n)]
+            self._delai = [rng.random() * 30 for _ in range(n)]
+
+    def avance(self):
+        """Avance toutes les particules d'une image"""
+        if self._np is not None:
+            attend = self._delai > 0
+            lancees = ~attend
+            self._delai[attend] -= 1
+            self._x[lancees] += self._vx[lancees]
+            self._y[lancees] += self._vy[lancees]
+            self._vy[lancees] -= self._gravite
+            return
+        x, y, vx, vy, delai = self._x, self._y, self._vx, self._vy, self._delai
+        for i in range(self._n):
+            if delai[i] > 0:
+                delai[i] -= 1
+                continue
+            x[i] += vx[i]
+            y[i] += vy[i]
+            vy[i] -= self._gravite
+
+    def coordonnees(self):
+        """Retourne les listes (x, y) des positions courantes, arrondies au pixel"""
+        np = self._np
+        if np is not None:
+            return np.rint(self._x).astype(int).tolist(), np.rint(self._y).astype(int).tolist()
+        return [round(v) for v in self._x], [round(v) for v in self._y]
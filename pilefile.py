@@ -1,66 +1,114 @@
+from collections import deque
+
+
 ##### Classe pile
 
-class Pile:
-    def __init__(self):
-        self._data = []
+class PileDeque:
+    __slots__ = ("_data",)
+
+    def __init__(self, elements=()):
+        self._data = deque(elements)
 
     def taille(self):
         return len(self._data)
 
     def estvide(self):
-        return self.taille() == 0
+        return not self._data
 
     def empile(self, s):
         self._data.append(s)
 
+    def empile_tous(self, elements):
+        """Empile tous les éléments d'un itérable, dans l'ordre"""
+        self._data.extend(elements)
+
     def depile(self):
-        if self.estvide():
+        if not self._data:
             raise LookupError('La pile est vide')
         return self._data.pop()
 
+    def depile_n(self, n):
+        """Dépile n éléments et les retourne dans l'ordre où ils sortent"""
+        if n > len(self._data):
+            raise LookupError('La pile contient moins de ' + str(n) + ' éléments')
+        pop = self._data.pop
+        return [pop() for _ in range(n)]
+
     def sommet(self):
-        if self.estvide():
+        if not self._data:
             raise LookupError('La pile est vide')
         return self._data[-1]
 
     def change_sommet(self, s):
-        if self.estvide():
+        if not self._data:
             raise LookupError('La pile est vide')
         self._data[-1] = s
 
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        """Itère du sommet vers le fond, sans copier ni vider la pile"""
+        return reversed(self._data)
+
     def __str__(self):
         return 'Pile: ' + ', '.join([str(item) for item in self._data])
 
 
 ##### Classe file
 
-class File:
-    def __init__(self):
-        self._data = []
+class FileDeque:
+    __slots__ = ("_data",)
+
+    def __init__(self, elements=()):
+        self._data = deque(elements)
 
     def taille(self):
         return len(self._data)
 
     def estvide(self):
-        return self.taille() == 0
+        return not self._data
 
     def enfile(self, s):
         self._data.append(s)
 
+    def enfile_tous(self, elements):
+        """Enfile tous les éléments d'un itérable, dans l'ordre"""
+        self._data.extend(elements)
+
     def defile(self):
-        if self.estvide():
+        if not self._data:
             raise LookupError('La file est vide')
-        return self._data.pop(0)
+        return self._data.popleft()
+
+    def defile_n(self, n):
+        """Défile les n premiers éléments et les retourne dans l'ordre"""
+        if n > len(self._data):
+            raise LookupError('La file contient moins de ' + str(n) + ' éléments')
+        popleft = self._data.popleft
+        return [popleft() for _ in range(n)]
 
     def premier(self):
-        if self.estvide():
+        if not self._data:
             raise LookupError('La file est vide')
         return self._data[0]
 
     def change_premier(self, s):
-        if self.estvide():
+        if not self._data:
             raise LookupError('La file est vide')
         self._data[0] = s
 
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        """Itère du premier au dernier élément, sans copier ni vider la file"""
+        return iter(self._data)
+
     def __str__(self):
         return 'File: ' + ', '.join([str(item) for item in self._data])
+
+
+# Noms d'origine, gardés pour la compatibilité
+Pile = PileDeque
+File = FileDeque
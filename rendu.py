@@ -0,0 +1,344 @@
+# Moteurs de rendu des acteurs de la simulation (voir acteurs.py)
+# Un moteur fabrique des tortues (objets avec le sous-ensemble de l'interface de
+# turtle.Turtle dont les acteurs se servent) et des nuages de particules:
+#  - RenduTk dessine dans la fenêtre turtle (avec le rendu retenu de scene.Scene)
+#  - RenduImage dessine hors écran avec Pillow, sans affichage, une image à la fois
+# Il place aussi les tuiles d'une pyramide (voir tuiles.py), décodées au besoin
+
+# ecrisAnimation envoie les images d'un moteur hors écran vers un GIF animé
+# (Pillow) ou un MP4 (ffmpeg, si installé)
+
+from __future__ import annotations
+import math
+import shutil
+import subprocess
+
+from scene import Scene
+from tuiles import CAPACITE, CacheTuiles
+
+
+def _pil():
+    """Importe Pillow (optionnel) au premier usage; retourne (Image, ImageDraw, ImageFont)"""
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError:
+        raise ImportError("Pillow n'est pas installé") from None
+    return Image, ImageDraw, ImageFont
+
+
+# * Rendu dans la fenêtre turtle
+class _ParticulesTk:
+    def __init__(self, rendu, couleurs, rayon):
+        self._rendu = rendu
+        self._canevas = rendu.canevas()
+        self._rayon = rayon
+        self._objets = [
+            self._canevas.create_oval(0, 0, 0, 0, fill=couleur, outline=couleur, tags=("particules",))
+            for couleur in couleurs
+        ]
+
+    def deplace(self, xs, ys):
+        """Déplace tous les ovales en un seul script Tcl (y vers le haut pour turtle, vers le bas pour Tk)"""
+        r = self._rayon
+        chemin = self._canevas._w
+        script = "\n".join(
+            f"{chemin} coords {objet} {x - r} {-y - r} {x + r} {-y + r}" for objet, x, y in zip(self._objets, xs, ys)
+        )
+        self._canevas.tk.eval(f"{script}\n{chemin} raise particules")
+        self._rendu.touche()
+
+
+class _TuilesTk:
+    def __init__(self, rendu, pyramide, capacite):
+        self._rendu = rendu
+        self._canevas = rendu.canevas()
+        self._pyramide = pyramide
+        # les tuiles affichées doivent toutes rester décodées
+        self._cache = CacheTuiles(self._decode, max(capacite, pyramide.maxVisibles()))
+        self._objets = {}  # clé -> objet du canevas
+
+    def _decode(self, cle):
+        return self._rendu.photo(self._pyramide.chemin(cle))
+
+    def place(self, tuiles):
+        """Place les tuiles (clé, x, y) et retire les autres, sous tout le reste du canevas, en un seul script Tcl"""
+        chemin = self._canevas._w
+        script = []
+        anciens = self._objets
+        self._objets = {}
+        for cle, x, y in tuiles:
+            image = self._cache.obtient(cle)
+            objet = anciens.pop(cle, None)
+            if objet is None:
+                objet = self._canevas.create_image(x, -y, image=image, anchor="nw", tags=("tuiles",))
+            else:
+                script.append(f"{chemin} coords {objet} {x} {-y}")
+            self._objets[cle] = objet
+        if anciens:
+            script.append(f"{chemin} delete {' '.join(map(str, anciens.values()))}")
+        script.append(f"{chemin} lower tuiles")
+        self._canevas.tk.eval("\n".join(script))
+        self._rendu.touche()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class RenduTk:
+    def __init__(self, screen):
+        import turtle  # seulement pour ce moteur: RenduImage fonctionne sans Tk
+        self._turtle = turtle
+        self._screen = screen
+        self._scene = Scene(screen)
+        self._formes = set()
+
+    def ajouteForme(self, nom: str):
+        """Décode une image et l'ajoute aux formes de tortue (une seule fois par nom)"""
+        if nom not in self._formes:
+            self._screen.addshape(nom)
+            self._formes.add(nom)
+
+    def tortue(self, forme: str = "classic", visible: bool = True, fond: bool = False):
+        """Nouvelle tortue; si fond est vrai, elle est placée sous tout ce qui est déjà dessiné"""
+        t = self._turtle.Turtle(forme, visible=visible)
+        if fond:
+            self.canevas().tag_lower(t.turtle._item)
+        return t
+
+    def canevas(self):
+        return self._screen.getcanvas()
+
+    def photo(self, chemin: str):
+        """Image Tk décodée depuis un fichier"""
+        return self._turtle.TK.PhotoImage(file=chemin, master=self.canevas())
+
+    def particules(self, couleurs, rayon: float):
+        return _ParticulesTk(self, couleurs, rayon)
+
+    def tuiles(self, pyramide, capacite: int = CAPACITE):
+        return _TuilesTk(self, pyramide, capacite)
+
+    def touche(self):
+        """Signale un dessin fait directement sur le canevas (voir Scene.touche)"""
+        self._scene.touche()
+
+    def rafraichit(self):
+        """Met la fenêtre à jour; retourne False si rien n'avait changé"""
+        return self._scene.rafraichit()
+
+    def scene(self):
+        return self._scene
+
+
+# * Rendu hors écran
+# Formes polygonales de turtle (tête vers l'est), en coordonnées turtle pour shapesize(1)
+_POLYGONES = {
+    "circle": [(10 * math.cos(a * math.pi / 18), 10 * math.sin(a * math.pi / 18)) for a in range(36)],
+    "triangle": [(-5.77, -10), (11.55, 0), (-5.77, 10)],
+    "classic": [(0, 0), (-9, -5), (-7, 0), (-9, 5)],
+}
+
+
+def _couleur(c):
+    """Couleur turtle (nom, "#rrggbb" ou triplet entre 0 et 1) vers une couleur Pillow"""
+    if isinstance(c, tuple):
+        return tuple(round(v * 255) for v in c)
+    return c
+
+
+class _TortueImage:
+    """Tortue hors écran: garde son état, RenduImage la dessine à chaque image"""
+
+    def __init__(self, forme, visible):
+        self._forme = forme
+        self._visible = visible
+        self._position = (0.0, 0.0)
+        self._taille = 1
+        self._crayon = "black"
+        self._remplissage = "black"
+        self.objets = []  # ("point", position, diamètre, couleur) ou ("texte", position, texte, alignement, police)
+
+    def penup(self):
+        pass
+
+    def goto(self, x, y=None):
+        self._position = tuple(x) if y is None else (x, y)
+
+    def position(self):
+        return self._position
+
+    def shapesize(self, taille=None):
+        if taille is None:
+            return self._taille, self._taille, 1
+        self._taille = taille
+
+    def showturtle(self):
+        self._visible = True
+
+    def hideturtle(self):
+        self._visible = False
+
+    def isvisible(self):
+        return self._visible
+
+    def color(self, *couleur):
+        if len(couleur) == 3:
+            couleur = (tuple(couleur),)
+        if len(couleur) == 1:
+            couleur = couleur * 2
+        self._crayon, self._remplissage = couleur
+
+    def clear(self):
+        self.objets.clear()
+
+    def dot(self, diametre, couleur):
+        self.objets.append(("point", self._position, diametre, couleur))
+
+    def write(self, texte, align="left", font=("Arial", 8, "normal")):
+        self.objets.append(("texte", self._position, texte, align, font))
+
+
+class _ParticulesImage:
+    def __init__(self, couleurs, rayon):
+        self.couleurs = list(couleurs)
+        self.rayon = rayon
+        self.xs = []
+        self.ys = []
+
+    def deplace(self, xs, ys):
+        self.xs = xs
+        self.ys = ys
+
+
+class _TuilesImage:
+    def __init__(self, pyramide, capacite):
+        self._pyramide = pyramide
+        self._image, _, _ = _pil()
+        self._cache = CacheTuiles(self._decode, max(capacite, pyramide.maxVisibles()))
+        self.tuiles = []  # (image, x, y) placées
+
+    def _decode(self, cle):
+        return self._image.open(self._pyramide.chemin(cle)).convert("RGB")
+
+    def place(self, tuiles):
+        self.tuiles = [(self._cache.obtient(cle), x, y) for cle, x, y in tuiles]
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class RenduImage:
+    def __init__(self, taille: int, fond: str = "white"):
+        """Moteur hors écran pour une fenêtre de taille x taille pixels"""
+        self._image, self._imagedraw, self._imagefont = _pil()
+        self._taille = taille
+        self._fond = fond
+        self._formes = {}  # nom -> image RGBA (comme screen.addshape)
+        self._polices = {}
+        self._tortues = []
+        self._particules = []
+        self._tuiles = []
+
+    def ajouteForme(self, nom: str):
+        """Charge une image comme forme de tortue (le nom est le chemin du fichier, comme screen.addshape)"""
+        if nom not in self._formes:
+            self._formes[nom] = self._image.open(nom).convert("RGBA")
+
+    def tortue(self, forme: str = "classic", visible: bool = True, fond: bool = False):
+        t = _TortueImage(forme, visible)  # les images sont toujours dessinées en premier
+        self._tortues.append(t)
+        return t
+
+    def particules(self, couleurs, rayon: float):
+        p = _ParticulesImage(couleurs, rayon)
+        self._particules.append(p)
+        return p
+
+    def tuiles(self, pyramide, capacite: int = CAPACITE):
+        t = _TuilesImage(pyramide, capacite)
+        self._tuiles.append(t)
+        return t
+
+    def touche(self):
+        pass
+
+    def rafraichit(self):
+        return True
+
+    def _pixel(self, x, y):
+        return x + self._taille / 2, self._taille / 2 - y
+
+    def _police(self, police):
+        nom, taille, style = (tuple(police) + ("normal",))[:3]
+        cle = (nom, taille, style)
+        if cle not in self._polices:
+            fichiers = ["DejaVuSans-Bold.ttf", "arialbd.ttf"] if style == "bold" else ["DejaVuSans.ttf", "arial.ttf"]
+            for fichier in fichiers:
+                try:
+                    self._polices[cle] = self._imagefont.truetype(fichier, taille)
+                    break
+                except OSError:
+                    continue
+            else:
+                self._polices[cle] = self._imagefont.load_default()
+        return self._polices[cle]
+
+    def image(self):
+        """Dessine l'image courante: tuiles, cartes, puis points et textes, puis formes polygonales, puis
+        particules (le même ordre que sur le canevas Tk)"""
+        image = self._image.new("RGB", (self._taille, self._taille), self._fond)
+        dessin = self._imagedraw.Draw(image)
+        for t in self._tuiles:
+            for tuile, x, y in t.tuiles:
+                x, y = self._pixel(x, y)
+                image.paste(tuile, (round(x), round(y)))
+        for t in self._tortues:
+            forme = self._formes.get(t._forme)
+            if forme is not None and t._visible:
+                x, y = self._pixel(*t._position)
+                image.paste(forme, (round(x - forme.width / 2), round(y - forme.height / 2)), forme)
+        for t in self._tortues:
+            for objet in t.objets:
+                x, y = self._pixel(*objet[1])
+                if objet[0] == "point":
+                    r = objet[2] / 2
+                    dessin.ellipse((x - r, y - r, x + r, y + r), fill=_couleur(objet[3]))
+                else:
+                    ancre = {"left": "ld", "center": "md", "right": "rd"}[objet[3]]
+                    dessin.multiline_text((x, y), objet[2], fill="black", font=self._police(objet[4]), anchor=ancre,
+                                          align=objet[3])
+        for t in self._tortues:
+            if t._forme in _POLYGONES and t._visible:
+                px, py = t._position
+                points = [self._pixel(px + x * t._taille, py + y * t._taille) for x, y in _POLYGONES[t._forme]]
+                dessin.polygon(points, fill=_couleur(t._remplissage), outline=_couleur(t._crayon))
+        for p in self._particules:
+            for x, y, couleur in zip(p.xs, p.ys, p.couleurs):
+                x, y = self._pixel(x, y)
+                dessin.ellipse((x - p.rayon, y - p.rayon, x + p.rayon, y + p.rayon), fill=couleur)
+        return image
+
+
+# * Écriture des animations
+def ecrisAnimation(chemin: str, images, fps: int = 20):
+    """Écrit les images (un itérable d'images Pillow) dans un GIF animé, ou dans un MP4 si chemin finit
+    par .mp4 (ffmpeg doit être installé). Le MP4 consomme les images au fil de l'eau; le GIF les garde
+    toutes en mémoire, car Pillow écrit un GIF animé en une seule fois: préférer .mp4 pour un long trajet"""
+    images = iter(images)
+    premiere = next(images)
+    if chemin.endswith(".mp4"):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg est introuvable, impossible d'écrire un MP4")
+        largeur, hauteur = premiere.size
+        commande = [ffmpeg, "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                    "-s", f"{largeur}x{hauteur}", "-r", str(fps), "-i", "-", "-pix_fmt", "yuv420p", chemin]
+        with subprocess.Popen(commande, stdin=subprocess.PIPE) as processus:
+            processus.stdin.write(premiere.convert("RGB").tobytes())
+            for image in images:
+                processus.stdin.write(image.convert("RGB").tobytes())
+            processus.stdin.close()
+        if processus.returncode:
+            raise RuntimeError(f"ffmpeg a échoué (code {processus.returncode})")
+        return
+    premiere.save(chemin, save_all=True, append_images=list(images), duration=round(1000 / fps), loop=0)
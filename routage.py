@@ -0,0 +1,669 @@
+# Cœur du routage de la simulation STM, sans turtle ni Tk
+# Importable depuis un serveur ou un script de traitement par lot; main.py
+# l'utilise pour l'animation
+
+# Utilisation en ligne de commande (une requête par ligne, résultats en JSONL):
+#   python routage.py requetes.csv > resultats.jsonl
+#   python routage.py requetes.jsonl --mode une_ligne
+#   python routage.py requetes.csv --mode stm --processus 8
+#   python routage.py requetes.csv --mode stm --graphe reseau.stmg --processus 8
+# En CSV, les colonnes sont origine,destination (noms de stations) ou
+# origine_x,origine_y,destination_x,destination_y (coordonnées de l'écran);
+# en JSONL, chaque ligne est {"origine": ..., "destination": ...} où chaque
+# extrémité est un nom de station ou une liste [x, y]
+
+from __future__ import annotations
+import argparse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import csv
+import functools
+import heapq
+from itertools import islice
+import json
+import math
+from operator import methodcaller
+import os
+import sys
+
+from graphelib import Graphe, Sommet, plusCourtsChemins, remonteChemin
+from graphecompact import GrapheCompact
+from indexspatial import ArbreKD
+from stations import LIGNES_RAW, REGISTRE
+from multimodal import ReseauMultimodal
+from cacheroutes import CacheRoutes
+
+from data import green_raw, orange_raw, blue_raw, yellow_raw
+
+SCREEN_SIZE = 640  # les coordonnées des clics vont de -SCREEN_SIZE / 2 à SCREEN_SIZE / 2
+DEFAULT_REGION = "montreal"  # région d'un enregistrement sans attribut "region"
+
+
+# * CREATE STM GRAPHE
+def create_graph(data: list, system: Graphe, line: str | None = None):
+    """Ajoute une selection d'information raw à un graphe mutable donné (arêtes étiquetées par line si donnée)"""
+    for i in range(len(data) - 1):
+        if not data[i]["distance_to_next_station"]:
+            continue
+        system.ajouteArete(
+            data[i]["name"],
+            data[i + 1]["name"],
+            data[i]["distance_to_next_station"],
+            line,
+        )
+
+
+STM_RAW = green_raw[:]
+STM_RAW.extend(orange_raw)
+STM_RAW.extend(blue_raw)
+STM_RAW.extend(yellow_raw)
+
+
+# * Graphes et index, construits à la première utilisation puis gardés
+# (routage.STM, from routage import NETWORK, etc. passent par __getattr__ plus bas)
+@functools.cache
+def stm():
+    """Le graphe de tout le métro, chaque arête étiquetée par sa ligne"""
+    g = Graphe(oriente=False)
+    for name, data in LIGNES_RAW.items():  # même ordre que STM_RAW
+        create_graph(data, g, name)
+    return g
+
+
+@functools.cache
+def lines():
+    """Une vue de STM par ligne: {'orange', 'verte', 'bleue', 'jaune'} (aucun sommet ni arête n'est copié)"""
+    return {name: stm().sousGraphe(name) for name in ('orange', 'verte', 'bleue', 'jaune')}
+
+
+@functools.cache
+def stm_compact():
+    """Version compacte de STM, pour les requêtes simples et le traitement multiprocessus"""
+    return GrapheCompact.depuisGraphe(stm())
+
+
+@functools.cache
+def network():
+    """Réseau (station, ligne) avec pénalités de correspondance et marche entre stations proches; il suit les
+    changements de poids de STM (stm().modifiePoids ou stm().fermeArete pour une perturbation)"""
+    return ReseauMultimodal(graphe_stations=stm())
+
+
+def stations_in(region: str, data: list = STM_RAW):
+    """Enregistrements de data dont l'attribut "region" vaut region (DEFAULT_REGION s'il est absent)"""
+    return [d for d in data if d.get("region", DEFAULT_REGION) == region]
+
+
+@functools.cache
+def station_index():
+    """Index spatial des stations, un par région selon l'attribut "region" des enregistrements.
+    Sur l'île, toutes les stations restent candidates, comme avec l'ancien parcours de STM_RAW"""
+    index = {region: ArbreKD.depuisStations(stations_in(region), SCREEN_SIZE)
+             for region in dict.fromkeys(d.get("region", DEFAULT_REGION) for d in STM_RAW)}
+    index[DEFAULT_REGION] = ArbreKD.depuisStations(STM_RAW, SCREEN_SIZE)
+    return index
+
+
+_LAZY = {
+    "STM": stm,
+    "LINES": lines,
+    "GREEN": lambda: lines()['verte'],
+    "ORANGE": lambda: lines()['orange'],
+    "BLUE": lambda: lines()['bleue'],
+    "YELLOW": lambda: lines()['jaune'],
+    "STM_COMPACT": stm_compact,
+    "NETWORK": network,
+    "STATION_INDEX": station_index,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return _LAZY[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Les mêmes couples (origine, destination) reviennent souvent pendant une session
+ROUTE_CACHE = CacheRoutes(capacite=1024)
+
+
+def routes_between(origin: str, destination: str):
+    """network().itineraires(origin, destination) en passant par ROUTE_CACHE (le résultat est partagé, ne pas le modifier).
+    La clé suit les versions de STM et du réseau: une perturbation de STM ne ressert jamais un ancien trajet"""
+    network().synchronise()
+    return ROUTE_CACHE.obtient((stm(), network().graphe()), origin, destination, "itineraires",
+                               lambda: network().itineraires(origin, destination))
+
+
+_forward = methodcaller("aretes")  # voisins de la recherche avant: les couples (voisin, poids) d'un sommet
+
+
+def dijkstra(g: Graphe, start: Sommet, end: Sommet):
+    """A polished version of the Dijkstra algorithm (tas binaire, arrêt dès que la destination est fixée)"""
+    return _search(g, start, end, None)
+
+
+# * A* (heuristique géographique) et ALT (repères précalculés)
+# Les deux heuristiques sont admissibles et cohérentes: le résultat est le même qu'avec dijkstra,
+# mais moins de sommets sont fixés avant d'atteindre la destination
+
+def _search(g: Graphe, start: Sommet, end: Sommet, heuristic, stats: dict | None = None):
+    """Recherche A* générique (Dijkstra si heuristic est None); heuristic(sommet) minore le poids restant jusqu'à end"""
+    distance, precedent, settled = plusCourtsChemins([(start, 0)], _forward, end, heuristic)
+    if stats is not None:
+        stats["settled"] = len(settled)
+    if end not in distance:
+        return {"w": math.inf, "p": [end]}
+    return {"w": distance[end], "p": remonteChemin(precedent, end)}
+
+
+def single_source(g: Graphe, source: Sommet, reverse: bool = False):
+    """Dijkstra complet depuis source: retourne {sommet: poids}. Si reverse, les arêtes sont parcourues
+    à l'envers (poids de chaque sommet jusqu'à source); sans effet sur un graphe non orienté"""
+    neighbours = _backward_neighbours(g) if reverse else _forward
+    return plusCourtsChemins([(source, 0)], neighbours)[0]
+
+
+class GeoHeuristic:
+    """Distance à vol d'oiseau entre les coordonnées normalisées, convertie en mètres avec le plus petit
+    rapport poids/distance parmi les arêtes du graphe (donc jamais plus grande que le vrai poids restant).
+    Si un sommet n'a pas de coordonnées, un chemin qui passe par lui peut être plus court que ce rapport
+    ne le permet: la distance à vol d'oiseau ne minore plus rien et les bornes des repères ALT la remplacent"""
+
+    def __init__(self, g: Graphe, coord=None):
+        coord = coord or (lambda s: get_coord_from_sommet(str(s)))
+        # les noms ne sont normalisés qu'ici: l'heuristique ne lit plus que ce dictionnaire
+        self._coords = {s: coord(s) for s in g.listeSommets()}
+        self._landmarks = None
+        if None in self._coords.values():
+            self._landmarks = Landmarks(g)
+            return
+        self._scale = math.inf
+        for a, b, w in g.listeAretes():
+            d = math.dist(self._coords[a], self._coords[b])
+            if d > 0:
+                self._scale = min(self._scale, w / d)
+        if self._scale == math.inf:
+            self._scale = 0
+
+    def to(self, end: Sommet):
+        """Retourne la fonction heuristique vers end"""
+        if self._landmarks is not None:
+            return self._landmarks.to(end)
+        if self._scale == 0:
+            return lambda s: 0
+        coords = self._coords
+        target = coords[end]
+        scale = self._scale
+        return lambda s: math.dist(coords[s], target) * scale
+
+    def frm(self, start: Sommet):
+        """Retourne la fonction qui minore le poids depuis start (la distance à vol d'oiseau est symétrique)"""
+        if self._landmarks is not None:
+            return self._landmarks.frm(start)
+        return self.to(start)
+
+
+class Landmarks:
+    """Repères ALT: poids précalculés depuis et vers quelques sommets éloignés les uns des autres;
+    l'inégalité du triangle donne une borne inférieure du poids restant"""
+
+    def __init__(self, g: Graphe, count: int = 4):
+        sommets = g.listeSommets()
+        self._from = []  # poids de chaque repère vers chaque sommet
+        self._to = []  # poids de chaque sommet vers chaque repère
+        if not sommets:
+            return
+        # choix des repères: chaque nouveau repère est le sommet le plus loin des repères déjà choisis
+        closest = {s: math.inf for s in sommets}
+        landmark = sommets[0]
+        for _ in range(min(count, len(sommets))):
+            self._from.append(single_source(g, landmark))
+            self._to.append(single_source(g, landmark, reverse=True) if g.estOriente() else self._from[-1])
+            for s in sommets:
+                closest[s] = min(closest[s], self._from[-1].get(s, math.inf))
+            reachable = [s for s in sommets if closest[s] < math.inf and closest[s] > 0]
+            if not reachable:
+                break
+            landmark = max(reachable, key=closest.get)
+
+    def to(self, end: Sommet):
+        """Retourne la fonction heuristique vers end"""
+        pairs = [(d_from, d_from.get(end, math.inf), d_to, d_to.get(end, math.inf))
+                 for d_from, d_to in zip(self._from, self._to)]
+
+        def heuristic(s):
+            best = 0
+            for d_from, from_end, d_to, to_end in pairs:
+                # d(L, end) - d(L, s) et d(s, L) - d(end, L) minorent tous les deux d(s, end)
+                from_s = d_from.get(s, math.inf)
+                if from_s < math.inf and from_end < math.inf:
+                    best = max(best, from_end - from_s)
+                to_s = d_to.get(s, math.inf)
+                if to_s < math.inf and to_end < math.inf:
+                    best = max(best, to_s - to_end)
+            return best
+        return heuristic
+
+    def frm(self, start: Sommet):
+        """Retourne la fonction qui minore le poids depuis start jusqu'à chaque sommet"""
+        pairs = [(d_from, d_from.get(start, math.inf), d_to, d_to.get(start, math.inf))
+                 for d_from, d_to in zip(self._from, self._to)]
+
+        def heuristic(s):
+            best = 0
+            for d_from, from_start, d_to, to_start in pairs:
+                # d(L, s) - d(L, start) et d(start, L) - d(s, L) minorent tous les deux d(start, s)
+                from_s = d_from.get(s, math.inf)
+                if from_s < math.inf and from_start < math.inf:
+                    best = max(best, from_s - from_start)
+                to_s = d_to.get(s, math.inf)
+                if to_s < math.inf and to_start < math.inf:
+                    best = max(best, to_start - to_s)
+            return best
+        return heuristic
+
+
+# (id du graphe, mode) -> (graphe, version du graphe, heuristique): calculées une seule fois par graphe,
+# puis de nouveau si le graphe a changé depuis (Graphe.ajouteArete ou Graphe.modifiePoids)
+_HEURISTICS: dict = {}
+
+
+def _cached(g: Graphe, key: tuple, build):
+    version = g.version()
+    entry = _HEURISTICS.get(key)
+    if entry is None or entry[0] is not g or entry[1] != version:
+        entry = _HEURISTICS[key] = (g, version, build())
+    return entry[2]
+
+
+def heuristic_for(g: Graphe, mode: str):
+    """Retourne (en la construisant au besoin) l'heuristique "astar" ou "alt" de g"""
+    return _cached(g, (id(g), mode), lambda: GeoHeuristic(g) if mode == "astar" else Landmarks(g))
+
+
+def _backward_neighbours(g: Graphe):
+    """Voisins pour la recherche arrière: ceux de la recherche avant si le graphe n'est pas orienté,
+    sinon les arêtes entrantes (calculées une seule fois par graphe)"""
+    if not g.estOriente():
+        return _forward
+
+    def build():
+        incoming: dict = {}
+        for a, b, w in g.listeAretes():
+            incoming.setdefault(b, []).append((a, w))
+        return incoming
+    incoming = _cached(g, (id(g), "incoming"), build)
+    return lambda s: incoming.get(s, ())
+
+
+def bidirectional(g: Graphe, start: Sommet, end: Sommet, mode: str = "dijkstra", stats: dict | None = None):
+    """Dijkstra (ou A*/ALT) bidirectionnel: une recherche part de start, l'autre de end sur les arêtes inversées,
+    et on s'arrête quand plus aucun chemin plus court que le meilleur trouvé ne peut passer par les deux fronts"""
+    if mode == "dijkstra":
+        potential = lambda s: 0
+    elif mode in ("astar", "alt"):
+        # potentiel moyen (h_end - h_start) / 2: les deux recherches gardent des poids réduits positifs
+        heuristic = heuristic_for(g, mode)
+        to_end = heuristic.to(end)
+        from_start = heuristic.frm(start)
+        potential = lambda s: (to_end(s) - from_start(s)) / 2
+    else:
+        raise ValueError(f"mode inconnu: {mode}")
+
+    backward = _backward_neighbours(g)
+    sides = [
+        # (voisins, signe du potentiel, poids connus, prédécesseurs, sommets fixés, tas)
+        (_forward, 1, {start: 0}, {start: None}, set(), [(potential(start), 0, start)]),
+        (backward, -1, {end: 0}, {end: None}, set(), [(-potential(end), 0, end)]),
+    ]
+    best = 0 if start == end else math.inf  # meilleur poids d'un chemin complet trouvé
+    meeting = start if start == end else None
+    counter = 1
+    while sides[0][5] and sides[1][5]:
+        for side in sides:
+            heap, settled = side[5], side[4]
+            while heap and heap[0][2] in settled:
+                heapq.heappop(heap)  # entrées périmées (suppression paresseuse)
+        if not sides[0][5] or not sides[1][5] or sides[0][5][0][0] + sides[1][5][0][0] >= best:
+            break
+        # avancer le front dont la prochaine clé est la plus petite
+        me, other = (sides[0], sides[1]) if sides[0][5][0][0] <= sides[1][5][0][0] else (sides[1], sides[0])
+        neighbours, sign, distance, precedent, settled, heap = me
+        _, _, nearest = heapq.heappop(heap)
+        settled.add(nearest)
+        w = distance[nearest]
+        for b, weight in neighbours(nearest):
+            if b in settled:
+                continue
+            new_distance = w + weight
+            if new_distance < distance.get(b, math.inf):
+                distance[b] = new_distance
+                precedent[b] = nearest
+                heapq.heappush(heap, (new_distance + sign * potential(b), counter, b))
+                counter += 1
+                if b in other[2] and new_distance + other[2][b] < best:
+                    best = new_distance + other[2][b]
+                    meeting = b
+    if stats is not None:
+        stats["settled"] = len(sides[0][4]) + len(sides[1][4])
+
+    if meeting is None:
+        return {"w": math.inf, "p": [end]}
+    path = []
+    s = meeting
+    while s is not None:
+        path.append(s)
+        s = sides[0][3][s]
+    path.reverse()
+    s = sides[1][3][meeting]
+    while s is not None:
+        path.append(s)
+        s = sides[1][3][s]
+    return {"w": best, "p": path}
+
+
+def shortest_path(g: Graphe, start: Sommet, end: Sommet, mode: str = "dijkstra", stats: dict | None = None,
+                  both_ways: bool = False):
+    """Plus court chemin avec l'algorithme choisi ("dijkstra", "astar" ou "alt"); même résultat que dijkstra.
+    Si both_ways, la recherche est bidirectionnelle. Si stats est un dict, il reçoit le nombre de sommets
+    fixés ("settled")"""
+    if both_ways:
+        return bidirectional(g, start, end, mode, stats)
+    if mode == "dijkstra":
+        return _search(g, start, end, None, stats)
+    if mode not in ("astar", "alt"):
+        raise ValueError(f"mode inconnu: {mode}")
+    return _search(g, start, end, heuristic_for(g, mode).to(end), stats)
+
+
+def region_of(coord: tuple):
+    """Retourne la région ("laval", "rive_sud" ou "montreal") d'une coordonnée en considérant les rives"""
+    x = coord[0]
+    y = coord[1]
+    riviere_des_prairies = 0.5 * x + 310  # approximation de la Rivière-des-Prairies
+    fleuve_saint_laurent = 2 * x - 400  # approximation du fleuve Saint-Laurent
+
+    if y > riviere_des_prairies:  # si on est à Laval
+        return "laval"
+    elif y < fleuve_saint_laurent:  # île Sainte-Hélène ou rive sud
+        return "rive_sud"
+    return "montreal"  # île de Montréal
+
+
+def _ile_sainte_helene(coord: tuple):
+    """Retourne la station de l'île Sainte-Hélène si coord (sur la rive sud) y tombe, sinon None"""
+    for d in stations_in("ile_sainte_helene"):  # Jean-Drapeau, avant la rive sud
+        x = d["x"] * SCREEN_SIZE
+        y = d["y"] * SCREEN_SIZE
+        if abs(x - coord[0]) < 20 and abs(y - coord[1]) < 34:  # approximation de l'île Sainte-Hélène
+            return d["name"]
+    return None
+
+
+def closest_station(coord: tuple):
+    """Prend en paramètre les coordonnées de l'emplacement de l'utilisateur et retourne la station la plus proche en considérant les rives"""
+    region = region_of(coord)
+    if region == "rive_sud":
+        station = _ile_sainte_helene(coord)
+        if station is not None:
+            return station
+    station, _ = station_index()[region].plusProche(coord)
+    return station or ""
+
+
+def closest_stations(coords):
+    """Version par lot de closest_station: les coordonnées sont groupées par région et chaque groupe est
+    envoyé en un seul appel à l'index de sa région; retourne le nom de la station la plus proche de chacune"""
+    coords = list(coords)
+    resultat = [""] * len(coords)
+    groupes: dict = {}  # région -> positions dans coords
+    for i, coord in enumerate(coords):
+        region = region_of(coord)
+        if region == "rive_sud":
+            station = _ile_sainte_helene(coord)
+            if station is not None:
+                resultat[i] = station
+                continue
+        groupes.setdefault(region, []).append(i)
+    index = station_index()
+    for region, positions in groupes.items():
+        for i, (station, _) in zip(positions, index[region].plusProchesLot([coords[i] for i in positions])):
+            resultat[i] = station or ""
+    return resultat
+
+
+def _k_closest_in(index: ArbreKD, coord: tuple, k: int):
+    """Noms des k stations d'un index les plus proches de coord, sans doublons"""
+    n = k
+    while True:
+        # les stations de correspondance apparaissent une fois par ligne: on en demande plus au besoin
+        stations = list(dict.fromkeys(station for station, _ in index.kPlusProches(coord, n)))
+        if len(stations) >= k or n >= len(index):
+            return stations[:k]
+        n *= 2
+
+
+def k_closest_stations(coord: tuple, k: int):
+    """Retourne les noms des k stations les plus proches de coord, dans sa région, de la plus proche à la plus loin.
+    Sur la rive sud, comme pour closest_station, la station de l'île Sainte-Hélène vient en premier si coord y
+    tombe; sinon elle vient après les stations de la rive sud"""
+    region = region_of(coord)
+    index = station_index()
+    if region != "rive_sud":
+        return _k_closest_in(index[region], coord, k)
+    ile = _k_closest_in(index["ile_sainte_helene"], coord, k)
+    if _ile_sainte_helene(coord) is not None:
+        stations = ile + _k_closest_in(index["rive_sud"], coord, k)
+    else:
+        stations = _k_closest_in(index["rive_sud"], coord, k) + ile
+    return list(dict.fromkeys(stations))[:k]
+
+
+def get_coord_from_sommet(sommet: str):
+    """Prend en argument le nom d'une station et retourne ses coordonnées"""
+    return REGISTRE.coord(sommet)
+
+
+def get_sommet_name(sommet: str):
+    """Get the true sommet name"""
+    return REGISTRE.nomCanonique(sommet)
+
+
+def find_the_line(station: str):
+    """'Prend en argument le nom d'une station et retourne un ensemble de toutes les lignes de cette station"""
+    return REGISTRE.lignes(station)
+
+
+def walk_is_doable(destination: str, coord_start: list):
+    """Prend le nom de la station finale et les coordonnées initiales de l'utilisateur entre -0.5 et 0.5
+    et retourne un booléen qui dit si la marche est un moyen de transport réaliste"""
+    coord_end = get_coord_from_sommet(destination)
+    if math.dist(coord_start, coord_end) < 0.15:
+        return True
+    return False
+
+
+def staying_on_one_line(first_station: str, last_station: str):
+    """Prend en argument le nom de la première station visitée et de la station finale et retourne la ligne commune ou None s'il n'y en a pas """
+    first_station_lines = find_the_line(first_station)
+    last_station_lines = find_the_line(last_station)
+    common_lines = first_station_lines & last_station_lines  # "ET" logique pour trouver la ligne commune
+    if common_lines:
+        return list(common_lines)[0]  # retourne un string
+    return
+
+
+def resolve_station(endpoint):
+    """Retourne le nom de la station d'une extrémité de requête: un nom (peu importe la casse et les accents)
+    ou des coordonnées de l'écran (la station la plus proche est retenue); None si introuvable"""
+    if isinstance(endpoint, str):
+        return get_sommet_name(endpoint)
+    station = closest_station(tuple(endpoint))
+    return station or None
+
+
+def _shortest_path(graph: GrapheCompact, origin, destination):
+    """Résultat d'une requête de plus court chemin simple (comme main.dijkstra) sur un graphe compact"""
+    # un nom exact du graphe est pris tel quel, pour les graphes qui ne viennent pas de data.py
+    def name(endpoint):
+        if isinstance(endpoint, str) and graph.indice(endpoint) is not None:
+            return endpoint
+        return resolve_station(endpoint)
+
+    origin_name = name(origin)
+    destination_name = name(destination)
+    if graph.indice(origin_name) is None or graph.indice(destination_name) is None:
+        unknown = origin if graph.indice(origin_name) is None else destination
+        return {"origine": origin_name, "destination": destination_name, "erreur": f"station introuvable: {unknown}"}
+    return {"origine": origin_name, "destination": destination_name,
+            **graph.plusCourtChemin(origin_name, destination_name)}
+
+
+def route_many(pairs, mode: str = "rapide", graph: GrapheCompact | None = None):
+    """Prend un itérable de couples (origine, destination) et retourne un itérateur de résultats, dans l'ordre.
+    Chaque résultat contient "origine", "destination" et l'itinéraire demandé ("rapide", "correspondances"
+    ou "une_ligne") sous la forme {"w", "p", "lignes", "correspondances"}, ou une clé "erreur".
+    Le mode "stm" donne le plus court chemin simple {"w", "p"} sur graph (STM par défaut), comme main.dijkstra"""
+    for origin, destination in pairs:
+        if mode == "stm":
+            yield _shortest_path(graph or stm_compact(), origin, destination)
+            continue
+        origin_name = resolve_station(origin)
+        destination_name = resolve_station(destination)
+        if origin_name is None or destination_name is None:
+            unknown = origin if origin_name is None else destination
+            yield {"origine": origin_name, "destination": destination_name,
+                   "erreur": f"station introuvable: {unknown}"}
+            continue
+        route = routes_between(origin_name, destination_name)[mode]
+        if route is None:
+            yield {"origine": origin_name, "destination": destination_name,
+                   "erreur": "aucun trajet sur une seule ligne"}
+            continue
+        yield {"origine": origin_name, "destination": destination_name, **route}
+
+
+# * Traitement par lot sur plusieurs processus
+# Le graphe compact est envoyé une seule fois à chaque processus par l'initialiseur du pool
+# (un instantané, voir instantane.py, n'envoie que son chemin: chaque processus projette le
+# même fichier); les tâches ne transportent ensuite que des paquets de requêtes et de résultats
+
+_WORKER_GRAPH: GrapheCompact | None = None
+
+
+def _init_worker(graph: GrapheCompact):
+    global _WORKER_GRAPH
+    _WORKER_GRAPH = graph
+
+
+def _route_chunk(start: int, chunk: list):
+    """Tâche d'un processus: calcule un paquet de requêtes sur le graphe reçu à l'initialisation"""
+    return start, [_shortest_path(_WORKER_GRAPH, origin, destination) for origin, destination in chunk]
+
+
+def route_many_parallel(pairs, graph: Graphe | GrapheCompact | None = None, workers: int | None = None,
+                        chunksize: int = 256, ordered: bool = True):
+    """Version multiprocessus de route_many(pairs, mode="stm") sur graph (STM par défaut).
+    Les requêtes sont lues au fil de l'eau et distribuées par paquets de chunksize; au plus deux paquets
+    par processus sont en attente à la fois. Si ordered est faux, les résultats sortent dès qu'un paquet
+    est prêt et chacun porte la clé "indice" (sa position dans pairs)"""
+    if graph is None:
+        graph = stm_compact()
+    elif not isinstance(graph, GrapheCompact):
+        graph = GrapheCompact.depuisGraphe(graph)
+    workers = workers or os.cpu_count() or 1
+    pairs = iter(pairs)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(graph,)) as pool:
+        pending = deque()
+        start = 0
+
+        def submit():
+            nonlocal start
+            chunk = list(islice(pairs, chunksize))
+            if not chunk:
+                return False
+            pending.append(pool.submit(_route_chunk, start, chunk))
+            start += len(chunk)
+            return True
+
+        while len(pending) < 2 * workers and submit():
+            pass
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+            for future in done:
+                first, results = future.result()
+                submit()
+                for i, result in enumerate(results):
+                    if not ordered:
+                        result["indice"] = first + i
+                    yield result
+
+
+def _read_csv(file):
+    """Lit des couples (origine, destination) depuis un CSV avec en-tête"""
+    for row in csv.DictReader(file):
+        ends = []
+        for side in ("origine", "destination"):
+            if row.get(side):
+                ends.append(row[side])
+            else:
+                ends.append((float(row[side + "_x"]), float(row[side + "_y"])))
+        yield tuple(ends)
+
+
+def _read_jsonl(file):
+    """Lit des couples (origine, destination) depuis un fichier JSON Lines"""
+    for line in file:
+        if line.strip():
+            query = json.loads(line)
+            yield query["origine"], query["destination"]
+
+
+def main(argv=None):
+    """Point d'entrée de la ligne de commande: lit les requêtes et écrit les résultats au fil de l'eau"""
+    parser = argparse.ArgumentParser(description="Calcule des trajets STM par lot, sans interface graphique.")
+    parser.add_argument("requetes", help="fichier .csv ou .jsonl de requêtes (- pour l'entrée standard)")
+    parser.add_argument("-o", "--sortie", default="-", help="fichier JSONL de résultats (- pour la sortie standard)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="format des requêtes (déduit de l'extension sinon)")
+    parser.add_argument("--mode", choices=("rapide", "correspondances", "une_ligne", "stm"), default="rapide")
+    parser.add_argument("--processus", type=int, default=1, help="nombre de processus (mode stm seulement)")
+    parser.add_argument("--paquet", type=int, default=256, help="nombre de requêtes par tâche envoyée à un processus")
+    parser.add_argument("--desordre", action="store_true", help="écrire les résultats dès qu'ils sont prêts")
+    parser.add_argument("--graphe", help="instantané du graphe à utiliser au lieu de STM (mode stm seulement)")
+    args = parser.parse_args(argv)
+    if args.processus > 1 and args.mode != "stm":
+        parser.error("--processus demande --mode stm")
+    if args.graphe and args.mode != "stm":
+        parser.error("--graphe demande --mode stm")
+    graph = None
+    if args.graphe:
+        from instantane import chargeInstantane
+        graph = chargeInstantane(args.graphe)
+
+    format_ = args.format or ("csv" if args.requetes.endswith(".csv") else "jsonl")
+    entree = sys.stdin if args.requetes == "-" else open(args.requetes, newline="", encoding="utf-8")
+    sortie = sys.stdout if args.sortie == "-" else open(args.sortie, "w", encoding="utf-8")
+    try:
+        pairs = _read_csv(entree) if format_ == "csv" else _read_jsonl(entree)
+        if args.processus > 1:
+            results = route_many_parallel(pairs, graph, workers=args.processus, chunksize=args.paquet,
+                                          ordered=not args.desordre)
+        else:
+            results = route_many(pairs, args.mode, graph)
+        for result in results:
+            sortie.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if entree is not sys.stdin:
+            entree.close()
+        if sortie is not sys.stdout:
+            sortie.close()
+
+
+if __name__ == "__main__":
+    main()
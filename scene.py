@@ -0,0 +1,79 @@
+# Rendu retenu pour turtle
+# Avec turtle.tracer(0), TurtleScreen.update() redessine toutes les tortues à
+# chaque image, même celles qui n'ont pas bougé. La scène garde l'état dessiné
+# de chaque tortue et ne redessine que celles qui ont changé; si rien n'a
+# changé (ni tortue, ni élément dessiné directement sur le canevas), l'image
+# entière est sautée
+
+# Redessiner une partie des tortues demande des internes de turtle (le corps de
+# TurtleScreen.update): TurtleScreen._tracing et _update(), RawTurtle._update_data()
+# et _drawturtle(). Ils ne servent que dans _redessine, vérifiée avec le turtle de
+# Python 3.11 et Tk 8.6; s'ils disparaissent, la scène se rabat sur screen.update()
+# (tout est redessiné, mais les images sans changement restent sautées)
+
+from __future__ import annotations
+import warnings
+
+_INTERNES_ECRAN = ("_tracing", "_update")
+_INTERNES_TORTUE = ("_update_data", "_drawturtle")
+
+
+def _internesPresents(ecran, tortues):
+    return all(hasattr(ecran, nom) for nom in _INTERNES_ECRAN) and \
+        all(hasattr(t, nom) for t in tortues for nom in _INTERNES_TORTUE)
+
+
+def _redessine(ecran, tortues):
+    """Comme TurtleScreen.update(), mais seulement pour ces tortues; le seul endroit qui touche aux internes"""
+    traces = ecran._tracing
+    ecran._tracing = True
+    try:
+        for t in tortues:
+            t._update_data()
+            t._drawturtle()
+    finally:
+        ecran._tracing = traces
+    ecran._update()
+
+
+class Scene:
+    def __init__(self, screen):
+        self._screen = screen
+        self._dessinees = {}  # tortue -> état au dernier dessin
+        self._sale = True  # des éléments ont été ajoutés ou effacés directement sur le canevas
+        self.images = 0  # images envoyées à Tk
+        self.sautees = 0  # images sautées parce que rien n'avait changé
+        self.partiel = True  # False si les internes de turtle manquent: chaque image redessine tout
+
+    def touche(self):
+        """Signale un changement hors des tortues (texte écrit, point dessiné, objets du canevas déplacés)"""
+        self._sale = True
+
+    @staticmethod
+    def _etat(t):
+        """Tout ce qui change l'apparence de la forme d'une tortue"""
+        return t.position(), t.heading(), t.isvisible(), t.shape(), t.shapesize(), t.pencolor(), t.fillcolor()
+
+    def rafraichit(self):
+        """Redessine les tortues qui ont changé et met l'écran à jour; retourne False si l'image a été sautée"""
+        changees = []
+        for t in self._screen.turtles():
+            etat = self._etat(t)
+            if self._dessinees.get(t) != etat:
+                self._dessinees[t] = etat
+                changees.append(t)
+        if not changees and not self._sale:
+            self.sautees += 1
+            return False
+
+        if self.partiel and not _internesPresents(self._screen, changees):
+            self.partiel = False
+            warnings.warn("cette version de turtle n'a plus les internes de scene.py: chaque image redessine "
+                          "toutes les tortues (screen.update())", RuntimeWarning, stacklevel=2)
+        if self.partiel:
+            _redessine(self._screen, changees)
+        else:
+            self._screen.update()
+        self._sale = False
+        self.images += 1
+        return True
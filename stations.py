@@ -0,0 +1,101 @@
+# Registre des stations, construit une seule fois à partir de data.py
+# Chaque nom est indexé par une clé insensible à la casse et aux accents,
+# qui mène au nom officiel, aux coordonnées et aux lignes de la station
+
+from __future__ import annotations
+import math
+import statistics
+import unicodedata
+
+from data import green_raw, orange_raw, blue_raw, yellow_raw
+
+# Même ordre que STM_RAW: pour une station de correspondance, les coordonnées
+# retenues sont celles de la première ligne où elle apparaît
+LIGNES_RAW = {
+    "verte": green_raw,
+    "orange": orange_raw,
+    "bleue": blue_raw,
+    "jaune": yellow_raw,
+}
+
+
+def cleNom(nom: str):
+    """Normalise un nom de station: sans accents et en casefold ("Côte-Vertu" -> "cote-vertu")"""
+    decompose = unicodedata.normalize("NFKD", nom)
+    sans_accents = "".join(c for c in decompose if not unicodedata.combining(c))
+    return unicodedata.normalize("NFC", sans_accents).casefold().strip()
+
+
+class Station:
+    __slots__ = ("nom", "x", "y", "lignes")
+
+    def __init__(self, nom: str, x: float, y: float, lignes: frozenset):
+        self.nom = nom
+        self.x = x
+        self.y = y
+        self.lignes = lignes
+
+    def coord(self):
+        return self.x, self.y
+
+    def __str__(self):
+        return self.nom
+
+
+class RegistreStations:
+    def __init__(self, lignes_raw: dict):
+        """Indexe toutes les stations des listes raw données, par ligne"""
+        lignes: dict[str, set] = {}
+        premiers: dict[str, dict] = {}
+        for ligne, data in lignes_raw.items():
+            for dictio in data:
+                cle = cleNom(dictio["name"])
+                premiers.setdefault(cle, dictio)
+                lignes.setdefault(cle, set()).add(ligne)
+        self._stations = {
+            cle: Station(d["name"], d["x"], d["y"], frozenset(lignes[cle])) for cle, d in premiers.items()
+        }
+
+    def station(self, nom: str):
+        """Retourne la Station de ce nom (peu importe la casse et les accents), ou None"""
+        return self._stations.get(cleNom(nom))
+
+    def nomCanonique(self, nom: str):
+        """Retourne le nom officiel de la station, ou None"""
+        s = self.station(nom)
+        return s.nom if s else None
+
+    def coord(self, nom: str):
+        """Retourne les coordonnées (x, y) normalisées de la station, ou None"""
+        s = self.station(nom)
+        return s.coord() if s else None
+
+    def lignes(self, nom: str):
+        """Retourne le frozenset des lignes de la station (vide si inconnue)"""
+        s = self.station(nom)
+        return s.lignes if s else frozenset()
+
+    def __contains__(self, nom):
+        return cleNom(nom) in self._stations
+
+    def __iter__(self):
+        return iter(self._stations.values())
+
+    def __len__(self):
+        return len(self._stations)
+
+
+def metresParUnite(lignes_raw: dict = LIGNES_RAW, statistique=statistics.median):
+    """Rapport entre distance_to_next_station (en mètres) et la distance entre les coordonnées
+    normalisées de deux stations consécutives, résumé par la statistique donnée"""
+    rapports = []
+    for data in lignes_raw.values():
+        for a, b in zip(data, data[1:]):
+            ecart = math.dist((a["x"], a["y"]), (b["x"], b["y"]))
+            if a["distance_to_next_station"] and ecart > 0:
+                rapports.append(a["distance_to_next_station"] / ecart)
+    return statistique(rapports)
+
+
+REGISTRE = RegistreStations(LIGNES_RAW)
+METRES_PAR_UNITE = metresParUnite()  # environ 16 km pour une unité de coordonnée normalisée
@@ -0,0 +1,179 @@
+# Table de tous les plus courts chemins (toutes les paires de sommets)
+# Construite une seule fois par Dijkstra répété à partir de chaque sommet,
+# puis sauvegardée dans un cache binaire versionné. La clé du cache est
+# l'empreinte des graphes eux-mêmes (sommets, arêtes et poids tels que
+# construits), pas celle des fichiers d'où ils viennent
+
+# Pour chaque paire (i, j), on garde le poids du plus court chemin et le
+# prochain sommet à visiter depuis i pour aller vers j: un chemin se lit donc
+# en O(longueur du chemin)
+
+from __future__ import annotations
+from array import array
+import hashlib
+import json
+import math
+import os
+import struct
+import sys
+import tempfile
+
+from graphecompact import GrapheCompact
+from graphelib import plusCourtsChemins
+
+MAGIC = b"STMT"
+VERSION = 3
+DOSSIER = os.path.dirname(os.path.abspath(__file__))
+FICHIER_CACHE = os.path.join(DOSSIER, ".cache", "chemins.bin")
+
+
+class TableChemins:
+    def __init__(self, noms, distances, suivants):
+        """Crée une table à partir de tampons n*n déjà calculés"""
+        self._noms = list(noms)
+        self._index = {nom: i for i, nom in enumerate(self._noms)}
+        self._distances = distances  # array('d'), distances[i * n + j]
+        self._suivants = suivants  # array('i'), prochain sommet de i vers j (-1 si aucun)
+
+    @classmethod
+    def construire(cls, g):
+        """Calcule la table d'un Graphe (ou d'un GrapheCompact) par Dijkstra à partir de chaque sommet"""
+        if not isinstance(g, GrapheCompact):
+            g = GrapheCompact.depuisGraphe(g)
+        n = g.nbSommets()
+        distances = array('d', [math.inf]) * (n * n)
+        suivants = array('i', [-1]) * (n * n)
+        voisins = [list(g.voisins(i)) for i in range(n)]  # décodés une fois pour les n recherches
+        for source in range(n):
+            base = source * n
+            distance, precedent, ordre = plusCourtsChemins([(source, 0)], voisins.__getitem__)
+            # le prochain saut vers j est celui vers son prédécesseur, sauf si le prédécesseur est la source
+            for j in ordre:
+                distances[base + j] = distance[j]
+                if j == source or precedent[j] == source:
+                    suivants[base + j] = j
+                else:
+                    suivants[base + j] = suivants[base + precedent[j]]
+        return cls(g.listeSommets(), distances, suivants)
+
+    def listeSommets(self):
+        return list(self._noms)
+
+    def poids(self, origine: str, destination: str):
+        """Retourne le poids du plus court chemin entre deux sommets (math.inf si aucun)"""
+        n = len(self._noms)
+        return self._distances[self._index[origine] * n + self._index[destination]]
+
+    def chemin(self, origine: str, destination: str):
+        """Retourne la liste des noms de sommets du plus court chemin (vide si aucun)"""
+        n = len(self._noms)
+        i = self._index[origine]
+        j = self._index[destination]
+        if self._suivants[i * n + j] == -1:
+            return []
+        chemin = [self._noms[i]]
+        while i != j:
+            i = self._suivants[i * n + j]
+            chemin.append(self._noms[i])
+        return chemin
+
+    def route(self, origine, destination):
+        """Même résultat que main.dijkstra ({"w", "p"}), mais avec des noms de sommets"""
+        origine = str(origine)
+        destination = str(destination)
+        chemin = self.chemin(origine, destination)
+        if not chemin:
+            return {"w": math.inf, "p": [destination]}
+        return {"w": self.poids(origine, destination), "p": chemin}
+
+
+def empreinteGraphes(graphes: dict):
+    """Retourne le hash SHA-256 de graphes compacts: pour chacun sa clé, son orientation, ses noms de
+    sommets et ses tampons (donc chaque arête origine -> destination et son poids)"""
+    h = hashlib.sha256()
+    for cle, g in graphes.items():
+        h.update(f"{cle}\0{g.estOriente()}\0{g.listeSommets()!r}\0".encode("utf-8"))
+        for tampon in g.tampons():
+            h.update(bytes(tampon))
+    return h.digest()
+
+
+def _ecrireChaine(f, s: str):
+    b = s.encode("utf-8")
+    f.write(struct.pack("<I", len(b)))
+    f.write(b)
+
+
+def _lireChaine(f):
+    (taille,) = struct.unpack("<I", f.read(4))
+    return f.read(taille).decode("utf-8")
+
+
+def sauveTables(tables: dict, empreinte: bytes, chemin=FICHIER_CACHE):
+    """Écrit les tables dans le cache binaire: en-tête, puis pour chaque table ses noms et ses tampons"""
+    dossier = os.path.dirname(chemin)
+    os.makedirs(dossier, exist_ok=True)
+    # un fichier temporaire propre à cet appel: deux processus qui reconstruisent en même temps n'écrivent
+    # jamais dans le même fichier, et le dernier os.replace gagne
+    f = tempfile.NamedTemporaryFile(dir=dossier, prefix=os.path.basename(chemin) + ".", suffix=".tmp",
+                                    delete=False)
+    try:
+        with f:
+            f.write(MAGIC)
+            f.write(struct.pack("<HB", VERSION, sys.byteorder == "little"))
+            f.write(empreinte)
+            f.write(struct.pack("<I", len(tables)))
+            for cle, table in tables.items():
+                _ecrireChaine(f, cle)
+                f.write(struct.pack("<I", len(table._noms)))
+                _ecrireChaine(f, json.dumps(table._noms, ensure_ascii=False))  # chaînes ou couples (station, ligne)
+                table._distances.tofile(f)
+                table._suivants.tofile(f)
+        os.replace(f.name, chemin)  # jamais de cache à moitié écrit
+    except BaseException:
+        os.remove(f.name)
+        raise
+
+
+def lisTables(empreinte: bytes, chemin=FICHIER_CACHE):
+    """Lit le cache binaire; retourne None s'il est absent, d'une autre version ou périmé"""
+    try:
+        with open(chemin, "rb") as f:
+            if f.read(4) != MAGIC:
+                return None
+            version, petit_boutiste = struct.unpack("<HB", f.read(3))
+            if version != VERSION or bool(petit_boutiste) != (sys.byteorder == "little"):
+                return None
+            if f.read(len(empreinte)) != empreinte:
+                return None
+            tables = {}
+            (nombre,) = struct.unpack("<I", f.read(4))
+            for _ in range(nombre):
+                cle = _lireChaine(f)
+                (n,) = struct.unpack("<I", f.read(4))
+                noms = [tuple(nom) if isinstance(nom, list) else nom for nom in json.loads(_lireChaine(f))]
+                distances = array('d')
+                distances.fromfile(f, n * n)
+                suivants = array('i')
+                suivants.fromfile(f, n * n)
+                tables[cle] = TableChemins(noms, distances, suivants)
+            return tables
+    except (OSError, EOFError, struct.error, ValueError):
+        return None
+
+
+def chargeTables(graphes: dict, chemin=FICHIER_CACHE):
+    """Retourne les tables des graphes donnés (Graphe ou GrapheCompact), depuis le cache si les graphes
+    n'ont pas changé (mêmes sommets, arêtes et poids), sinon les reconstruit"""
+    graphes = {cle: g if isinstance(g, GrapheCompact) else GrapheCompact.depuisGraphe(g)
+               for cle, g in graphes.items()}
+    empreinte = empreinteGraphes(graphes)
+    tables = lisTables(empreinte, chemin)
+    if tables is not None and tables.keys() == graphes.keys():
+        return tables
+    tables = {cle: TableChemins.construire(g) for cle, g in graphes.items()}
+    try:
+        sauveTables(tables, empreinte, chemin)
+    except OSError:
+        print("Could not write the shortest path cache.")
+    return tables
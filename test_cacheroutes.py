@@ -0,0 +1,76 @@
+# Tests du cache des routes (cacheroutes.py)
+
+import gc
+
+from cacheroutes import CacheRoutes
+from graphelib import Graphe
+
+
+def _graphe():
+    g = Graphe(oriente=False)
+    g.ajouteArete("A", "B", 1)
+    return g
+
+
+def test_invalide_quand_le_graphe_change():
+    cache = CacheRoutes()
+    g = _graphe()
+    assert cache.obtient(g, "A", "B", "", lambda: 1) == 1
+    assert cache.obtient(g, "A", "B", "", lambda: 2) == 1
+    g.modifiePoids("A", "B", 5)
+    assert cache.obtient(g, "A", "B", "", lambda: 3) == 3
+    assert (cache.succes, cache.echecs) == (1, 2)
+
+
+def test_plusieurs_graphes():
+    cache = CacheRoutes()
+    g, h = _graphe(), _graphe()
+    assert cache.obtient((g, h), "A", "B", "", lambda: 1) == 1
+    h.ajouteArete("B", "C", 2)
+    assert cache.obtient((g, h), "A", "B", "", lambda: 2) == 2
+
+
+def test_nouveau_graphe_a_la_meme_adresse():
+    cache = CacheRoutes()
+    adresses = set()
+    for i in range(200):  # l'allocateur réutilise vite l'adresse d'un graphe détruit
+        g = _graphe()
+        adresses.add(id(g))
+        assert cache.obtient(g, "A", "B", "", lambda: i) == i
+        del g
+        gc.collect()
+    assert len(adresses) < 200  # sinon le test ne prouve rien
+    assert cache.succes == 0
+
+
+def test_vue_et_graphe():
+    cache = CacheRoutes()
+    g = _graphe()
+    assert cache.obtient(g, "A", "B", "", lambda: "graphe") == "graphe"
+    assert cache.obtient(g.sousGraphe("verte"), "A", "B", "", lambda: "vue") == "vue"
+
+
+def test_lru_et_duree():
+    maintenant = [0.0]
+    cache = CacheRoutes(capacite=2, duree=10, horloge=lambda: maintenant[0])
+    g = _graphe()
+    for destination in "BCD":
+        cache.obtient(g, "A", destination, "", lambda: destination)
+    assert len(cache) == 2 and cache.evictions == 1
+    assert cache.obtient(g, "A", "B", "", lambda: "recalcule") == "recalcule"
+    maintenant[0] = 11
+    assert cache.obtient(g, "A", "D", "", lambda: "expire") == "expire"
+    assert cache.expirations == 1
+
+
+def test_routes_between_suit_stm():
+    import routage
+    g = routage.stm()
+    avant = routage.routes_between("Berri-UQAM", "Longueuil")["rapide"]["w"]
+    poids = g.sommet("Berri-UQAM").poids(g.sommet("Jean-Drapeau"))
+    g.modifiePoids("Berri-UQAM", "Jean-Drapeau", poids + 1000)
+    try:
+        assert routage.routes_between("Berri-UQAM", "Longueuil")["rapide"]["w"] == avant + 1000
+    finally:
+        g.modifiePoids("Berri-UQAM", "Jean-Drapeau", poids)
+    assert routage.routes_between("Berri-UQAM", "Longueuil")["rapide"]["w"] == avant
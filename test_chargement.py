@@ -0,0 +1,64 @@
+# Tests du chargement des réseaux CSV et GTFS (chargement.py)
+
+import os
+
+import pytest
+
+import chargement
+import routage
+
+STOPS = """stop_id,stop_name,stop_lat,stop_lon
+a,A,45.50,-73.60
+b,B,45.51,-73.61
+c,C,45.52,-73.62
+"""
+TRIPS = """route_id,service_id,trip_id
+R1,s,t1
+R2,s,t2
+"""
+STOP_TIMES = """trip_id,arrival_time,departure_time,stop_id,stop_sequence
+t1,08:00:00,08:00:00,a,1
+t1,08:02:00,08:02:00,b,2
+t2,09:00:00,09:00:00,a,1
+t2,09:03:00,09:03:00,b,2
+t2,09:05:00,09:05:00,c,3
+"""
+
+
+def _gtfs(dossier, stop_times=STOP_TIMES):
+    for nom, contenu in (("stops.txt", STOPS), ("trips.txt", TRIPS), ("stop_times.txt", stop_times)):
+        with open(os.path.join(dossier, nom), "w", encoding="utf-8") as f:
+            f.write(contenu)
+    return str(dossier)
+
+
+def test_segment_partage_par_deux_lignes(tmp_path):
+    g, stations = chargement.chargeGTFS(_gtfs(tmp_path), poids="temps")
+    assert set(stations) == {"A", "B", "C"}
+    assert g.lignes("A", "B") == {"R1", "R2"}
+    assert g.sommet("A").poids(g.sommet("B")) == 120  # le poids du premier voyage qui passe
+    assert sorted(g.sousGraphe("R2").listeAretes(noms=True)) == [("A", "B", 120), ("B", "C", 120)]
+    assert sorted(g.sousGraphe("R1").listeAretes(noms=True)) == [("A", "B", 120)]
+
+
+def test_segment_partage_compact(tmp_path):
+    g, _ = chargement.chargeGTFS(_gtfs(tmp_path), poids="temps", compact=True)
+    assert g.nbAretes() == 4  # A-B une seule fois malgré ses deux lignes (2 entrées par arête)
+    assert g.plusCourtChemin("A", "C")["w"] == 240
+
+
+def test_arret_inconnu(tmp_path):
+    dossier = _gtfs(tmp_path, STOP_TIMES.replace("t2,09:05:00,09:05:00,c,3", "t2,09:05:00,09:05:00,z,3"))
+    with pytest.raises(ValueError, match="voyage t2: arrêt z"):
+        chargement.chargeGTFS(dossier)
+
+
+def test_csv_aller_retour(tmp_path):
+    chemin = str(tmp_path / "stm.csv")
+    chargement.exporteCSV(chemin)
+    g, stations = chargement.chargeCSV(chemin)
+    stm = routage.stm()
+    assert sorted(g.listeAretes(noms=True)) == sorted(stm.listeAretes(noms=True))
+    for a, b, _ in stm.listeAretes(noms=True):
+        assert g.lignes(a, b) == stm.lignes(a, b)
+    assert set(stations) == set(stm.listeSommets(noms=True))
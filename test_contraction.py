@@ -0,0 +1,39 @@
+# Tests des hiérarchies de contraction (contraction.py): mêmes plus courts chemins que dijkstra,
+# avant et après un aller-retour sur disque
+
+import random
+
+import pytest
+
+import routage
+from contraction import HierarchieContraction, verifier
+from graphelib import Graphe
+
+
+def _graphe_aleatoire(n=300, m=1200, graine=11):
+    """Graphe orienté aléatoire aux noms de chaînes, pas toujours fortement connexe"""
+    rng = random.Random(graine)
+    g = Graphe(oriente=True)
+    for i in range(n):
+        g.ajouteSommet(f"s{i}")
+    for _ in range(m):
+        g.ajouteArete(f"s{rng.randrange(n)}", f"s{rng.randrange(n)}", round(rng.uniform(1, 100), 2))
+    return g
+
+
+@pytest.mark.parametrize("graphe", [routage.stm, _graphe_aleatoire], ids=["stm", "aleatoire"])
+def test_comme_dijkstra(graphe, tmp_path):
+    g = graphe()
+    ch = HierarchieContraction.construire(g)
+    assert verifier(g, ch, 500, graine=1) == []
+
+    chemin = str(tmp_path / "graphe.ch")
+    ch.sauve(chemin)
+    rechargee = HierarchieContraction.charge(chemin)
+    assert rechargee.nbRaccourcis() == ch.nbRaccourcis()
+    assert verifier(g, rechargee, 500, graine=2) == []
+
+
+def test_meme_sommet():
+    ch = HierarchieContraction.construire(routage.stm())
+    assert ch.plusCourtChemin("Berri-UQAM", "Berri-UQAM") == {"w": 0, "p": ["Berri-UQAM"]}
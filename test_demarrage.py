@@ -0,0 +1,49 @@
+# Test du budget de démarrage: main.py (avec le faux module turtle de benchmarks.py)
+# doit dessiner sa première image en moins de BUDGET_DEMARRAGE_MS millisecondes,
+# mesuré dans un nouvel interpréteur pour que rien ne soit déjà importé
+
+# Utilisation:
+#   python -m pytest test_demarrage.py
+#   python test_demarrage.py
+
+from __future__ import annotations
+import os
+import subprocess
+import sys
+
+from benchmarks import BUDGET_DEMARRAGE_MS
+
+ESSAIS = 3  # le meilleur essai compte, pour ne pas échouer sur une machine momentanément chargée
+
+_PREMIERE_IMAGE = """
+import time
+debut = time.perf_counter()
+import benchmarks
+main = benchmarks.importer_main_sans_tk()
+assert main.screen is not None and main.user is not None
+print(time.perf_counter() - debut)
+"""
+
+
+def premiere_image_ms():
+    """Temps en millisecondes jusqu'à la première image de main.py, dans un nouvel interpréteur"""
+    sortie = subprocess.run([sys.executable, "-c", _PREMIERE_IMAGE], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, check=True)
+    return float(sortie.stdout.split()[-1]) * 1000
+
+
+def test_import_sans_fenetre():
+    sortie = subprocess.run([sys.executable, "-c", "import main; assert main.screen is None and main.user is None"],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    assert sortie.returncode == 0, sortie.stderr
+
+
+def test_budget_premiere_image():
+    meilleur = min(premiere_image_ms() for _ in range(ESSAIS))
+    assert meilleur < BUDGET_DEMARRAGE_MS, f"première image en {meilleur:.1f} ms (budget {BUDGET_DEMARRAGE_MS} ms)"
+
+
+if __name__ == "__main__":
+    test_import_sans_fenetre()
+    test_budget_premiere_image()
+    print("ok")
@@ -0,0 +1,55 @@
+# Tests du graphe compact (graphecompact.py)
+
+import math
+import random
+
+import routage
+from graphecompact import GrapheCompact
+from graphelib import Graphe
+
+
+def _graphe_aleatoire(n=200, m=800, graine=7, oriente=True):
+    rng = random.Random(graine)
+    g = Graphe(oriente)
+    for i in range(n):
+        g.ajouteSommet(i)
+    for _ in range(m):
+        g.ajouteArete(rng.randrange(n), rng.randrange(n), rng.randint(1, 50))
+    return g
+
+
+def test_plus_court_chemin_stm():
+    g = routage.stm()
+    compact = GrapheCompact.depuisGraphe(g)
+    noms = g.listeSommets(noms=True)
+    for origine in noms[::7]:
+        for destination in noms[::5]:
+            attendu = routage.dijkstra(g, g.sommet(origine), g.sommet(destination))
+            trajet = compact.plusCourtChemin(origine, destination)
+            assert math.isclose(trajet["w"], attendu["w"])
+            assert trajet["p"][0] == origine and trajet["p"][-1] == destination
+
+
+def test_plus_court_chemin_entiers():
+    g = _graphe_aleatoire()
+    compact = GrapheCompact.depuisGraphe(g)
+    for a, b in [(0, 199), (5, 17), (42, 3)]:
+        attendu = routage.dijkstra(g, g.sommet(a), g.sommet(b))["w"]
+        w = compact.plusCourtChemin(a, b)["w"]
+        assert w == attendu and (w == math.inf or isinstance(w, int))
+
+
+def test_vers_graphe():
+    g = routage.stm()
+    copie = GrapheCompact.depuisGraphe(g).versGraphe()
+    assert copie.listeAretes(noms=True) == g.listeAretes(noms=True)
+    assert copie.lignes("Berri-UQAM", "Jean-Drapeau") == frozenset()  # limite documentée
+    assert copie.version() == 0
+
+
+def test_vers_graphe_poids_mixtes():
+    g = Graphe(oriente=False)
+    g.ajouteArete("a", "b", 2)
+    g.ajouteArete("b", "c", 2.5)
+    poids = [p for _, _, p in GrapheCompact.depuisGraphe(g).versGraphe().listeAretes(noms=True)]
+    assert poids == [2.0, 2.5] and all(isinstance(p, float) for p in poids)
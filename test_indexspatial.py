@@ -0,0 +1,71 @@
+# Tests de l'index spatial (indexspatial.py) et de la recherche des stations proches (routage.py)
+
+import math
+import random
+
+import pytest
+
+import indexspatial
+import routage
+from indexspatial import ArbreKD
+
+
+def _nuage(n, graine):
+    rng = random.Random(graine)
+    return [(rng.uniform(-320, 320), rng.uniform(-320, 320)) for _ in range(n)]
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "boucle"])
+def numpy_ou_non(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(indexspatial, "_NUMPY", [None])
+    elif indexspatial._numpy() is None:
+        pytest.skip("NumPy n'est pas installé")
+
+
+def test_plus_proche_comme_parcours():
+    points = _nuage(300, 1)
+    arbre = ArbreKD(points, range(len(points)))
+    for c in _nuage(500, 2):
+        attendu = min(range(len(points)), key=lambda i: math.dist(c, points[i]))
+        assert arbre.plusProche(c) == (attendu, math.dist(c, points[attendu]))
+
+
+def test_k_plus_proches():
+    points = _nuage(200, 3)
+    arbre = ArbreKD(points, range(len(points)))
+    for c in _nuage(50, 4):
+        attendu = sorted(range(len(points)), key=lambda i: math.dist(c, points[i]))[:7]
+        assert [v for v, _ in arbre.kPlusProches(c, 7)] == attendu
+
+
+def test_lot_comme_plus_proche(numpy_ou_non):
+    points = _nuage(100, 5) + [(0.0, 0.0), (10.0, 0.0)]  # (5, 0) est à égalité entre ces deux points
+    arbre = ArbreKD(points, range(len(points)))
+    coords = _nuage(3000, 6) + [(5.0, 0.0), (5, 0)] + [(round(x), round(y)) for x, y in _nuage(500, 7)]
+    assert arbre.plusProchesLot(coords) == [arbre.plusProche(c) for c in coords]
+    assert arbre.plusProchesLot([]) == []
+    assert ArbreKD([], []).plusProchesLot([(0, 0)]) == [(None, math.inf)]
+
+
+def test_closest_stations_comme_closest_station(numpy_ou_non):
+    coords = _nuage(2000, 8) + [(x, y) for x in range(-320, 321, 40) for y in range(-320, 321, 40)]
+    assert routage.closest_stations(coords) == [routage.closest_station(c) for c in coords]
+
+
+def test_k_closest_stations_rive_sud():
+    jean_drapeau = routage.REGISTRE.coord("Jean-Drapeau")
+    sur_l_ile = (jean_drapeau[0] * routage.SCREEN_SIZE + 15, jean_drapeau[1] * routage.SCREEN_SIZE - 21)
+    rive_sud = (200, -250)
+    assert routage.region_of(sur_l_ile) == routage.region_of(rive_sud) == "rive_sud"
+    assert routage.k_closest_stations(sur_l_ile, 1) == [routage.closest_station(sur_l_ile)] == ["Jean-Drapeau"]
+    assert routage.k_closest_stations(sur_l_ile, 2) == ["Jean-Drapeau", "Longueuil"]
+    assert routage.k_closest_stations(rive_sud, 1) == [routage.closest_station(rive_sud)] == ["Longueuil"]
+    assert routage.k_closest_stations(rive_sud, 5) == ["Longueuil", "Jean-Drapeau"]
+    assert routage.k_closest_stations(rive_sud, 0) == []
+
+
+def test_k_closest_stations_sans_doublons():
+    stations = routage.k_closest_stations((0, 0), 10)
+    assert len(stations) == len(set(stations)) == 10
+    assert stations[0] == routage.closest_station((0, 0))
@@ -0,0 +1,76 @@
+# Tests des instantanés binaires de graphes (instantane.py)
+
+import os
+import pickle
+
+import pytest
+
+import routage
+from graphecompact import GrapheCompact
+from instantane import chargeInstantane, chargeOuConstruit, empreinteSources, lisEntete, sauveInstantane
+from test_chargement import _gtfs
+
+
+def test_aller_retour(tmp_path):
+    chemin = str(tmp_path / "stm.stmg")
+    compact = GrapheCompact.depuisGraphe(routage.stm())
+    sauveInstantane(compact, chemin, b"empreinte")
+    g = chargeInstantane(chemin)
+    assert g.listeSommets() == compact.listeSommets()
+    assert [bytes(t) for t in g.tampons()] == [bytes(t) for t in compact.tampons()]
+    assert g.estOriente() == compact.estOriente() and g.poidsEntiers() == compact.poidsEntiers()
+    assert g.empreinte == b"empreinte"
+    assert g.plusCourtChemin("Côte-Vertu", "Honoré-Beaugrand") == compact.plusCourtChemin("Côte-Vertu",
+                                                                                         "Honoré-Beaugrand")
+    copie = pickle.loads(pickle.dumps(g))  # seul le chemin du fichier voyage
+    assert copie.listeSommets() == g.listeSommets()
+    assert os.listdir(tmp_path) == ["stm.stmg"]
+
+
+def test_instantane_tronque(tmp_path):
+    chemin = str(tmp_path / "stm.stmg")
+    sauveInstantane(routage.stm(), chemin)
+    with open(chemin, "r+b") as f:
+        f.truncate(os.path.getsize(chemin) - 8)
+    with pytest.raises(ValueError):
+        chargeInstantane(chemin)
+    with open(chemin, "wb") as f:
+        f.write(b"pas un instantane")
+    with pytest.raises(ValueError):
+        lisEntete(chemin)
+
+
+def test_charge_ou_construit(tmp_path):
+    chemin = str(tmp_path / "stm.stmg")
+    appels = []
+
+    def construit():
+        appels.append(1)
+        return routage.stm()
+
+    chargeOuConstruit(chemin, construit, b"a")
+    chargeOuConstruit(chemin, construit, b"a")
+    assert len(appels) == 1
+    chargeOuConstruit(chemin, construit, b"b")
+    assert len(appels) == 2
+
+
+def test_empreinte_gtfs_suit_trips(tmp_path):
+    dossier = _gtfs(tmp_path)
+    avant = empreinteSources(gtfs=dossier)
+    assert empreinteSources(gtfs=dossier) == avant
+    trips = os.path.join(dossier, "trips.txt")
+    with open(trips, "a", encoding="utf-8") as f:
+        f.write("R3,s,t3\n")
+    assert empreinteSources(gtfs=dossier) != avant
+    os.remove(trips)  # trips.txt est optionnel: son absence compte aussi
+    assert empreinteSources(gtfs=dossier) != avant
+
+
+def test_empreinte_csv(tmp_path):
+    chemin = tmp_path / "stm.csv"
+    chemin.write_text("a", encoding="utf-8")
+    avant = empreinteSources(csv=str(chemin))
+    chemin.write_text("ab", encoding="utf-8")
+    assert empreinteSources(csv=str(chemin)) != avant
+    assert empreinteSources() != avant  # data.py par défaut
@@ -0,0 +1,38 @@
+# Tests du réseau multimodal (multimodal.py) et de ses perturbations
+
+import math
+
+import routage
+from multimodal import PENALITE_CORRESPONDANCE, ReseauMultimodal
+
+
+def _stm():
+    """Un nouveau graphe STM, pour ne pas toucher à celui partagé par routage.stm()"""
+    return routage.stm.__wrapped__()
+
+
+def test_fermeture_avant_construction():
+    g = _stm()
+    g.fermeArete("Berri-UQAM", "Jean-Drapeau")
+    reseau = ReseauMultimodal(graphe_stations=g)
+    attendu = routage.dijkstra(g, g.sommet("Berri-UQAM"), g.sommet("Longueuil"))["w"]
+    assert attendu == math.inf
+    assert reseau.itineraires("Berri-UQAM", "Longueuil")["rapide"]["w"] == attendu
+
+
+def test_fermeture_apres_construction():
+    g = _stm()
+    reseau = ReseauMultimodal(graphe_stations=g)
+    assert reseau.itineraires("Berri-UQAM", "Longueuil")["rapide"]["w"] < math.inf
+    g.fermeArete("Berri-UQAM", "Jean-Drapeau")
+    assert reseau.itineraires("Berri-UQAM", "Longueuil")["rapide"]["w"] == math.inf
+
+
+def test_ralentissement_avant_construction():
+    g = _stm()
+    ancien = g.sommet("Lionel-Groulx").poids(g.sommet("Atwater"))
+    g.modifiePoids("Lionel-Groulx", "Atwater", ancien * 10)
+    rapide = ReseauMultimodal(graphe_stations=g).itineraires("Lionel-Groulx", "Atwater")["rapide"]
+    attendu = routage.dijkstra(g, g.sommet("Lionel-Groulx"), g.sommet("Atwater"))["w"]
+    assert rapide["correspondances"] == 1  # le détour par la ligne orange
+    assert math.isclose(rapide["w"], attendu + PENALITE_CORRESPONDANCE)
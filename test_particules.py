@@ -0,0 +1,34 @@
+# Tests du moteur de particules (particules.py): NumPy et listes Python donnent le même mouvement
+
+import random
+
+import pytest
+
+import particules
+from particules import Particules
+
+
+def _trajectoire(n, graine, images=120):
+    p = Particules(n, 320)
+    p.reinitialise(random.Random(graine))
+    positions = []
+    for _ in range(images):
+        p.avance()
+        positions.append(p.coordonnees())
+    return positions
+
+
+def test_numpy_comme_listes(monkeypatch):
+    if particules._numpy() is None:
+        pytest.skip("NumPy n'est pas installé")
+    avec_numpy = _trajectoire(200, 7)
+    monkeypatch.setattr(particules, "_NUMPY", [None])
+    assert _trajectoire(200, 7) == avec_numpy
+
+
+def test_lancement():
+    p = Particules(4, 320)
+    p.reinitialise(random.Random(1))
+    xs, _ = p.coordonnees()
+    assert xs == [-336, 336, -336, 336]  # les paires partent de la gauche, les impaires de la droite
+    assert len(p) == 4
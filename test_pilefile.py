@@ -0,0 +1,49 @@
+# Tests des piles et des files (pilefile.py)
+
+import pytest
+
+from pilefile import File, Pile
+
+
+def test_pile():
+    p = Pile()
+    assert p.estvide() and p.taille() == 0
+    p.empile(1)
+    p.empile_tous([2, 3, 4])
+    assert len(p) == 4 and p.sommet() == 4
+    assert list(p) == [4, 3, 2, 1]  # du sommet vers le fond, sans vider la pile
+    assert len(p) == 4
+    p.change_sommet(5)
+    assert p.depile() == 5
+    assert p.depile_n(2) == [3, 2]
+    assert str(p) == "Pile: 1"
+    assert p.depile() == 1 and p.estvide()
+
+
+def test_file():
+    f = File(["a", "b"])
+    f.enfile("c")
+    f.enfile_tous("de")
+    assert f.taille() == 5 and f.premier() == "a"
+    assert list(f) == ["a", "b", "c", "d", "e"]
+    f.change_premier("z")
+    assert f.defile() == "z"
+    assert f.defile_n(3) == ["b", "c", "d"]
+    assert str(f) == "File: e"
+    assert f.defile() == "e" and f.estvide()
+
+
+@pytest.mark.parametrize("operation", [
+    lambda: Pile().depile(), lambda: Pile().sommet(), lambda: Pile().change_sommet(1), lambda: Pile([1]).depile_n(2),
+    lambda: File().defile(), lambda: File().premier(), lambda: File().change_premier(1), lambda: File([1]).defile_n(2),
+])
+def test_vide(operation):
+    with pytest.raises(LookupError):
+        operation()
+
+
+def test_defile_n_ne_perd_rien():
+    f = File(range(3))
+    with pytest.raises(LookupError):
+        f.defile_n(4)
+    assert list(f) == [0, 1, 2]
@@ -0,0 +1,52 @@
+# Tests des recherches de plus court chemin (routage.py): A*, ALT et les recherches
+# bidirectionnelles donnent le même poids que dijkstra
+
+import math
+import random
+
+import pytest
+
+import routage
+from graphelib import Graphe
+
+
+def _paires(g, n, graine=2023):
+    rng = random.Random(graine)
+    sommets = g.listeSommets()
+    return [(rng.choice(sommets), rng.choice(sommets)) for _ in range(n)]
+
+
+def _verifie(g, start, end, trajet, attendu):
+    assert math.isclose(trajet["w"], attendu["w"]) or trajet["w"] == attendu["w"]
+    if trajet["w"] < math.inf:
+        p = trajet["p"]
+        assert p[0] is start and p[-1] is end
+        assert math.isclose(sum(a.poids(b) for a, b in zip(p, p[1:])), trajet["w"])
+
+
+@pytest.mark.parametrize("mode", ["dijkstra", "astar", "alt"])
+@pytest.mark.parametrize("both_ways", [False, True])
+def test_stm(mode, both_ways):
+    g = routage.stm()
+    for start, end in _paires(g, 200):
+        _verifie(g, start, end, routage.shortest_path(g, start, end, mode, both_ways=both_ways),
+                 routage.dijkstra(g, start, end))
+
+
+def test_geoheuristic_minore():
+    g = routage.stm()
+    heuristique = routage.GeoHeuristic(g)
+    for _, end in _paires(g, 20):
+        h = heuristique.to(end)
+        for s, poids in routage.single_source(g, end).items():
+            assert h(s) <= poids + 1e-9
+
+
+def test_sommet_sans_coordonnees():
+    g = routage.stm.__wrapped__()
+    g.ajouteArete("Berri-UQAM", "raccourci", 1)
+    g.ajouteArete("raccourci", "Côte-Vertu", 1)
+    heuristique = routage.GeoHeuristic(g)
+    start, end = g.sommet("Honoré-Beaugrand"), g.sommet("Côte-Vertu")
+    h = heuristique.to(end)
+    assert h(start) <= routage.dijkstra(g, start, end)["w"]
@@ -0,0 +1,87 @@
+# Tests du rendu retenu (scene.py), sans Tk: un faux écran et de fausses tortues notent ce qui est redessiné
+
+import pytest
+
+from scene import Scene
+
+
+class _TortueSansInternes:
+    def __init__(self, dessins):
+        self._dessins = dessins
+        self.x = 0
+
+    def position(self):
+        return self.x, 0
+
+    def heading(self):
+        return 0
+
+    def isvisible(self):
+        return True
+
+    def shape(self):
+        return "classic"
+
+    def shapesize(self):
+        return 1, 1, 1
+
+    def pencolor(self):
+        return "black"
+
+    def fillcolor(self):
+        return "black"
+
+
+class _Tortue(_TortueSansInternes):
+    def _update_data(self):
+        pass
+
+    def _drawturtle(self):
+        self._dessins.append(self)
+
+
+class _Ecran:
+    def __init__(self, tortues):
+        self._tortues = tortues
+        self._tracing = False
+        self.mises_a_jour = 0
+        self.completes = 0
+
+    def turtles(self):
+        return self._tortues
+
+    def _update(self):
+        assert self._tracing is False  # rétabli avant la mise à jour
+        self.mises_a_jour += 1
+
+    def update(self):
+        self.completes += 1
+
+
+def test_seules_les_tortues_changees():
+    dessins = []
+    a, b = _Tortue(dessins), _Tortue(dessins)
+    ecran = _Ecran([a, b])
+    scene = Scene(ecran)
+    assert scene.rafraichit() and dessins == [a, b]
+    assert not scene.rafraichit() and scene.sautees == 1
+    b.x = 5
+    dessins.clear()
+    assert scene.rafraichit() and dessins == [b]
+    scene.touche()
+    dessins.clear()
+    assert scene.rafraichit() and dessins == []
+    assert ecran.mises_a_jour == 3 and ecran.completes == 0 and scene.images == 3
+
+
+def test_sans_les_internes_de_turtle():
+    dessins = []
+    a = _TortueSansInternes(dessins)
+    ecran = _Ecran([a])
+    scene = Scene(ecran)
+    with pytest.warns(RuntimeWarning):
+        assert scene.rafraichit()
+    assert not scene.partiel and ecran.completes == 1 and ecran.mises_a_jour == 0
+    assert not scene.rafraichit()  # les images sans changement restent sautées
+    a.x = 1
+    assert scene.rafraichit() and ecran.completes == 2
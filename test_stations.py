@@ -0,0 +1,55 @@
+# Tests du registre des stations (stations.py): mêmes réponses que l'ancien parcours de STM_RAW
+
+import pytest
+
+import routage
+from stations import LIGNES_RAW, REGISTRE, RegistreStations, cleNom
+
+
+def _premier(nom):
+    """L'ancien parcours linéaire: le premier enregistrement de ce nom"""
+    for d in routage.STM_RAW:
+        if d["name"] == nom:
+            return d
+    return None
+
+
+def test_comme_le_parcours_de_stm_raw():
+    for d in routage.STM_RAW:
+        premier = _premier(d["name"])
+        assert REGISTRE.coord(d["name"]) == (premier["x"], premier["y"])
+        assert REGISTRE.nomCanonique(d["name"]) == d["name"]
+    assert {s.nom for s in REGISTRE} == set(routage.stm().listeSommets(noms=True))
+    assert len(REGISTRE) == len(routage.stm().listeSommets())
+
+
+@pytest.mark.parametrize("saisie", ["côte-vertu", "COTE-VERTU", " Cote-Vertu ", "Côte-Vertu"])
+def test_casse_et_accents(saisie):
+    assert REGISTRE.nomCanonique(saisie) == "Côte-Vertu"
+    assert saisie in REGISTRE
+
+
+def test_lignes():
+    assert REGISTRE.lignes("Berri-UQAM") == {"verte", "orange", "jaune"}
+    assert REGISTRE.lignes("Snowdon") == {"orange", "bleue"}
+    for ligne, data in LIGNES_RAW.items():
+        assert all(ligne in REGISTRE.lignes(d["name"]) for d in data)
+
+
+def test_station_inconnue():
+    assert REGISTRE.station("Gare Centrale") is None
+    assert REGISTRE.nomCanonique("Gare Centrale") is None
+    assert REGISTRE.coord("Gare Centrale") is None
+    assert REGISTRE.lignes("Gare Centrale") == frozenset()
+    assert "Gare Centrale" not in REGISTRE
+
+
+def test_premiere_ligne_gagne():
+    registre = RegistreStations({
+        "a": [{"name": "Étoile", "x": 1, "y": 2, "distance_to_next_station": None}],
+        "b": [{"name": "etoile", "x": 3, "y": 4, "distance_to_next_station": None}],
+    })
+    assert registre.nomCanonique("ETOILE") == "Étoile"
+    assert registre.coord("étoile") == (1, 2)
+    assert registre.lignes("Etoile") == {"a", "b"}
+    assert cleNom("Étoile") == cleNom("etoile ")
@@ -0,0 +1,77 @@
+# Tests des tables de tous les plus courts chemins (tablechemins.py) et de leur cache sur disque
+
+import math
+import multiprocessing
+import os
+
+import routage
+from graphecompact import GrapheCompact
+from graphelib import Graphe
+from tablechemins import TableChemins, chargeTables, empreinteGraphes, lisTables, sauveTables
+
+
+def _quais():
+    """Petit graphe aux noms (station, ligne), comme le réseau multimodal"""
+    g = Graphe(oriente=False)
+    g.ajouteArete(("A", "verte"), ("B", "verte"), 3)
+    g.ajouteArete(("B", "verte"), ("B", "orange"), 10)
+    g.ajouteArete(("B", "orange"), ("C", "orange"), 2.5)
+    g.ajouteSommet(("D", "bleue"))
+    return g
+
+
+def test_comme_dijkstra():
+    g = routage.stm()
+    table = TableChemins.construire(g)
+    noms = g.listeSommets(noms=True)
+    for origine in noms[::3]:
+        for destination in noms[::4]:
+            attendu = routage.dijkstra(g, g.sommet(origine), g.sommet(destination))["w"]
+            assert math.isclose(table.poids(origine, destination), attendu)
+            chemin = table.chemin(origine, destination)
+            assert chemin[0] == origine and chemin[-1] == destination
+            assert math.isclose(sum(g.sommet(a).poids(g.sommet(b)) for a, b in zip(chemin, chemin[1:])), attendu)
+
+
+def test_aller_retour(tmp_path):
+    chemin = str(tmp_path / "chemins.bin")
+    graphes = {"stm": routage.stm(), "quais": _quais()}
+    tables = chargeTables(graphes, chemin)
+    empreinte = empreinteGraphes({cle: GrapheCompact.depuisGraphe(g) for cle, g in graphes.items()})
+    relues = lisTables(empreinte, chemin)  # ce que chargeTables lit au prochain appel
+    for cle in graphes:
+        assert relues[cle].listeSommets() == tables[cle].listeSommets()
+        assert relues[cle]._distances == tables[cle]._distances
+        assert relues[cle]._suivants == tables[cle]._suivants
+    assert relues["quais"].chemin(("A", "verte"), ("C", "orange")) == [("A", "verte"), ("B", "verte"),
+                                                                      ("B", "orange"), ("C", "orange")]
+    assert relues["quais"].poids(("A", "verte"), ("D", "bleue")) == math.inf
+    assert os.listdir(tmp_path) == ["chemins.bin"]  # aucun fichier temporaire laissé
+
+
+def test_cache_perime(tmp_path):
+    chemin = str(tmp_path / "chemins.bin")
+    g = _quais()
+    chargeTables({"quais": g}, chemin)
+    g.modifiePoids(("A", "verte"), ("B", "verte"), 4)
+    assert chargeTables({"quais": g}, chemin)["quais"].poids(("A", "verte"), ("B", "verte")) == 4
+    assert lisTables(b"\0" * 32, chemin) is None
+
+
+def _ecrit(chemin):
+    tables = {"stm": TableChemins.construire(routage.stm())}
+    for _ in range(20):
+        sauveTables(tables, b"e" * 32, chemin)
+
+
+def test_ecritures_concurrentes(tmp_path):
+    chemin = str(tmp_path / "chemins.bin")
+    processus = [multiprocessing.Process(target=_ecrit, args=(chemin,)) for _ in range(4)]
+    for p in processus:
+        p.start()
+    for p in processus:
+        p.join()
+        assert p.exitcode == 0
+    tables = lisTables(b"e" * 32, chemin)
+    assert tables is not None and tables["stm"]._distances == TableChemins.construire(routage.stm())._distances
+    assert os.listdir(tmp_path) == ["chemins.bin"]
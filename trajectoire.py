@@ -0,0 +1,146 @@
+# Trajectoire précalculée d'une animation de trajet
+# Tout le mouvement (accélération, freinage à l'approche de la destination,
+# caméra qui suit le joueur) est simulé une seule fois au départ, un pas de
+# simulation par image clé. Pendant l'animation, chaque image ne fait qu'une
+# lecture par indice; la même trajectoire peut être rejouée, parcourue à un
+# instant ou à une distance donnés, et exportée
+
+# Les images clés sont paramétrées par l'abscisse curviligne: distances[i] est
+# la distance parcourue sur la polyligne des stations à l'image i
+
+from __future__ import annotations
+from array import array
+from bisect import bisect_left
+from collections import deque
+import json
+import math
+
+ACCELERATION = 0.1  # par pas
+FREINAGE = 0.2  # par pas, quand il reste 5 stations ou moins
+VITESSE_MAX = 6
+VITESSE_APPROCHE = 2.5
+STATIONS_APPROCHE = 5
+LISSAGE_CAMERA = 0.2  # part de la nouvelle position dans la position de la caméra, à chaque pas
+
+
+class Trajectoire:
+    def __init__(self, positions, joueur, camera, distances):
+        """Crée une trajectoire à partir d'images clés déjà calculées (tableaux x0, y0, x1, y1, ...)"""
+        self._positions = positions  # position logique du joueur (coordonnées de la carte)
+        self._joueur = joueur  # position affichée du joueur (carte agrandie, relative à la caméra)
+        self._camera = camera  # position de la carte agrandie
+        self._distances = distances  # abscisse curviligne de chaque image clé
+
+    @classmethod
+    def depuisStations(cls, depart, stations, rapport: float, attente: int = 0):
+        """Simule le trajet de depart à chaque point de stations (coordonnées d'écran), puis attente pas
+        immobiles à l'arrivée; rapport est l'agrandissement de la carte qui suit le joueur"""
+        positions = array('d')
+        joueur = array('d')
+        camera = array('d')
+        distances = array('d')
+
+        x, y = depart
+        cible = (x, y)
+        file = deque(stations)
+        vitesse = 0
+        cx = cy = 0.0
+        parcouru = 0.0
+        while True:
+            # la caméra suit le joueur avec un peu de retard
+            cx = cx * (1 - LISSAGE_CAMERA) - x * rapport * LISSAGE_CAMERA
+            cy = cy * (1 - LISSAGE_CAMERA) - y * rapport * LISSAGE_CAMERA
+
+            # ralentir à l'approche de la fin, sinon accélérer
+            restantes = len(file)
+            if restantes <= STATIONS_APPROCHE:
+                vitesse = max(vitesse - FREINAGE, VITESSE_APPROCHE)
+            else:
+                vitesse = min(vitesse + ACCELERATION, VITESSE_MAX)
+
+            tx, ty = cible
+            distance = math.dist(cible, (x, y))
+            nx = vitesse * (tx - x) / (distance + 0.0001) + x
+            ny = vitesse * (ty - y) / (distance + 0.0001) + y
+            joueur.extend((nx * rapport + cx, ny * rapport + cy))
+            camera.extend((cx, cy))
+
+            # la station sera atteinte dans moins d'un pas et demi: passer à la suivante
+            if distance <= vitesse * 1.5:
+                parcouru += distance
+                x, y = tx, ty
+                if restantes == 1:
+                    vitesse = 0
+                if file:
+                    cible = file.popleft()
+                elif attente > 0:
+                    attente -= 1
+                else:
+                    positions.extend((x, y))
+                    distances.append(parcouru)
+                    break
+            else:
+                parcouru += math.dist((nx, ny), (x, y))
+                x, y = nx, ny
+            positions.extend((x, y))
+            distances.append(parcouru)
+        return cls(positions, joueur, camera, distances)
+
+    def __len__(self):
+        return len(self._distances)
+
+    def longueur(self):
+        """Distance totale parcourue"""
+        return self._distances[-1]
+
+    def position(self, i: int):
+        """Position logique du joueur à l'image clé i"""
+        return self._positions[2 * i], self._positions[2 * i + 1]
+
+    def joueur(self, i: int):
+        """Position affichée du joueur à l'image clé i"""
+        return self._joueur[2 * i], self._joueur[2 * i + 1]
+
+    def camera(self, i: int):
+        """Position de la carte agrandie à l'image clé i"""
+        return self._camera[2 * i], self._camera[2 * i + 1]
+
+    def imageA(self, distance: float):
+        """Première image clé à laquelle la distance parcourue atteint distance (pour se déplacer dans le trajet)"""
+        return min(bisect_left(self._distances, distance, hi=len(self) - 1), len(self) - 1)
+
+    def interpole(self, t: float):
+        """Positions (joueur affiché, caméra) interpolées au temps t, en pas depuis le départ"""
+        t = min(max(t, 0), len(self) - 1)
+        i = min(int(t), len(self) - 2) if len(self) > 1 else 0
+        f = t - i
+        j = min(i + 1, len(self) - 1)
+        ax, ay = self.joueur(i)
+        bx, by = self.joueur(j)
+        acx, acy = self.camera(i)
+        bcx, bcy = self.camera(j)
+        return ((ax + (bx - ax) * f, ay + (by - ay) * f),
+                (acx + (bcx - acx) * f, acy + (bcy - acy) * f))
+
+    def versDict(self):
+        return {
+            "positions": self._positions.tolist(),
+            "joueur": self._joueur.tolist(),
+            "camera": self._camera.tolist(),
+            "distances": self._distances.tolist(),
+        }
+
+    @classmethod
+    def depuisDict(cls, d: dict):
+        return cls(array('d', d["positions"]), array('d', d["joueur"]), array('d', d["camera"]),
+                   array('d', d["distances"]))
+
+    def sauve(self, chemin: str):
+        """Exporte les images clés en JSON"""
+        with open(chemin, "w", encoding="utf-8") as f:
+            json.dump(self.versDict(), f)
+
+    @classmethod
+    def charge(cls, chemin: str):
+        with open(chemin, encoding="utf-8") as f:
+            return cls.depuisDict(json.load(f))
@@ -0,0 +1,177 @@
+# Pyramide de tuiles de la carte agrandie
+# La carte est découpée hors ligne (python tuiles.py) en tuiles carrées, à
+# plusieurs niveaux de zoom. Pendant l'animation, la caméra ne place que les
+# tuiles qui touchent la fenêtre, et seules les tuiles récemment affichées
+# restent décodées (CacheTuiles): la mémoire ne dépend plus de la taille de la
+# carte, et on peut changer de niveau de zoom
+
+# Organisation du dossier: index.json (taille des tuiles et niveaux), puis
+# <niveau>/<colonne>_<ligne>.gif pour chaque tuile
+
+# Utilisation:
+#   python tuiles.py
+#   python tuiles.py --source stm.png --niveaux 1 1.5 2 --taille 256
+
+from __future__ import annotations
+import argparse
+from collections import OrderedDict
+import json
+import math
+import os
+
+from routage import SCREEN_SIZE
+
+DOSSIER_PROJET = os.path.dirname(os.path.abspath(__file__))
+DOSSIER = os.path.join(DOSSIER_PROJET, "tuiles")
+SOURCE = os.path.join(DOSSIER_PROJET, "stmBig.gif")
+TAILLE_TUILE = 256  # pixels
+# agrandissements par rapport à la fenêtre, jusqu'à la résolution de la source (1536 / 640 = stmBig.gif):
+# au-delà, les tuiles ne seraient que des pixels agrandis
+NIVEAUX = (1.0, 1.6, 1536 / 640)
+CAPACITE = 48  # tuiles décodées gardées en mémoire (une fenêtre en montre au plus 16 de 256 pixels)
+
+
+# * Génération hors ligne
+def genereTuiles(source: str = SOURCE, dossier: str = DOSSIER, niveaux=NIVEAUX, taille: int = TAILLE_TUILE,
+                 ecran: int = SCREEN_SIZE):
+    """Découpe l'image source en tuiles de taille x taille pixels à chaque niveau de zoom (la carte d'un
+    niveau mesure ecran * zoom pixels de côté, au plus la taille de la source) et écrit l'index; retourne la
+    Pyramide"""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("Pillow n'est pas installé") from None
+    image = Image.open(source)
+    if image.mode not in ("P", "RGB"):
+        image = image.convert("RGB")
+    for zoom in niveaux:
+        if round(ecran * zoom) > min(image.size):
+            raise ValueError(f"niveau {zoom}: plus grand que la source ({min(image.size) / ecran:.2f} au plus)")
+    index = {"taille": taille, "niveaux": []}
+    for niveau, zoom in enumerate(niveaux):
+        largeur = round(ecran * zoom)
+        carte = image if image.size == (largeur, largeur) else image.convert("RGB").resize(
+            (largeur, largeur), Image.LANCZOS)
+        os.makedirs(os.path.join(dossier, str(niveau)), exist_ok=True)
+        n = math.ceil(largeur / taille)
+        for colonne in range(n):
+            for ligne in range(n):
+                boite = (colonne * taille, ligne * taille,
+                         min((colonne + 1) * taille, largeur), min((ligne + 1) * taille, largeur))
+                carte.crop(boite).save(os.path.join(dossier, str(niveau), f"{colonne}_{ligne}.gif"))
+        index["niveaux"].append({"zoom": zoom, "largeur": largeur})
+    with open(os.path.join(dossier, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    return Pyramide(dossier, taille, index["niveaux"])
+
+
+# * Lecture
+class Pyramide:
+    def __init__(self, dossier: str, taille: int, niveaux):
+        """niveaux: liste de {"zoom", "largeur"}, du moins au plus agrandi"""
+        self._dossier = dossier
+        self._taille = taille
+        self._niveaux = [(n["zoom"], n["largeur"]) for n in niveaux]
+
+    @classmethod
+    def charge(cls, dossier: str = DOSSIER):
+        with open(os.path.join(dossier, "index.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        return cls(dossier, index["taille"], index["niveaux"])
+
+    def __len__(self):
+        return len(self._niveaux)
+
+    def zoom(self, niveau: int):
+        return self._niveaux[niveau][0]
+
+    def niveauPour(self, zoom: float):
+        """Niveau dont l'agrandissement est le plus proche de zoom"""
+        return min(range(len(self._niveaux)), key=lambda niveau: abs(self._niveaux[niveau][0] - zoom))
+
+    def chemin(self, cle):
+        """Fichier de la tuile cle = (niveau, colonne, ligne)"""
+        niveau, colonne, ligne = cle
+        return os.path.join(self._dossier, str(niveau), f"{colonne}_{ligne}.gif")
+
+    def maxVisibles(self, ecran: int = SCREEN_SIZE):
+        """Nombre maximal de tuiles qui touchent une fenêtre de ecran x ecran pixels"""
+        return (math.ceil(ecran / self._taille) + 1) ** 2
+
+    def visibles(self, niveau: int, centre, ecran: int = SCREEN_SIZE):
+        """Tuiles du niveau qui touchent la fenêtre quand le centre de la carte est à centre (coordonnées
+        turtle); retourne des (clé, x, y) où (x, y) est le coin haut gauche de la tuile, en coordonnées turtle"""
+        taille = self._taille
+        largeur = self._niveaux[niveau][1]
+        n = math.ceil(largeur / taille)
+        gauche = centre[0] - largeur / 2
+        haut = centre[1] + largeur / 2
+        demi = ecran / 2
+        colonnes = range(max(0, math.floor((-demi - gauche) / taille)),
+                         min(n, math.ceil((demi - gauche) / taille)))
+        lignes = range(max(0, math.floor((haut - demi) / taille)),
+                       min(n, math.ceil((haut + demi) / taille)))
+        return [((niveau, colonne, ligne), gauche + colonne * taille, haut - ligne * taille)
+                for ligne in lignes for colonne in colonnes]
+
+
+def chargePyramide(dossier: str = DOSSIER):
+    """Pyramide du dossier, ou None si elle n'a pas été générée (python tuiles.py)"""
+    if not os.path.exists(os.path.join(dossier, "index.json")):
+        return None
+    return Pyramide.charge(dossier)
+
+
+class CacheTuiles:
+    def __init__(self, decode, capacite: int = CAPACITE):
+        """decode(clé) retourne l'image décodée d'une tuile; au plus capacite images sont gardées (LRU)"""
+        self._decode = decode
+        self._capacite = capacite
+        self._images: OrderedDict = OrderedDict()  # clé -> image, la plus récente à la fin
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+
+    def obtient(self, cle):
+        image = self._images.get(cle)
+        if image is not None:
+            self._images.move_to_end(cle)
+            self.succes += 1
+            return image
+        self.echecs += 1
+        image = self._images[cle] = self._decode(cle)
+        if len(self._images) > self._capacite:
+            self._images.popitem(last=False)  # la moins récemment affichée
+            self.evictions += 1
+        return image
+
+    def vide(self):
+        self._images.clear()
+
+    def __len__(self):
+        return len(self._images)
+
+    def stats(self):
+        return {
+            "taille": len(self._images),
+            "capacite": self._capacite,
+            "succes": self.succes,
+            "echecs": self.echecs,
+            "evictions": self.evictions,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère la pyramide de tuiles de la carte agrandie.")
+    parser.add_argument("--source", default=SOURCE)
+    parser.add_argument("--dossier", default=DOSSIER)
+    parser.add_argument("--niveaux", type=float, nargs="+", default=NIVEAUX, help="agrandissements")
+    parser.add_argument("--taille", type=int, default=TAILLE_TUILE, help="côté des tuiles en pixels")
+    args = parser.parse_args(argv)
+    pyramide = genereTuiles(args.source, args.dossier, args.niveaux, args.taille)
+    for niveau in range(len(pyramide)):
+        print(f"niveau {niveau}: zoom {pyramide.zoom(niveau):.2f}")
+
+
+if __name__ == "__main__":
+    main()